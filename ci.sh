@@ -3,7 +3,7 @@
 ROOT_DIR="$HOME/.ci"
 PG_WORKING_REPO="$HOME/repos/probing-pipeline/trunk/ProbeGenerator"
 
-_python=/gsc/software/linux-x86_64/python-3.2.2/bin/python3
+_python=${PYTHON:-python3.9}
 
 FUSION_PROBES="$HOME/scratch/probes/actionable_fusions/statement.txt"
 SNP_PROBES="$HOME/scratch/probes/gene_snp_probes/actionable_mutation_statements.txt.csv"
@@ -24,7 +24,7 @@ send_email () {
 run_pg () {
 
     cd "$ROOT_DIR"/ProbeGenerator
-    ssh xhost08 "export PYTHONPATH=$ROOT_DIR/usr/lib/python3.2/site-packages:$PYTHONPATH &&
+    ssh xhost08 "export PYTHONPATH=$ROOT_DIR/usr/lib/python3.9/site-packages:$PYTHONPATH &&
                  $_python -m probe_generator \
                  -a /home/ahammel/scratch/probes/refseq_genes.txt \
                  -a /home/ahammel/scratch/probes/ucsc_genes.txt   \
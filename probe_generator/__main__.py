@@ -1,29 +1,155 @@
 """Automatically generate probe sequences.
 
 Usage:
-    probe-generator --statements FILE --genome FILE [--annotation FILE...] [-f]
+    probe-generator --statements FILE --genome FILE [--annotation FILE...] [options]
+    probe-generator --statements FILE --server ADDRESS [options]
+    probe-generator --vcf FILE --genome FILE --bases N [options]
+    probe-generator --bedpe FILE --genome FILE --bases N [options]
+    probe-generator serve --genome FILE [--annotation FILE...] [options]
+    probe-generator merge SHARD... [options]
+    probe-generator build-kmer-index --genome FILE [options]
+    probe-generator panel --genome FILE [--annotation FILE...] (--genes FILE | --pairs FILE) --bases N [options]
+    probe-generator (--validate | --plan) --statements FILE [--annotation FILE...] [options]
 
 Options:
     -s FILE --statements=FILE       a file containing probe statements
+    --vcf=FILE                      a file of variants in VCF format (which
+                                    may be compressed with gzip)
+    --bedpe=FILE                    a file of structural variants in BEDPE
+                                    format (which may be compressed with
+                                    gzip)
     -g FILE --genome=FILE           the reference genome (FASTA format)
     -a FILE --annotation=FILE       a genome annotation file in UCSC format
+    -o FILE --output=FILE           write the probes to FILE instead of
+                                    standard output
     -f --force                      run even if the total system memory is
                                     insufficient or cannot be determined
+    -d --deduplicate                print only the first probe with a given
+                                    sequence (on either strand)
+    --merge-duplicates              with -d, add the headers of duplicates to
+                                    the header of the probe printed
+    --duplicates=FILE               with -d, list the headers of duplicates
+                                    in FILE
+    --dedup-window=N                with -d, bound memory use by checking
+                                    only the last N unique probes
+    --bloom-capacity=N              with -d, also remove older duplicates
+                                    with a Bloom filter sized for N unique
+                                    probes (a few unique probes may be
+                                    removed too)
+    --statement-cache=N             remember the probes of up to N distinct
+                                    statements, so that repeated statements
+                                    are only processed once [default: 10000]
+    --profile                       print the time taken by each statement
+                                    and the slowest statements on exit
+    --profile-top=N                 with --profile, the number of slowest
+                                    statements to print [default: 20]
+    --profile-stats=FILE            with --profile, also dump cProfile
+                                    statistics to FILE
+    --timings                       print the wall time and peak memory of
+                                    each phase of the run to standard error
+                                    as a line of JSON
+    --timings-file=FILE             as --timings, but write the JSON to FILE
+    --checkpoint=FILE               with --output, record the progress of the
+                                    run in FILE
+    --checkpoint-every=N            with --checkpoint, record progress after
+                                    every N statements [default: 1000]
+    --resume                        with --checkpoint, carry on from where an
+                                    interrupted run stopped
+    --validate                      check the statements for problems without
+                                    loading the genome
+    --plan                          print the number of probes and estimated
+                                    output size of each statement without
+                                    loading the genome
+    --genes=FILE                    with 'panel', a file of gene names (one per
+                                    line); every pair of genes is probed
+    --pairs=FILE                    with 'panel', a file of pairs of gene
+                                    names (one pair per line)
+    --bases=N                       with 'panel', the number of bases on each
+                                    side of the junction; with VCF or BEDPE
+                                    input, the length of the probes
+    --shard=I/N                     process only shard I of N of the statements,
+                                    with markers for 'merge' in the output
+    --shard-by=KEY                  with --shard, split the statements by
+                                    'line' or by 'gene' (or chromosome)
+                                    [default: line]
+    --server=ADDRESS                have the probe server at ADDRESS generate
+                                    the probes
+    --listen=ADDRESS                with 'serve', the address to listen on:
+                                    HOST:PORT or the path of a Unix socket
+                                    [default: localhost:8470]
+    --kmer-index=FILE               add the specificity score of each probe
+                                    (the highest number of times any of its
+                                    k-mers occurs in the genome, from an
+                                    index made with 'build-kmer-index') to
+                                    its header
+    --max-kmer-count=N              with --kmer-index, omit probes with a
+                                    k-mer occurring more than N times in the
+                                    genome
+    --kmer-size=K                   with 'build-kmer-index', the length of
+                                    the k-mers [default: 20]
 
 """
+import contextlib
+import functools
 import sys
 
 from docopt import docopt
 
-from probe_generator import print_probes, check_memory
+from probe_generator import (print_probes, bedpe, check_memory, checkpoint,
+                             dedup, kmer, panel, plan, profiling, server,
+                             shard, vcf)
 
 VERSION = '0.5'
 
 REQUIRED_SYSTEM_MEMORY = 10485760 # 10Gb in Kb
 
+# Options only supported when generating probes from a statement file locally
+_STATEMENT_RUN_OPTIONS = ('--checkpoint', '--resume', '--shard', '--profile',
+                          '--timings', '--timings-file')
+
 
 def main():
     args = docopt(__doc__, version='ProbeGenerator {}'.format(VERSION))
+    if args['serve']:
+        _reject_options(args, _STATEMENT_RUN_OPTIONS, "serve")
+        _check_memory(args)
+        try:
+            server.serve(args['--genome'],
+                         args['--annotation'],
+                         args['--listen'],
+                         cache_size=int(args['--statement-cache']))
+        except OSError as error:
+            _exit_with_error(error)
+    elif args['merge']:
+        _merge_shards(args)
+    elif args['build-kmer-index']:
+        _build_kmer_index(args)
+    elif args['panel']:
+        _reject_options(args, _STATEMENT_RUN_OPTIONS, "panel")
+        _check_memory(args)
+        _print_panel(args)
+    elif args['--validate'] or args['--plan']:
+        _plan(args)
+    elif args['--server'] is not None:
+        _print_remote_probes(args)
+    elif args['--vcf'] is not None:
+        # Only one chromosome is in memory at a time, so the memory check is
+        # not needed.
+        _print_vcf_probes(args)
+    elif args['--bedpe'] is not None:
+        # As for VCF files, only the chromosomes of one record are in memory
+        # at a time.
+        _print_bedpe_probes(args)
+    else:
+        _check_memory(args)
+        _print_probes(args)
+
+
+def _check_memory(args):
+    """Exit with a warning if the system does not have enough memory to load
+    the genome, unless the '--force' flag was given.
+
+    """
     if not args['--force']:
         try:
             if check_memory.total_ram() < REQUIRED_SYSTEM_MEMORY:
@@ -43,8 +169,348 @@ def main():
                   "See README.md for details".format(error),
                   file=sys.stderr)
             sys.exit(1)
-    print_probes.print_probes(
-            args['--statements'], args['--genome'], *args['--annotation'])
+
+
+def _plan(args):
+    """Check the statements, or print their plan, without loading the genome.
+
+    Exits with status 1 if any statement has a problem.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS,
+                    "--plan" if args['--plan'] else "--validate")
+    plans = plan.plan_file(args['--statements'], args['--annotation'])
+    if args['--plan']:
+        plan.print_plan(plans)
+    if plan.print_problems(plans, sys.stderr if args['--plan'] else sys.stdout):
+        sys.exit(1)
+
+
+def _print_panel(args):
+    """Print the junction probes of every pair of genes in a panel.
+
+    """
+    try:
+        if args['--genes'] is not None:
+            with open(args['--genes']) as handle:
+                pairs = panel.read_genes(handle)
+        else:
+            with open(args['--pairs']) as handle:
+                pairs = panel.read_pairs(handle)
+        bases = int(args['--bases'])
+    except ValueError as error:
+        _exit_with_error(error)
+    with contextlib.ExitStack() as stack:
+        write = _scorer(args, _writer(_open_output(args, stack)), stack)
+        duplicates = _open_duplicates(args, stack)
+        deduplicator = _deduplicator(args, write, duplicates)
+        if deduplicator is not None:
+            write = deduplicator.add
+        panel.print_panel(
+            pairs, args['--genome'], args['--annotation'], bases, write=write)
+        if deduplicator is not None:
+            deduplicator.flush()
+
+
+def _merge_shards(args):
+    """Print the probes in the outputs of the shards of a run in the order of
+    the statement file.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS, "merge")
+    with contextlib.ExitStack() as stack:
+        write = _writer(_open_output(args, stack))
+        duplicates = _open_duplicates(args, stack)
+        deduplicator = _deduplicator(args, write, duplicates)
+        if deduplicator is not None:
+            write = deduplicator.add
+        handles = [stack.enter_context(open(shard_file))
+                   for shard_file in args['SHARD']]
+        shard.merge_shards(handles, write)
+        if deduplicator is not None:
+            deduplicator.flush()
+
+
+def _build_kmer_index(args):
+    """Count the k-mers of the genome and write the index to the output file.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS, "build-kmer-index")
+    if args['--output'] is None:
+        _exit_with_error("build-kmer-index requires --output")
+    try:
+        kmer.build_index(
+            args['--genome'], args['--output'], int(args['--kmer-size']))
+    except ValueError as error:
+        _exit_with_error(error)
+
+
+def _print_vcf_probes(args):
+    """Print the probes of the variants in a VCF file.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS, "--vcf")
+    try:
+        bases = int(args['--bases'])
+    except ValueError as error:
+        _exit_with_error(error)
+    with contextlib.ExitStack() as stack:
+        write = _scorer(args, _writer(_open_output(args, stack)), stack)
+        duplicates = _open_duplicates(args, stack)
+        vcf.print_vcf_probes(
+            args['--vcf'],
+            args['--genome'],
+            bases,
+            write=write,
+            deduplicator=_deduplicator(args, write, duplicates))
+
+
+def _print_bedpe_probes(args):
+    """Print the probes of the structural variants in a BEDPE file.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS, "--bedpe")
+    try:
+        bases = int(args['--bases'])
+    except ValueError as error:
+        _exit_with_error(error)
+    with contextlib.ExitStack() as stack:
+        write = _scorer(args, _writer(_open_output(args, stack)), stack)
+        duplicates = _open_duplicates(args, stack)
+        bedpe.print_bedpe_probes(
+            args['--bedpe'],
+            args['--genome'],
+            bases,
+            write=write,
+            deduplicator=_deduplicator(args, write, duplicates))
+
+
+def _print_remote_probes(args):
+    """Print the probes generated by a probe server.
+
+    """
+    _reject_options(args, _STATEMENT_RUN_OPTIONS, "--server")
+    with contextlib.ExitStack() as stack:
+        write = _scorer(args, _writer(_open_output(args, stack)), stack)
+        duplicates = _open_duplicates(args, stack)
+        try:
+            server.print_remote_probes(
+                args['--statements'],
+                args['--server'],
+                write=write,
+                deduplicator=_deduplicator(args, write, duplicates))
+        except server.ServerError as error:
+            _exit_with_error(error)
+
+
+def _print_probes(args):
+    """Load the genome and annotations and print the probes.
+
+    """
+    with contextlib.ExitStack() as stack:
+        progress = _checkpoint(args)
+        if progress is None:
+            output = _open_output(args, stack)
+        else:
+            output = stack.enter_context(
+                progress.open_output(args['--output']))
+        write = _scorer(args, _writer(output), stack)
+        statement_shard = _shard(args)
+        if progress is None or args['--duplicates'] is None:
+            duplicates = _open_duplicates(args, stack)
+        else:
+            duplicates = stack.enter_context(
+                progress.open_duplicates(args['--duplicates']))
+        deduplicator = _deduplicator(args, write, duplicates)
+        if deduplicator is not None and progress is not None:
+            with open(args['--output']) as handle:
+                for head, bases in checkpoint.read_fasta(handle):
+                    deduplicator.seen(head, bases)
+        profiler = _profiler(args)
+        if profiler is not None:
+            stack.enter_context(profiler)
+        timings = None
+        if args['--timings'] or args['--timings-file'] is not None:
+            timings = stack.enter_context(profiling.PhaseTimings())
+        try:
+            print_probes.print_probes(
+                    args['--statements'],
+                    args['--genome'],
+                    *args['--annotation'],
+                    write=write,
+                    deduplicator=deduplicator,
+                    cache_size=int(args['--statement-cache']),
+                    profiler=profiler,
+                    timings=timings,
+                    checkpoint=progress,
+                    shard=statement_shard,
+                    mark=functools.partial(shard.print_marker, file=output))
+        except checkpoint.InvalidCheckpoint as error:
+            _exit_with_error(error)
+    if profiler is not None:
+        profiler.report(sys.stderr)
+    if timings is not None:
+        _write_timings(args, timings)
+
+
+def _shard(args):
+    """Return the Shard given on the command line, or None.
+
+    """
+    if args['--shard'] is None:
+        return None
+    if args['--deduplicate'] or args['--merge-duplicates']:
+        _exit_with_error(
+            "--shard cannot be used with -d or --merge-duplicates: remove "
+            "duplicates when merging the shards instead")
+    try:
+        return shard.parse_shard(args['--shard'], args['--shard-by'])
+    except ValueError as error:
+        _exit_with_error(error)
+
+
+def _checkpoint(args):
+    """Return a Checkpoint configured from the command-line arguments, or None
+    if no checkpoint file was given.
+
+    If the run is being resumed, the progress of the earlier run is loaded.
+
+    """
+    if args['--checkpoint'] is None:
+        if args['--resume']:
+            _exit_with_error("--resume requires --checkpoint")
+        return None
+    if args['--output'] is None:
+        _exit_with_error("--checkpoint requires --output")
+    if args['--resume'] and args['--merge-duplicates']:
+        _exit_with_error(
+            "--resume cannot be used with --merge-duplicates, because merged "
+            "probes are only written at the end of the run")
+    progress = checkpoint.Checkpoint(
+        args['--checkpoint'],
+        every=int(args['--checkpoint-every']))
+    if args['--resume']:
+        try:
+            progress.load()
+        except checkpoint.InvalidCheckpoint as error:
+            _exit_with_error(error)
+    return progress
+
+
+def _open_output(args, stack):
+    """Return a handle to the output file given on the command line (closed
+    with the ExitStack `stack`), or None for standard output.
+
+    """
+    if args['--output'] is None:
+        return None
+    return stack.enter_context(open(args['--output'], 'w'))
+
+
+def _writer(output):
+    """Return a function printing probes in FASTA format to `output`.
+
+    """
+    return functools.partial(print_probes.print_fasta, file=output)
+
+
+def _scorer(args, write, stack):
+    """Return `write` wrapped to add the k-mer specificity score of each probe
+    to its header (and to omit probes scoring more than --max-kmer-count), or
+    `write` itself if no k-mer index was given on the command line.
+
+    The index is closed with the ExitStack `stack`.
+
+    """
+    if args['--kmer-index'] is None:
+        if args['--max-kmer-count'] is not None:
+            _exit_with_error("--max-kmer-count requires --kmer-index")
+        return write
+    max_count = None
+    try:
+        if args['--max-kmer-count'] is not None:
+            max_count = int(args['--max-kmer-count'])
+        index = stack.enter_context(kmer.KmerIndex(args['--kmer-index']))
+    except (ValueError, OSError, kmer.InvalidKmerIndex) as error:
+        _exit_with_error(error)
+    return kmer.KmerScorer(index, write, max_count=max_count)
+
+
+def _write_timings(args, timings):
+    """Write the phase timings as JSON to the file given on the command line,
+    or to standard error.
+
+    """
+    if args['--timings-file'] is None:
+        timings.write(sys.stderr)
+    else:
+        with open(args['--timings-file'], 'w') as handle:
+            timings.write(handle)
+
+
+def _profiler(args):
+    """Return a Profiler configured from the command-line arguments, or None if
+    profiling was not requested.
+
+    """
+    if not args['--profile']:
+        return None
+    return profiling.Profiler(
+        top=int(args['--profile-top']),
+        stats_file=args['--profile-stats'])
+
+
+def _open_duplicates(args, stack):
+    """Return a handle to the duplicates file given on the command line (closed
+    with the ExitStack `stack`), or None.
+
+    With --checkpoint, the file is opened by the Checkpoint instead, so that it
+    can be resumed with the output.
+
+    """
+    if args['--duplicates'] is None:
+        return None
+    return stack.enter_context(open(args['--duplicates'], 'w'))
+
+
+def _deduplicator(args, write, duplicates):
+    """Return a Deduplicator configured from the command-line arguments, or
+    None if deduplication was not requested.
+
+    """
+    if not (args['--deduplicate'] or args['--merge-duplicates']):
+        return None
+    window, capacity = (
+        None if args[option] is None else int(args[option])
+        for option in ('--dedup-window', '--bloom-capacity'))
+    try:
+        return dedup.Deduplicator(
+            write,
+            merge=args['--merge-duplicates'],
+            duplicates=duplicates,
+            window=window,
+            capacity=capacity)
+    except ValueError as error:
+        _exit_with_error(error)
+
+
+def _reject_options(args, options, command):
+    """Exit with an error if any of the `options` given is not supported by
+    `command`.
+
+    """
+    for option in options:
+        if args[option] not in (None, False):
+            _exit_with_error(
+                "{} cannot be used with {}".format(option, command))
+
+
+def _exit_with_error(error):
+    """Print an error message and exit.
+
+    """
+    print("\nERROR: {}\n".format(error), file=sys.stderr)
+    sys.exit(1)
 
 
 if __name__ == '__main__':
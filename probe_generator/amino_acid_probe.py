@@ -5,9 +5,11 @@ import re
 import sys
 import itertools
 
-from probe_generator import annotation, transcript
+from probe_generator import annotation, reference, transcript
 from probe_generator.variant import TranscriptVariant, GenomeVariant
 from probe_generator.probe import AbstractProbe, InvalidStatement
+from probe_generator.exceptions import NonFatalError
+from probe_generator.sequence_range import SequenceRange
 
 _STATEMENT_REGEX = re.compile(r"""
         \s*                                           # whitespace
@@ -30,6 +32,31 @@ _STATEMENT_REGEX = re.compile(r"""
         (--.*|\s*)                                    # comment
         """, re.VERBOSE)
 
+_SATURATION_REGEX = re.compile(r"""
+        \s*                                           # whitespace
+        ([A-Za-z0-9_./-]+)                            # gene name
+        \s*
+        :
+        \s*
+        (?:
+            (\*all\*)                                 # every codon
+        |
+            ([0-9]+)                                  # first codon
+            \s*-\s*
+            ([0-9]+)                                  # last codon
+            \s*
+            \*                                        # any amino acid
+        )
+        \s*
+        (\[trans\]|)                                  # transcript-only-sequence
+        \s*
+        /
+        \s*
+        ([0-9]+)                                      # number of base pairs
+        \s*
+        (--.*|\s*)                                    # comment
+        """, re.VERBOSE)
+
 _DNA_CODON_TABLE = {
     'A': ("GCT", "GCC", "GCA", "GCG"),
     'C': ("TGT", "TGC"),
@@ -55,6 +82,9 @@ _DNA_CODON_TABLE = {
     'X': tuple(''.join(bases) for bases in itertools.product("ACGT", repeat=3)),
     }
 
+_UNKNOWN_CODON = 'NNN' # The reference codon of saturation probes expanded
+                       # without the genome
+
 _AMINO_ACID_TABLE = {
     codon: amino_acid
     for amino_acid, codons in _DNA_CODON_TABLE.items() if amino_acid != 'X'
@@ -72,6 +102,8 @@ class AminoAcidProbe(AbstractProbe):
                            "{transcript_sequence}/{bases}_{transcript_name}_"
                            "{chromosome}:{coordinate}{comment}")
 
+    __slots__ = ('variant', 'index', 'comment')
+
     def __init__(self, *, variant, index, comment):
         self.variant = variant
         self.index = index
@@ -80,7 +112,7 @@ class AminoAcidProbe(AbstractProbe):
     def __str__(self):
         return self._STATEMENT_SKELETON.format(
             gene=self.variant.gene,
-            reference_aa=_AMINO_ACID_TABLE[self.variant.reference],
+            reference_aa=_AMINO_ACID_TABLE.get(self.variant.reference, 'X'),
             codon=self.index,
             mutation_aa=_AMINO_ACID_TABLE[self.variant.mutation],
             reference=self.variant.reference,
@@ -96,9 +128,20 @@ class AminoAcidProbe(AbstractProbe):
         return self.variant.sequence_ranges()
 
     @staticmethod
-    def explode(statement, genome_annotation=None):
-        """Given a probe statement and a genome annotation, yield a sequence of
-        AminoAcid probes matching the statement.
+    def parse(statement):
+        return _parse(statement)
+
+    @staticmethod
+    def explode(statement, genome_annotation=None, genome=None):
+        """Given a probe statement, a genome annotation and, optionally, a
+        reference genome, yield a sequence of AminoAcid probes matching the
+        statement.
+
+        The codon is located once for each transcript. If a genome is given,
+        the reference codon is read from it, and only the mutations of that
+        codon are returned; transcripts whose codon does not code for the
+        reference amino acid are skipped with a warning. Without a genome, a
+        probe is returned for every codon of the reference amino acid.
 
         If more than one probe has identical genomic coordinates, only the
         first is returned.
@@ -121,37 +164,158 @@ class AminoAcidProbe(AbstractProbe):
 
         reference_aa = specification['reference_aa'].upper()
         mutation_aa = specification['mutation_aa'].upper()
-        reference_codons = _DNA_CODON_TABLE[reference_aa]
         mutation_codons = _DNA_CODON_TABLE[mutation_aa]
 
         index = specification["index"]
 
         coordinate_cache = set()
-        for txt, reference, mutation in itertools.product(
-            transcripts, reference_codons, mutation_codons):
+        for txt in transcripts:
             try:
-                sequence_range_index = txt.codon_index(specification['index'])
+                sequence_range_index = txt.codon_index(index)
             except transcript.OutOfRange as error:
                 print("{} in statement: {!r}".format(error, statement),
                       file=sys.stderr)
+                continue
+            if genome is None:
+                reference_codons = _DNA_CODON_TABLE[reference_aa]
             else:
-                variant = variant_class(
-                    transcript=txt,
-                    index=sequence_range_index,
-                    reference=reference,
-                    mutation=mutation,
-                    length=specification["bases"])
-                if _AMINO_ACID_TABLE[mutation] != reference_aa:
-                    if (variant.index, reference, mutation) not in coordinate_cache:
-                        coordinate_cache.add((variant.index, reference, mutation))
-                        probe = AminoAcidProbe(
-                            variant=variant,
+                reference_codon = _reference_codon(
+                    sequence_range_index, txt, genome)
+                if reference_codon is None:
+                    continue
+                if _AMINO_ACID_TABLE.get(reference_codon) != reference_aa:
+                    print("Reference codon {!r} of transcript {!r} does not "
+                          "code for {!r} in statement: {!r}".format(
+                              reference_codon, txt.name, reference_aa,
+                              statement),
+                          file=sys.stderr)
+                    continue
+                reference_codons = (reference_codon,)
+            for reference, mutation in itertools.product(
+                    reference_codons, mutation_codons):
+                if _AMINO_ACID_TABLE[mutation] == reference_aa:
+                    continue
+                key = (sequence_range_index, reference, mutation)
+                if key not in coordinate_cache:
+                    coordinate_cache.add(key)
+                    probes.append(AminoAcidProbe(
+                        variant=variant_class(
+                            transcript=txt,
+                            index=sequence_range_index,
+                            reference=reference,
+                            mutation=mutation,
+                            length=specification["bases"]),
+                        index=index,
+                        comment=specification["comment"]))
+        return probes
+
+
+class AminoAcidSaturationProbe(AminoAcidProbe):
+    """Probe for every missense and nonsense mutation of the codons of a gene
+    (saturation mutagenesis).
+
+    The statement gives either every codon of the gene ('*all*') or a range of
+    codons, e.g.:
+
+        FOO: *all* /50
+        FOO: 100-250 * /50
+
+    The probes are the same as those of the amino acid statements 'FOO: P100X
+    /50', etc., where P is the reference amino acid of each codon.
+
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def parse(statement):
+        return _parse_saturation(statement)
+
+    @staticmethod
+    def explode(statement, genome_annotation=None, genome=None):
+        """Given a saturation statement, a genome annotation and a reference
+        genome, return a list of AminoAcid probes for every codon in the
+        statement.
+
+        The codon coordinates of each transcript are mapped once, and the
+        reference codon at each coordinate is read from the genome once.
+        Codons shared by several transcripts are only probed for the first.
+
+        Without a genome, the reference codons are unknown: a probe from the
+        reference codon 'NNN' to each of the 64 codons is returned for every
+        codon. This is an upper bound on the probes of the statement, for
+        checking and planning statements without the genome.
+
+        """
+        if genome_annotation is None:
+            genome_annotation = []
+
+        specification = _parse_saturation(statement)
+        transcripts = annotation.lookup_gene(
+            specification['gene'],
+            genome_annotation)
+
+        if specification["transcript_sequence"] == '':
+            variant_class = GenomeVariant
+        else:
+            variant_class = TranscriptVariant
+
+        probes = []
+        coordinate_cache = set()
+        for txt in transcripts:
+            codon_ranges = txt.codon_ranges()
+            first = specification['first']
+            last = specification['last']
+            if last is None:
+                last = len(codon_ranges)
+            elif last > len(codon_ranges):
+                print("Codon {} is outside the range of transcript {!r} in "
+                      "statement: {!r}".format(last, txt.name, statement),
+                      file=sys.stderr)
+            for index in range(first, min(last, len(codon_ranges)) + 1):
+                codon_range = codon_ranges[index-1]
+                if codon_range in coordinate_cache:
+                    continue
+                coordinate_cache.add(codon_range)
+                if genome is None:
+                    reference_codon, reference_aa = _UNKNOWN_CODON, None
+                else:
+                    reference_codon = _reference_codon(
+                        codon_range, txt, genome)
+                    if reference_codon not in _AMINO_ACID_TABLE:
+                        continue
+                    reference_aa = _AMINO_ACID_TABLE[reference_codon]
+                for mutation in _DNA_CODON_TABLE['X']:
+                    if _AMINO_ACID_TABLE[mutation] != reference_aa:
+                        probes.append(AminoAcidProbe(
+                            variant=variant_class(
+                                transcript=txt,
+                                index=codon_range,
+                                reference=reference_codon,
+                                mutation=mutation,
+                                length=specification["bases"]),
                             index=index,
-                            comment=specification["comment"])
-                        probes.append(probe)
+                            comment=specification["comment"]))
         return probes
 
 
+def _reference_codon(codon_range, txt, genome):
+    """Return the reference codon at `codon_range` (in upper case, read in the
+    direction of transcription of the transcript `txt`), or None if it is
+    not in the genome.
+
+    """
+    try:
+        return reference.bases(
+            SequenceRange(codon_range.chromosome,
+                          codon_range.start,
+                          codon_range.end,
+                          reverse_complement=not txt.plus_strand),
+            genome).upper()
+    except (NonFatalError, reference.NonContainedRange) as error:
+        print("Warning: {}".format(error), file=sys.stderr)
+        return None
+
+
 def _parse(statement):
     """Return a partial AminoAcidProbe given a probe statement.
 
@@ -178,3 +342,39 @@ def _parse(statement):
             "bases":               int(bases),
             "transcript_sequence": transcript_sequence,
             "comment":             comment}
+
+
+def _parse_saturation(statement):
+    """Return a partial AminoAcidSaturationProbe specification given a probe
+    statement. The 'last' codon is None if every codon is wanted.
+
+    Raises an InvalidStatement exception when the statement does not match the
+    format of a saturation statement.
+
+    """
+    match = _SATURATION_REGEX.match(statement)
+    if not match:
+        raise InvalidStatement
+
+    (gene,
+     every_codon,
+     first,
+     last,
+     transcript_sequence,
+     bases,
+     comment) = match.groups()
+
+    if every_codon:
+        first, last = 1, None
+    else:
+        first, last = int(first), int(last)
+        if not 1 <= first <= last:
+            raise InvalidStatement(
+                "Invalid codon range: {}-{}".format(first, last))
+
+    return {"gene":                gene,
+            "first":               first,
+            "last":                last,
+            "bases":               int(bases),
+            "transcript_sequence": transcript_sequence,
+            "comment":             comment}
@@ -49,13 +49,45 @@ def parse_ucsc_file(handle):
 
 
 def lookup_gene(gene_name, ucsc_file):
-    """Yield data for features in a `ucsc_file` for a specific gene.
+    """Return an iterator of the transcripts in a `ucsc_file` for a specific
+    gene.
 
     `ucsc_file` is an iterator of dictionaries giving the data from a UCSC gene
     file, as might be returned by `parse_ucsc_file`. Currently supported
     formats are given in the docstring of the `annotation` module.
 
+    If the `ucsc_file` is an AnnotationIndex, the transcripts are looked up in
+    the index rather than by scanning the whole annotation.
+
+    """
+    if isinstance(ucsc_file, AnnotationIndex):
+        return iter(ucsc_file.transcripts(gene_name))
+    return (transcript for transcript in ucsc_file
+            if transcript.gene_id == gene_name)
+
+
+class AnnotationIndex(object):
+    """An iterable of transcripts which can be looked up by gene name.
+
+    The transcripts of a gene are kept in the order in which they appear in
+    the annotation.
+
     """
-    for transcript in ucsc_file:
-        if transcript.gene_id == gene_name:
-            yield transcript
+    def __init__(self, transcripts):
+        self._transcripts = []
+        self._genes = {}
+        for transcript in transcripts:
+            self._transcripts.append(transcript)
+            self._genes.setdefault(transcript.gene_id, []).append(transcript)
+
+    def __iter__(self):
+        return iter(self._transcripts)
+
+    def __len__(self):
+        return len(self._transcripts)
+
+    def transcripts(self, gene_name):
+        """Return a list of the transcripts of a gene.
+
+        """
+        return self._genes.get(gene_name, [])
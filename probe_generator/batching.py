@@ -0,0 +1,165 @@
+"""Coalesce concurrent requests for probes into batches.
+
+A BatchingGenerator wraps a ProbeGenerator for use from asyncio code. Requests
+made while a batch is being processed are queued and run together as the next
+batch, in a worker thread, so that the event loop is never blocked and the
+cost of handing work to the worker is shared between requests:
+
+    batcher = BatchingGenerator(generator)
+    results = await batcher.generate(["FOO#exon[1]-5/BAR#exon[*]+5"])
+
+Each caller receives only the results of its own statements, and only the
+errors raised while generating them.
+
+"""
+import asyncio
+import concurrent.futures
+
+
+class BatchingGenerator(object):
+    """Generates probes in batches using a `session.ProbeGenerator`.
+
+    A batch is started as soon as the worker is free, with every request
+    queued by then (up to `max_batch` statements). If `max_delay` is given, a
+    batch waits up to that many seconds for more requests before starting,
+    which trades latency for larger batches.
+
+    The ProbeGenerator is only ever used by one worker thread at a time. If no
+    `executor` is given, one with a single thread is created, and shut down by
+    `close`.
+
+    """
+    def __init__(self, generator, *, max_batch=10000, max_delay=0,
+                 executor=None):
+        self.generator = generator
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batch_sizes = []
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='probe-worker')
+        self._executor = executor
+        self._queue = None
+        self._task = None
+
+    async def generate(self, statements):
+        """Return a list of `print_probes.GeneratedProbe` objects given an
+        iterable of probe statements (or a single statement as a string).
+
+        """
+        if isinstance(statements, str):
+            statements = [statements]
+        loop = asyncio.get_running_loop()
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._process_batches())
+        future = loop.create_future()
+        await self._queue.put((list(statements), future))
+        return await future
+
+    async def close(self):
+        """Stop processing batches and release the worker.
+
+        Requests which have not been started are cancelled.
+
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._task = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def _process_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batch_sizes.append(len(batch))
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._run_batch,
+                    [statements for statements, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for (_, future), (result, error) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+
+    async def _next_batch(self):
+        """Return a list of (statements, future) pairs of queued requests.
+
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_delay
+        while size < self.max_batch:
+            if not self._queue.empty():
+                request = self._queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(
+                        self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run_batch(self, requests):
+        """Return a list of (results, error) pairs for the requests of a batch:
+        the list of results of each request, or None and the exception raised
+        while generating them.
+
+        The statements of every request are generated by a single call to the
+        ProbeGenerator. Its results are assigned to the request whose
+        statement was read last, which relies on `generate` yielding the
+        results of each statement before reading the next. If the call
+        raises an exception, the requests are generated one at a time, so
+        that only the failing requests receive the error.
+
+        Runs in the worker thread.
+
+        """
+        outcomes = [([], None) for _ in requests]
+        current = [None]
+
+        def statements():
+            for number, request in enumerate(requests):
+                current[0] = number
+                yield from request
+
+        try:
+            for result in self.generator.generate(statements()):
+                outcomes[current[0]][0].append(result)
+        except Exception:
+            if len(requests) == 1:
+                raise
+            return [self._run_request(request) for request in requests]
+        return outcomes
+
+    def _run_request(self, statements):
+        """Return a (results, error) pair for a single request.
+
+        """
+        try:
+            return list(self.generator.generate(statements)), None
+        except Exception as error:
+            return None, error
@@ -0,0 +1,165 @@
+"""Probes for the structural variants in a BEDPE file.
+
+Each record gives a coordinate probe joining its two breakpoints: the BEDPE
+fields are converted directly into a CoordinateProbe specification, so the
+records are not written out as coordinate statements and parsed again.
+
+The strand of each side gives the orientation of the join. On either side, a
+'+' strand means that the bases to the left of the breakpoint (ending at the
+end of the interval) are joined, and a '-' strand that the bases to the right
+(starting at the start of the interval) are. A record with no strands is
+treated as a deletion: '+' on the first side and '-' on the second.
+
+The records are streamed, and the genome is read one chromosome at a time;
+only the chromosomes of the current record are held in memory. If the records
+are sorted by their first chromosome (as BEDPE files usually are), each first
+chromosome is only read once.
+
+"""
+import sys
+
+from probe_generator import reference
+from probe_generator.coordinate_probe import CoordinateProbe
+from probe_generator.exceptions import NonFatalError
+from probe_generator.print_probes import GeneratedProbe, print_fasta
+from probe_generator.probe import InvalidStatement
+from probe_generator.vcf import open_vcf
+
+_DEFAULT_STRANDS = ('+', '-')
+
+_BREAKPOINT_OPERATIONS = {
+    # BEDPE strand: the operation of the side of the probe and whether the
+    # breakpoint is at the start (rather than the end) of the interval.
+    '+': ('-', False),
+    '-': ('+', True),
+    }
+
+
+def print_bedpe_probes(bedpe_file, genome_file, bases, *, write=None,
+                       deduplicator=None):
+    """Print the probes of the structural variants in a BEDPE file (which may
+    be compressed with gzip) in FASTA format.
+
+    Probes are passed to the `write` function (`print_fasta` by default). If a
+    `deduplicator` is given (see the `dedup` module), probes are passed to its
+    `add` method instead. Warnings are printed to standard error.
+
+    """
+    if deduplicator is not None:
+        write = deduplicator.add
+    elif write is None:
+        write = print_fasta
+    with open_vcf(bedpe_file) as records, open(genome_file, 'rb') as genome:
+        for result in generate_bedpe_probes(
+                records, reference.IndexedGenome(genome), bases):
+            if result.error is None:
+                write(result.header, result.sequence)
+            elif result.probe is not None:
+                print("In probe: {}: {}".format(result.header, result.error),
+                      file=sys.stderr)
+            else:
+                print("Could not parse BEDPE record: {!r}".format(
+                    result.statement.rstrip('\n')),
+                      file=sys.stderr)
+    if deduplicator is not None:
+        deduplicator.flush()
+
+
+def generate_bedpe_probes(records, genome, bases):
+    """Return an iterator of GeneratedProbe objects given an iterable of the
+    lines of a BEDPE file, a `reference.IndexedGenome` and the length of the
+    probes.
+
+    Half of the bases of each probe (rounded down) are taken from the first
+    side of the join and the rest from the second.
+
+    Header, track and browser lines are skipped. Records which cannot be
+    parsed are reported by a GeneratedProbe with no probe and an
+    InvalidStatement error.
+
+    """
+    chromosomes = {}
+    for record in records:
+        if record.startswith(('#', 'track', 'browser')) or not record.strip():
+            continue
+        try:
+            probe = CoordinateProbe(_parse(record, bases))
+        except InvalidStatement as error:
+            yield GeneratedProbe(record, None, None, None, error)
+            continue
+        chromosomes = _load_chromosomes(
+            (probe._spec['chromosome1'], probe._spec['chromosome2']),
+            chromosomes,
+            genome)
+        sequences = {name: bases for name, bases in chromosomes.items()
+                     if bases is not None}
+        head = str(probe)
+        try:
+            sequence = probe.sequence(sequences)
+        except (NonFatalError, reference.NonContainedRange) as error:
+            yield GeneratedProbe(record, probe, head, None, error)
+        else:
+            yield GeneratedProbe(record, probe, head, sequence, None)
+
+
+def _load_chromosomes(names, loaded, genome):
+    """Return a dictionary of the sequences of the chromosomes `names`, reusing
+    those already `loaded` and reading the others from the genome.
+
+    The sequence of a chromosome which is not in the genome is None.
+
+    """
+    chromosomes = {}
+    for name in names:
+        if name in loaded:
+            chromosomes[name] = loaded[name]
+        elif name not in chromosomes:
+            try:
+                chromosomes[name] = genome.chromosome(name)
+            except reference.MissingChromosome:
+                chromosomes[name] = None
+    return chromosomes
+
+
+def _parse(record, bases):
+    """Return a CoordinateProbe specification given a BEDPE record and the
+    length of the probe.
+
+    The 'chr' prefix is removed from the chromosome names, and the name of the
+    record (if any) is used as the comment of the probe.
+
+    Raises an InvalidStatement exception when the record does not have the
+    first six columns of a BEDPE record, or the strands are not '+', '-' or
+    '.'.
+
+    """
+    fields = record.rstrip('\n').split('\t')
+    if len(fields) < 6:
+        raise InvalidStatement
+    chromosome1, start1, end1, chromosome2, start2, end2 = fields[:6]
+    if not all(field.isdigit() for field in (start1, end1, start2, end2)):
+        raise InvalidStatement
+    name = fields[6] if len(fields) > 6 else '.'
+    strands = tuple(fields[8:10])
+    if len(strands) < 2 or strands == ('.', '.'):
+        strands = _DEFAULT_STRANDS
+    if not all(strand in _BREAKPOINT_OPERATIONS for strand in strands):
+        raise InvalidStatement
+
+    operation1, at_start1 = _BREAKPOINT_OPERATIONS[strands[0]]
+    operation2, at_start2 = _BREAKPOINT_OPERATIONS[strands[1]]
+    index1 = int(start1) + 1 if at_start1 else int(end1)
+    index2 = int(start2) + 1 if at_start2 else int(end2)
+    return {'chromosome1': reference.chromosome_name(chromosome1),
+            'index1':      index1,
+            'last1':       index1,
+            'bases1':      bases // 2,
+            'operation1':  operation1,
+            'chromosome2': reference.chromosome_name(chromosome2),
+            'index2':      index2,
+            'last2':       index2,
+            'bases2':      bases - bases // 2,
+            'operation2':  operation2,
+            'rc_side_1':   operation1 == '+',
+            'rc_side_2':   operation2 == '-',
+            'comment':     '' if name == '.' else '_' + name}
@@ -0,0 +1,77 @@
+"""Provides the LruCache object.
+
+"""
+from collections import OrderedDict
+
+
+class LruCache(object):
+    """A mapping which discards the least-recently used entries when the total
+    size of its values exceeds `maxsize`.
+
+    By default every entry has a size of one, so `maxsize` is the maximum
+    number of entries. The optional `sizeof` function gives the size of a
+    value (e.g., `len` to budget the total length of cached strings).
+
+    The number of cache hits and misses seen by `get` are counted in the
+    `hits` and `misses` attributes.
+
+    """
+    def __init__(self, maxsize, *, sizeof=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof
+        self._size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the value cached for `key`, or `default` if there is none.
+
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Cache `value` under `key`, evicting the least-recently used entries
+        if the cache is over budget.
+
+        Values which are larger than the whole budget are not cached.
+
+        """
+        size = self._size_of(value)
+        if key in self._entries:
+            self._size -= self._size_of(self._entries.pop(key))
+        if size > self.maxsize:
+            return
+        self._entries[key] = value
+        self._size += size
+        while self._size > self.maxsize:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= self._size_of(evicted)
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counters.
+
+        """
+        self._entries.clear()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _size_of(self, value):
+        if self._sizeof is None:
+            return 1
+        else:
+            return self._sizeof(value)
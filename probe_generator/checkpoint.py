@@ -0,0 +1,175 @@
+"""Record the progress of a run so that it can be resumed if interrupted.
+
+A checkpoint file records how far through the statement file the run has got
+(as a byte offset) and how much output (and how much of the list of
+duplicates, if any) had been written at that point. These are recorded only
+after every probe of the statements before the offset has been written and
+flushed to disk, so a resumed run can safely discard any output after the
+recorded position and carry on from the recorded statement.
+
+The checkpoint is a small JSON file, replaced atomically every time it is
+saved.
+
+"""
+import json
+import os
+
+
+class Checkpoint(object):
+    """The progress of a run through a statement file.
+
+    Progress is saved to the file at `path` after every `every` statements and
+    at the end of the run.
+
+    """
+    def __init__(self, path, *, every=1000):
+        self.path = path
+        self.every = every
+        self.statement_offset = 0
+        self.output_offset = 0
+        self.duplicates_offset = 0
+        self.statements_done = 0
+        self.complete = False
+        self._output = None
+        self._duplicates = None
+
+    def load(self):
+        """Read the progress recorded by an earlier run.
+
+        If there is no checkpoint file the run starts from the beginning.
+
+        Raises an InvalidCheckpoint exception if the file cannot be read.
+
+        """
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except FileNotFoundError:
+            return
+        except ValueError as error:
+            raise InvalidCheckpoint(
+                "could not read checkpoint {!r}: {}".format(self.path, error))
+        try:
+            self.statement_offset = int(data['statement_offset'])
+            self.output_offset = int(data['output_offset'])
+            self.duplicates_offset = int(data['duplicates_offset'])
+            self.statements_done = int(data['statements_done'])
+            self.complete = bool(data['complete'])
+        except (KeyError, TypeError, ValueError) as error:
+            raise InvalidCheckpoint(
+                "could not read checkpoint {!r}: missing or invalid field "
+                "{}".format(self.path, error))
+
+    def open_output(self, output_file):
+        """Open the output file for writing and return the handle.
+
+        Output written after the recorded position by the interrupted run is
+        discarded; the rest is kept, and new output is appended to it.
+
+        """
+        self._output = _open_at(output_file, self.output_offset, 'output')
+        return self._output
+
+    def open_duplicates(self, duplicates_file):
+        """Open the file listing duplicate probes for writing and return the
+        handle.
+
+        As for `open_output`, lines written after the recorded position by the
+        interrupted run are discarded.
+
+        """
+        self._duplicates = _open_at(
+            duplicates_file, self.duplicates_offset, 'duplicates')
+        return self._duplicates
+
+    def statements(self, statement_file):
+        """Return an iterator of the statements in the file which have not
+        been completed, saving progress as they are.
+
+        A statement is complete when the next one is requested: the probes of
+        a statement must all have been written by then.
+
+        """
+        with open(statement_file, 'rb') as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < self.statement_offset:
+                raise InvalidCheckpoint(
+                    "the statement file {!r} is shorter ({} bytes) than "
+                    "recorded in the checkpoint ({} bytes)".format(
+                        statement_file, size, self.statement_offset))
+            handle.seek(self.statement_offset)
+            offset = self.statement_offset
+            for line in handle:
+                yield line.decode('utf-8')
+                offset += len(line)
+                self.statements_done += 1
+                if self.statements_done % self.every == 0:
+                    self.save(offset)
+            self.save(offset, complete=True)
+
+    def save(self, statement_offset, *, complete=False):
+        """Flush the output (and the list of duplicates) to disk and record
+        the progress of the run.
+
+        """
+        if self._output is not None:
+            self.output_offset = _sync(self._output)
+        if self._duplicates is not None:
+            self.duplicates_offset = _sync(self._duplicates)
+        self.statement_offset = statement_offset
+        self.complete = complete
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump({'statement_offset':  self.statement_offset,
+                       'output_offset':     self.output_offset,
+                       'duplicates_offset': self.duplicates_offset,
+                       'statements_done':   self.statements_done,
+                       'complete':          self.complete},
+                      handle,
+                      sort_keys=True)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self.path)
+
+
+def _open_at(path, offset, description):
+    """Open the file at `path` for appending after truncating it to `offset`
+    bytes, or for writing if `offset` is 0.
+
+    Raises an InvalidCheckpoint exception if the file is shorter than
+    `offset`. `description` names the file in the message.
+
+    """
+    if not offset:
+        return open(path, 'w')
+    size = os.path.getsize(path)
+    if size < offset:
+        raise InvalidCheckpoint(
+            "the {} file {!r} is shorter ({} bytes) than recorded in the "
+            "checkpoint ({} bytes)".format(description, path, size, offset))
+    os.truncate(path, offset)
+    return open(path, 'a')
+
+
+def _sync(handle):
+    """Flush the file `handle` to disk and return its position.
+
+    """
+    handle.flush()
+    os.fsync(handle.fileno())
+    return handle.tell()
+
+
+def read_fasta(handle):
+    """Return an iterator of (header, bases) pairs of the probes in a file
+    written by `print_probes.print_fasta`.
+
+    """
+    for head in handle:
+        yield head[1:].rstrip('\n'), next(handle).rstrip('\n')
+
+
+class InvalidCheckpoint(Exception):
+    """Raised when a run cannot be resumed from a checkpoint.
+
+    """
@@ -3,6 +3,7 @@
 """
 import re
 
+from probe_generator import reference, sequence
 from probe_generator.probe import AbstractProbe, InvalidStatement
 from probe_generator.sequence_range import SequenceRange
 
@@ -12,6 +13,11 @@ _COORDINATE = r"""
     \s*:\s*         # colon-separator
     (\d+)           # start
     \s*
+    (?:
+        ~\s*
+        (\d+)       # last breakpoint of a range
+        \s*
+    )?
     ([+-])          # side
     \s*
     (\d+)           # range
@@ -33,37 +39,46 @@ class CoordinateProbe(AbstractProbe):
 
         {
         'chromosome(1|2)': str
-        'start(1|2)':      int
-        'end(1|2)':        int
+        'index(1|2)':      int
+        'last(1|2)':       int
+        'bases(1|2)':      int
         'operation(1|2):   ('+' | '-')
         'rc_side_(1|2)':   bool
         'comment':         str
         }
 
-    'start' and 'end' values in the specification are 1-based inclusive ranges.
+    'index' and 'last' are the first and last breakpoints (1-based) of each
+    side. They are equal unless the statement gives a range of breakpoints,
+    in which case it is exploded into a CoordinateRangeProbe for every
+    combination of breakpoints.
 
     """
     _STATEMENT_SKELETON = ("{chromosome1}:{breakpoint1}/"
                            "{chromosome2}:{breakpoint2}"
                            "{comment}")
 
-    def __init__(self, specification):
-        """At init time, the start, end, and breakpoints are calculated and
-        added to the specification.
+    __slots__ = ('_spec',)
 
-        The start and end values are passed internally to SequenceRange
-        objects, while the breakpoints are reported in the string value of the
-        probe.
+    def __init__(self, specification):
+        """The start and end values are passed internally to SequenceRange
+        objects, while the breakpoints are calculated when the probe is
+        converted to a string.
 
         """
         # TODO: Remove need for a specification
-        breakpoint1, breakpoint2     = _get_breakpoints(specification)
-        specification['breakpoint1'] = breakpoint1
-        specification['breakpoint2'] = breakpoint2
         self._spec = specification
 
     def __str__(self):
-        return self._STATEMENT_SKELETON.format(**self._spec)
+        breakpoint1, breakpoint2 = _get_breakpoints(
+            self._spec, *self._indices())
+        return self._STATEMENT_SKELETON.format(
+            breakpoint1=breakpoint1,
+            breakpoint2=breakpoint2,
+            **self._spec)
+
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
 
     @staticmethod
     def explode(statement, genome_annotation=None):
@@ -72,15 +87,27 @@ class CoordinateProbe(AbstractProbe):
                 "CoordinateProbe.explode does not take a genome_annotation")
 
         specification = _parse(statement)
-        return [CoordinateProbe(specification)]
+        if (specification['index1'] == specification['last1'] and
+                specification['index2'] == specification['last2']):
+            return [CoordinateProbe(specification)]
+        flank1 = BreakpointFlank(specification, 1)
+        flank2 = BreakpointFlank(specification, 2)
+        return [CoordinateRangeProbe(specification,
+                                     index1=index1,
+                                     index2=index2,
+                                     flank1=flank1,
+                                     flank2=flank2)
+                for index1 in flank1.indices()
+                for index2 in flank2.indices()]
 
     def get_ranges(self):
+        index1, index2 = self._indices()
         start1, end1 = _parse_range(
-            self._spec['index1'],
+            index1,
             self._spec['operation1'],
             self._spec['bases1'])
         start2, end2 = _parse_range(
-            self._spec['index2'],
+            index2,
             self._spec['operation2'],
             self._spec['bases2'])
         return (
@@ -95,6 +122,90 @@ class CoordinateProbe(AbstractProbe):
                 end2,
                 reverse_complement=self._spec['rc_side_2']))
 
+    def _indices(self):
+        """Return the breakpoint indices of the probe.
+
+        """
+        return self._spec['index1'], self._spec['index2']
+
+
+class CoordinateRangeProbe(CoordinateProbe):
+    """A probe for one combination of breakpoints of a coordinate statement
+    giving a range of breakpoints on either side, e.g.:
+
+        1:100~120-25/Y:200~210+25
+
+    The probes of a statement share a BreakpointFlank for each side, so the
+    bases around each range of breakpoints are read from the genome once and
+    each half-probe is a slice of them.
+
+    """
+    __slots__ = ('index1', 'index2', 'flank1', 'flank2')
+
+    def __init__(self, specification, *, index1, index2, flank1, flank2):
+        super().__init__(specification)
+        self.index1 = index1
+        self.index2 = index2
+        self.flank1 = flank1
+        self.flank2 = flank2
+
+    def sequence(self, genome, *, spliced_sequences=None):
+        """Return the sequence of the probe given a reference genome.
+
+        Raises a MissingChromosome exception (non-fatal) when the chromosome is
+        not present in the reference genome, and a NonContainedRange error
+        (fatal) when the bases around a range of breakpoints fall outside the
+        chromosome.
+
+        """
+        return (self.flank1.bases(self.index1, genome) +
+                self.flank2.bases(self.index2, genome))
+
+    def _indices(self):
+        return self.index1, self.index2
+
+
+class BreakpointFlank(object):
+    """The bases of one side of a coordinate statement, covering the
+    half-probes of all of the breakpoints in its range.
+
+    """
+    def __init__(self, specification, side):
+        self.chromosome = specification['chromosome{}'.format(side)]
+        self.first = specification['index{}'.format(side)]
+        self.last = specification['last{}'.format(side)]
+        self.operation = specification['operation{}'.format(side)]
+        self.length = specification['bases{}'.format(side)]
+        self.reverse_complement = specification['rc_side_{}'.format(side)]
+        self.start, _ = _parse_range(self.first, self.operation, self.length)
+        _, self.end = _parse_range(self.last, self.operation, self.length)
+        self._genome = None
+        self._bases = None
+
+    def indices(self):
+        """Return the breakpoints of the range.
+
+        """
+        return range(self.first, self.last+1)
+
+    def bases(self, index, genome):
+        """Return the bases of the half-probe at the breakpoint `index` given
+        a reference genome.
+
+        The bases of the whole range are only fetched from the genome once.
+
+        """
+        if self._genome is not genome:
+            self._bases = reference.bases(
+                SequenceRange(self.chromosome, self.start, self.end), genome)
+            self._genome = genome
+        start, end = _parse_range(index, self.operation, self.length)
+        bases = self._bases[start-self.start:end-self.start]
+        if self.reverse_complement:
+            return sequence.reverse_complement(bases)
+        return bases
+
+
 def _parse(statement):
     """Return a coordinate specification from a statement.
 
@@ -106,20 +217,31 @@ def _parse(statement):
                     statement))
     (chr_1,
      start_1,
+     last_1,
      operation_1,
      bases_1,
      chr_2,
      start_2,
+     last_2,
      operation_2,
      bases_2,
      comment) = match.groups()
 
+    last_1 = start_1 if last_1 is None else last_1
+    last_2 = start_2 if last_2 is None else last_2
+    if int(last_1) < int(start_1) or int(last_2) < int(start_2):
+        raise InvalidStatement(
+                "invalid breakpoint range in coordinate statement {!r}".format(
+                    statement))
+
     return {'chromosome1': chr_1,
             'index1':      int(start_1),
+            'last1':       int(last_1),
             'bases1':      int(bases_1),
             'operation1':  operation_1,
             'chromosome2': chr_2,
             'index2':      int(start_2),
+            'last2':       int(last_2),
             'bases2':      int(bases_2),
             'operation2':  operation_2,
             'rc_side_1':   operation_1 == '+', # 'rc' == reverse complement
@@ -138,15 +260,16 @@ def _parse_range(index, operation, bases):
         return (index-bases, index)
 
 
-def _get_breakpoints(specification):
-    """Given a coordinate probe specification, return the breakpoints.
+def _get_breakpoints(specification, index1, index2):
+    """Given a coordinate probe specification and the breakpoint indices of a
+    probe, return the breakpoints.
 
     """
-    return (_get_breakpoint(specification['index1'],
+    return (_get_breakpoint(index1,
                             specification['operation1'],
                             specification['bases1'],
                             is_left=True),
-            _get_breakpoint(specification['index2'],
+            _get_breakpoint(index2,
                             specification['operation2'],
                             specification['bases2'],
                             is_left=False))
@@ -0,0 +1,183 @@
+"""Remove duplicate probe sequences across a whole run.
+
+Two probes are duplicates when their sequences are identical on either strand
+(i.e., when one is the reverse-complement of the other). Case is not
+significant.
+
+"""
+import hashlib
+import math
+from collections import OrderedDict
+
+from probe_generator import sequence
+from probe_generator.cache import LruCache
+
+MERGED_HEADER_SEPARATOR = '|'
+
+DEFAULT_WINDOW = 100000 # unique probes checked exactly with a Bloom filter
+
+BLOOM_ONLY = '*' # Printed in the duplicates file in place of the header of the
+                 # original probe when the original has been forgotten.
+
+
+class Deduplicator(object):
+    """Pass probes to a `write` function, skipping those whose sequences have
+    already been seen.
+
+    `write` is called with the header and bases of every unique probe (e.g.,
+    `print_probes.print_fasta`).
+
+    If `merge` is True, the headers of the duplicates of a probe are appended
+    to its own header. This means holding every probe until `flush` is called.
+
+    If `duplicates` is a file handle, one line is written to it for every
+    duplicate probe: the header of the duplicate and the header of the probe it
+    duplicates, separated by a tab.
+
+    If a `window` is given, memory use is bounded: only the last `window`
+    unique probes are remembered exactly. A sequence which is not in the
+    window is written, so a duplicate of a probe which has left the window is
+    not removed.
+
+    If a `capacity` is given, sequences are also checked against a Bloom filter
+    sized for `capacity` unique probes (with a window of DEFAULT_WINDOW probes
+    if no `window` is given), and a sequence found in the Bloom filter but not
+    in the window is treated as a duplicate. This removes duplicates however
+    far apart they are, but is lossy: roughly one unique probe in
+    1/`error_rate` may be dropped once more than `window` probes have been
+    seen. Such probes are listed in the `duplicates` file with '*' in place of
+    the original header.
+
+    """
+    def __init__(self, write, *, merge=False, duplicates=None,
+                 window=None, capacity=None, error_rate=0.001):
+        if merge and (window is not None or capacity is not None):
+            raise ValueError(
+                "merging duplicate headers requires every probe to be held "
+                "in memory, so it cannot be used with a bounded window or "
+                "capacity")
+        if capacity is not None and window is None:
+            window = DEFAULT_WINDOW
+        self.duplicate_count = 0
+        self._write = write
+        self._merge = merge
+        self._duplicates = duplicates
+        self._bounded = window is not None
+        if self._bounded:
+            self._seen = LruCache(window)
+        else:
+            self._seen = OrderedDict()
+        if capacity is None:
+            self._bloom_filter = None
+        else:
+            self._bloom_filter = BloomFilter(capacity, error_rate)
+
+    def add(self, head, bases):
+        """Write the probe unless its sequence has already been seen.
+
+        Returns True if the probe is unique.
+
+        """
+        head = str(head)
+        key = sequence_key(bases)
+        original = self._lookup(key)
+        if original is None:
+            self._remember(key, head, bases)
+            return True
+        self.duplicate_count += 1
+        if self._merge:
+            original[0].append(head)
+        if self._duplicates is not None:
+            print("{}\t{}".format(head, original[0][0]),
+                  file=self._duplicates)
+        return False
+
+    def seen(self, head, bases):
+        """Record a probe which has already been written (e.g., by an earlier
+        run which is being resumed) without writing it again.
+
+        Probes held back to merge their headers are written by `flush`, so
+        this should not be used when `merge` is True.
+
+        """
+        key = sequence_key(bases)
+        if self._lookup(key) is None:
+            self._remember(key, str(head), bases, write=False)
+
+    def flush(self):
+        """Write the probes held back to merge their headers.
+
+        """
+        if self._merge:
+            for heads, bases in self._seen.values():
+                self._write(MERGED_HEADER_SEPARATOR.join(heads), bases)
+            self._seen.clear()
+
+    def _lookup(self, key):
+        """Return the [[header...], bases] record of the probe with the
+        sequence `key`, or None if the sequence has not been seen.
+
+        """
+        if self._bloom_filter is None or key not in self._bloom_filter:
+            return self._seen.get(key)
+        else:
+            return self._seen.get(key, [[BLOOM_ONLY], None])
+
+    def _remember(self, key, head, bases, *, write=True):
+        if self._bloom_filter is not None:
+            self._bloom_filter.add(key)
+        if self._merge:
+            self._seen[key] = [[head], bases]
+            return
+        elif self._bounded:
+            self._seen.put(key, [[head], None])
+        else:
+            self._seen[key] = [[head], None]
+        if write:
+            self._write(head, bases)
+
+
+class BloomFilter(object):
+    """A fixed-size set of byte strings which may give false positives at a
+    rate of about `error_rate` once `capacity` items have been added.
+
+    Items are expected to be hash digests (e.g., from `sequence_key`), which
+    are split to give the bit positions.
+
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self._size = max(8, int(math.ceil(bits)))
+        self._hash_count = max(1, int(round(
+            self._size / capacity * math.log(2))))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def __contains__(self, item):
+        return all(self._bits[position // 8] & (1 << (position % 8))
+                   for position in self._positions(item))
+
+    def add(self, item):
+        """Add the `item` to the filter.
+
+        """
+        for position in self._positions(item):
+            self._bits[position // 8] |= 1 << (position % 8)
+
+    def _positions(self, item):
+        """Return the bit positions of an item by double hashing.
+
+        """
+        first = int.from_bytes(item[:8], 'little')
+        second = int.from_bytes(item[8:16], 'little') | 1
+        return [(first + i * second) % self._size
+                for i in range(self._hash_count)]
+
+
+def sequence_key(bases):
+    """Return a hash digest identifying the sequence of `bases` regardless of
+    strand or case.
+
+    """
+    forward = bases.upper()
+    canonical = min(forward, sequence.reverse_complement(forward))
+    return hashlib.md5(canonical.encode('ascii')).digest()
@@ -4,6 +4,7 @@
 import itertools
 import re
 import sys
+from collections import OrderedDict, namedtuple
 
 from probe_generator import annotation, transcript
 from probe_generator.probe import AbstractProbe, InvalidStatement
@@ -51,12 +52,70 @@ class ExonProbe(AbstractProbe):
             "_{transcript1}_{transcript2}"
             "{comment}")
 
-    def __init__(self, specification, *transcripts):
-        self._spec = specification
-        self._rows = transcripts
+    __slots__ = ('_partial', '_side1', '_side2', '_left', '_right')
+
+    def __init__(self, partial_specification, side1, side2, left, right):
+        """`partial_specification` is the specification parsed from the
+        statement, which is shared by all of its probes; `left` and `right`
+        are the UniqueExons on each side of the probe.
+
+        """
+        self._partial = partial_specification
+        self._side1 = side1
+        self._side2 = side2
+        self._left = left
+        self._right = right
 
     def __str__(self):
-        return self._STATEMENT_SKELETON.format(**self._spec)
+        breakpoint1, breakpoint2 = self._breakpoints()
+        return self._STATEMENT_SKELETON.format(
+            gene1=self._partial['gene1'],
+            exon1=self._left.number,
+            side1=self._side1,
+            bases1=self._partial['bases1'],
+            separator=self._partial['separator'],
+            gene2=self._partial['gene2'],
+            exon2=self._right.number,
+            side2=self._side2,
+            bases2=self._partial['bases2'],
+            breakpoint1=breakpoint1,
+            breakpoint2=breakpoint2,
+            transcript1=self._left.transcripts[0],
+            transcript2=self._right.transcripts[0],
+            comment=self._partial['comment'])
+
+    @property
+    def _spec(self):
+        """The full specification of the probe as a dictionary.
+
+        """
+        breakpoint1, breakpoint2 = self._breakpoints()
+        return dict(self._partial,
+                    side1=self._side1,
+                    side2=self._side2,
+                    exon1=self._left.number,
+                    exon2=self._right.number,
+                    transcript1=self._left.transcripts[0],
+                    transcript2=self._right.transcripts[0],
+                    transcripts1=self._left.transcripts,
+                    transcripts2=self._right.transcripts,
+                    strand1=self._left.strand,
+                    strand2=self._right.strand,
+                    exon_range_1=self._left.exon_range,
+                    exon_range_2=self._right.exon_range,
+                    chromosome1=self._left.exon_range.chromosome,
+                    chromosome2=self._right.exon_range.chromosome,
+                    breakpoint1=breakpoint1,
+                    breakpoint2=breakpoint2)
+
+    def _breakpoints(self):
+        """Return the breakpoint strings ("chromosome:index") of the probe.
+
+        """
+        return (_breakpoint(self._left.exon_range, self._side1,
+                            self._left.strand, left=True),
+                _breakpoint(self._right.exon_range, self._side2,
+                            self._right.strand, left=False))
 
     def get_ranges(self):
         """Return the sequence ranges for an exon probe.
@@ -87,14 +146,14 @@ class ExonProbe(AbstractProbe):
                     ====|<----
 
         """
-        chromosome1 = self._spec["chromosome1"]
-        chromosome2 = self._spec["chromosome2"]
-        strand1     = self._spec["strand1"]
-        strand2     = self._spec["strand2"]
-        side1       = self._spec["side1"]
-        side2       = self._spec["side2"]
+        chromosome1 = self._left.exon_range.chromosome
+        chromosome2 = self._right.exon_range.chromosome
+        strand1     = self._left.strand
+        strand2     = self._right.strand
+        side1       = self._side1
+        side2       = self._side2
         start1, end1, start2, end2 = self._get_ranges()
-        if self._spec['separator'] == '->' and self._spec['strand1'] == '-':
+        if self._partial['separator'] == '->' and self._left.strand == '-':
             start1, start2           = start2, start1
             end1, end2               = end2, end1
             chromosome1, chromosome2 = chromosome2, chromosome1
@@ -117,6 +176,10 @@ class ExonProbe(AbstractProbe):
                 ),
             )
 
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
+
     @staticmethod
     def explode(statement, genome_annotation=None):
         """Given an exon probe statement and a genome annotation return all
@@ -130,16 +193,15 @@ class ExonProbe(AbstractProbe):
 
         if genome_annotation is None:
             genome_annotation = []
-        cached_specifications = set()
+        cached_coordinates = set()
         partial_spec = _parse(statement)
-        for spec in _expand(partial_spec, genome_annotation):
-            spec_hash = _coord_hash(spec)
-            if not spec_hash in cached_specifications:
-                cached_specifications.add(spec_hash)
-                breakpoint1, breakpoint2 = _get_breakpoints(spec)
-                probes.append(ExonProbe(dict(spec,
-                                             breakpoint1=breakpoint1,
-                                             breakpoint2=breakpoint2)))
+        for side1, side2, left, right in _expand(partial_spec,
+                                                 genome_annotation):
+            coordinates = (left.exon_range, side1, right.exon_range, side2)
+            if not coordinates in cached_coordinates:
+                cached_coordinates.add(coordinates)
+                probes.append(
+                    ExonProbe(partial_spec, side1, side2, left, right))
         return probes
 
     def _get_ranges(self):
@@ -148,15 +210,15 @@ class ExonProbe(AbstractProbe):
 
         """
         left_range = _get_range(
-            self._spec["exon_range_1"],
-            self._spec["side1"],
-            self._spec["strand1"],
-            self._spec["bases1"])
+            self._left.exon_range,
+            self._side1,
+            self._left.strand,
+            self._partial["bases1"])
         right_range = _get_range(
-            self._spec["exon_range_2"],
-            self._spec["side2"],
-            self._spec["strand2"],
-            self._spec["bases2"])
+            self._right.exon_range,
+            self._side2,
+            self._right.strand,
+            self._partial["bases2"])
         return left_range + right_range
 
 
@@ -219,105 +281,102 @@ def _parse(probe_statement):
 
 
 def _expand(specification, genome_annotation):
-    """Populate the specification using the values looked up in the
-    genome annotation.
+    """Return an iterator of the (side1, side2, left exon, right exon) tuples
+    matching a partial specification, looking the exons up in the genome
+    annotation.
 
-    If expanding the specification asks for a feature which is not in
-    the annotation, a warning message is printed to standard error.
+    The specification is expanded over the UniqueExons of each gene rather
+    than over every transcript: an exon shared by several transcripts of a
+    gene gives only one probe. The first of the transcripts sharing each exon
+    is used in the name of the probe.
+
+    The tuples are in the order of the probes of the transcripts: for each
+    pair of left and right transcripts, in the order of the annotation, the
+    globbed sides and then the exons which first appear in those transcripts.
 
     If expanding the specification asks for a feature which is not in
     the annotation, a warning message is printed to standard error.
 
     """
-    left_rows = annotation.lookup_gene(
-            specification['gene1'], genome_annotation)
-    right_rows = annotation.lookup_gene(
-            specification['gene2'], genome_annotation)
-    for left, right in itertools.product(left_rows, right_rows):
-        unglobbed_specs = _expand_globs(
-                specification,
-                len(left.exons()),
-                len(left.exons()))
-        for unglobbed_spec in unglobbed_specs:
-            try:
-                yield _expand_partial_spec(unglobbed_spec, left, right)
-            except transcript.NoFeature as error:
-                print("Warning: {!s}".format(error), file=sys.stderr)
+    left_exons = unique_exons(
+        annotation.lookup_gene(specification['gene1'], genome_annotation),
+        specification['exon1'])
+    if not left_exons:
+        return
+    right_exons = unique_exons(
+        annotation.lookup_gene(specification['gene2'], genome_annotation),
+        specification['exon2'])
+    for left_group, right_group in itertools.product(
+            _by_first_transcript(left_exons),
+            _by_first_transcript(right_exons)):
+        yield from itertools.product(
+            _sides(specification['side1']),
+            _sides(specification['side2']),
+            left_group,
+            right_group)
+
+
+class UniqueExon(namedtuple("UniqueExon",
+                            ["number", "exon_range", "strand",
+                             "transcripts"])):
+    """An exon of a gene, and the names of the transcripts which share it.
+
+    `number` is the index of the exon in the first of the transcripts.
+
+    """
+    __slots__ = ()
 
 
-def _expand_globs(specification, left_exons=None, right_exons=None):
-    """Yield fully-realized probe statements.
+def unique_exons(rows, exon_number):
+    """Return a list of the UniqueExons of the transcripts in `rows`, in order
+    of appearance.
 
-    Given a probe_statement with globs, iterate through all the possible
-    interpretations of that statement.
+    Only the exon `exon_number` of each transcript is used, or every exon if
+    `exon_number` is '*'. Exons are the same if they have the same coordinates
+    and strand.
 
-    `left_features` and `right_features` are the the total number of features
-    expected in specification['feature1'] and specification['feature2'],
-    respectively. These arguments must be specified when expanding a
-    specification with the feature number globbed.
+    If a transcript does not have exon `exon_number`, a warning is printed to
+    standard error.
 
-    Fully realized probe statements may have a glob value for 'bases'.
+    """
+    exons = OrderedDict()
+    for row in rows:
+        strand = '+' if row.plus_strand else '-'
+        if exon_number == '*':
+            numbered_exons = enumerate(row.exons(), 1)
+        else:
+            try:
+                numbered_exons = [(exon_number, row.exon(exon_number))]
+            except transcript.NoFeature as error:
+                print("Warning: {!s}".format(error), file=sys.stderr)
+                continue
+        for number, exon_range in numbered_exons:
+            key = (exon_range, strand)
+            if key in exons:
+                exons[key].transcripts.append(row.name)
+            else:
+                exons[key] = UniqueExon(number, exon_range, strand, [row.name])
+    return list(exons.values())
 
-    If the statement has no globs, return a generator containing only that
-    statement.
 
-    Raises an ExpandError if the number of features is unspecified
-    when the feature number is globbed.
+def _by_first_transcript(exons):
+    """Return a list of the lists of consecutive UniqueExons which first
+    appear in the same transcript.
 
     """
-    fields = [] # Globbed fields
-    values = [] # Possible values for globbed fields
-
-    if specification['side1'] == '*':
-        fields.append('side1')
-        values.append(('+', '-'))
-    if specification['side2'] == '*':
-        fields.append('side2')
-        values.append(('+', '-'))
-
-    exon_number_1 = specification['exon1']
-    exon_number_2 = specification['exon2']
-
-    if exon_number_1 == '*':
-        if left_exons is None:
-            raise ExpandError(
-                    "number of exons must be specified "
-                    "when exon number is globbed")
-        fields.append('exon1')
-        values.append(n+1 for n in range(left_exons))
-    if exon_number_2 == '*':
-        if right_exons is None:
-            raise ExpandError(
-                    "number of exons must be specified "
-                    "when exon number is globbed")
-        fields.append('exon2')
-        values.append(n+1 for n in range(right_exons))
-
-    if fields:
-        for parameters in itertools.product(*values):
-            new_parameters = dict(zip(fields, parameters))
-            yield dict(specification, **new_parameters)
-    else:
-        yield specification
+    return [list(group) for _, group in itertools.groupby(
+        exons, key=lambda exon: exon.transcripts[0])]
 
 
-def _expand_partial_spec(specification, row_1, row_2):
-    """Given a partial specification with no globs, add the unique transcript
-    identifiers and the coordinates of the probe to the specification.
+def _sides(side):
+    """Return the sides of an exon given the side in a specification, which
+    may be globbed.
 
     """
-    first_exon  = specification['exon1']
-    second_exon = specification['exon2']
-    return dict(specification,
-                transcript1=row_1.name,
-                transcript2=row_2.name,
-                strand1='+' if row_1.plus_strand else '-',
-                strand2='+' if row_2.plus_strand else '-',
-                exon_range_1=row_1.exon(first_exon),
-                exon_range_2=row_2.exon(second_exon),
-                chromosome1=row_1.chromosome,
-                chromosome2=row_2.chromosome,
-                )
+    if side == '*':
+        return ('+', '-')
+    else:
+        return (side,)
 
 
 def _maybe_int(string):
@@ -330,41 +389,44 @@ def _maybe_int(string):
         return string
 
 
-def _coord_hash(spec):
-    """Return a unique specification identifier.
+def _breakpoint(exon_range, side, strand, *, left):
+    """Return the breakpoint string ("chromosome:index") of one side of a
+    probe. `left` is True for the exon on the left of the statement.
 
     """
-    return hash(tuple([
-        spec['chromosome1'], spec['exon_range_1'], spec['side1'],
-        spec['chromosome2'], spec['exon_range_2'], spec['side2']]))
+    chromosome, start, end, _, _ = exon_range
+    if left:
+        index = start - 1 if side == strand else end
+    else:
+        index = start     if side == strand else end - 1
+    return "{}:{}".format(chromosome, index)
+
 
+def junction_window(exon, side, bases, *, left):
+    """Return a tuple of the SequenceRange of the `bases` bases at the `side`
+    of a UniqueExon, read in the direction of transcription, and the
+    breakpoint string of a probe on that side of the exon.
 
-def _get_breakpoints(spec):
-    """Return the breakpoint strings ("chromosome:index") of a probe given a
-    specification.
+    `left` is True if the exon is on the left of a probe statement.
 
     """
-    chromosome1, start1, end1, _, _ = spec['exon_range_1']
-    chromosome2, start2, end2, _, _ = spec['exon_range_2']
-    index1 = start1 - 1 if spec['side1'] == spec['strand1'] else end1
-    index2 = start2     if spec['side2'] == spec['strand2'] else end2 - 1
-    return ("{}:{}".format(chromosome1, index1),
-            "{}:{}".format(chromosome2, index2))
+    start, end = _get_range(exon.exon_range, side, exon.strand, bases)
+    return (SequenceRange(exon.exon_range.chromosome, start, end,
+                          reverse_complement=(exon.strand == '-')),
+            _breakpoint(exon.exon_range, side, exon.strand, left=left))
 
 
 def _get_range(exon_range, side, strand, bases):
     """Return the start and end of the base pair range, given the exon, the
     start of the exon requested, and the number of base pairs.
 
+    If `bases` is '*', the range is the whole exon.
+
     """
     _, start, end, _, _ = exon_range
-    if (side == '+') == (strand == '+'):
+    if bases == '*':
+        return (start, end)
+    elif (side == '+') == (strand == '+'):
         return (start, start + bases)
     else:
         return (end - bases, end)
-
-
-class ExpandError(Exception):
-    """Raised when `expand` has insufficient information to complete.
-
-    """
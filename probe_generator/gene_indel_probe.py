@@ -41,6 +41,8 @@ class GeneIndelProbe(AbstractProbe):
                            "{transcript_name}_{chromosome}:{index_base}"
                            "{comment}")
 
+    __slots__ = ('variant', 'index', 'comment')
+
     def __init__(self, *, variant, index, comment):
         self.variant = variant
         self.index = index
@@ -68,6 +70,10 @@ class GeneIndelProbe(AbstractProbe):
     def get_ranges(self):
         return self.variant.sequence_ranges()
 
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
+
     @staticmethod
     def explode(statement, genome_annotation=None):
         probes = []
@@ -43,6 +43,8 @@ class GeneSnpProbe(AbstractProbe):
                            "{transcript_sequence}/{bases}_{transcript_name}_"
                            "{chromosome}:{index_base}{comment}")
 
+    __slots__ = ('variant', 'index', 'comment')
+
     def __init__(self, *, variant, index, comment):
         self.variant = variant
         self.index = index
@@ -64,6 +66,10 @@ class GeneSnpProbe(AbstractProbe):
     def get_ranges(self):
         return self.variant.sequence_ranges()
 
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
+
     @staticmethod
     def explode(statement, genome_annotation=None):
         """Given a gene SNP probe statement, return all the probes which match
@@ -0,0 +1,338 @@
+"""Count the k-mers of a reference genome, to score the specificity of probes.
+
+An index file holds the number of times each k-mer occurs in the genome (on
+either strand). Each k-mer is encoded in two bits per base and stored as its
+canonical code: the smaller of the codes of the k-mer and its reverse
+complement. The file contains:
+
+    magic number  8 bytes  b'PGKMER1\\n'
+    k             8 bytes  unsigned integer
+    n             8 bytes  unsigned integer, the number of distinct k-mers
+    codes         8n bytes unsigned integers, in ascending order
+    counts        4n bytes unsigned integers (capped at 2**32-1)
+
+Integers are in the native byte order. The index is memory-mapped when it is
+read, so only the pages needed to look up the k-mers of the probes are loaded.
+
+The specificity score of a probe is the highest count of any of its k-mers:
+a score of 1 means that no part of the probe is repeated in the genome.
+
+The index is built in chunks of CHUNK_BASES bases of each chromosome: the
+sorted, distinct k-mers of each chunk and their counts are spilled to a
+temporary file next to the index, and the files are then combined with a
+streaming k-way merge, so only one chromosome and the counts of one chunk are
+held in memory at a time. The k-mers of each chunk are encoded with numpy, if
+it is installed; otherwise a (much slower) pure-Python encoder is used, which
+is refused for genome files of more than PURE_PYTHON_MAX_SIZE bytes.
+
+"""
+import array
+import bisect
+import collections
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from probe_generator import reference
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b'PGKMER1\n'
+
+MAX_K = 32 # k-mers are encoded in 64 bits
+
+CHUNK_BASES = 2**25 # bases of a chromosome counted at a time
+
+PURE_PYTHON_MAX_SIZE = 2**27 # bytes of genome file
+
+_HEADER = struct.Struct('=8sQQ')
+
+_BLOCK = 2**16 # codes read or written at a time when merging
+
+_MAX_COUNT = 2**32 - 1
+
+_BASE_CODES = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+
+class KmerIndex(object):
+    """A memory-mapped index of the k-mer counts of a genome.
+
+    Use as a context manager to close the index file:
+
+        with KmerIndex(path) as index:
+            index.score(bases)
+
+    Raises an InvalidKmerIndex exception if the file is not a k-mer index.
+
+    """
+    def __init__(self, path):
+        self._handle = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(
+                self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # empty file
+            self._handle.close()
+            raise InvalidKmerIndex("{!r} is not a k-mer index".format(path))
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise InvalidKmerIndex("{!r} is not a k-mer index".format(path))
+        magic, self.k, size = _HEADER.unpack_from(self._map)
+        codes_end = _HEADER.size + 8*size
+        if magic != MAGIC or len(self._map) != codes_end + 4*size:
+            self.close()
+            raise InvalidKmerIndex("{!r} is not a k-mer index".format(path))
+        view = memoryview(self._map)
+        self._codes = view[_HEADER.size:codes_end].cast('Q')
+        self._counts = view[codes_end:].cast('I')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._codes)
+
+    def close(self):
+        """Close the index file.
+
+        """
+        for attribute in ('_codes', '_counts'):
+            if hasattr(self, attribute):
+                getattr(self, attribute).release()
+        self._map.close()
+        self._handle.close()
+
+    def count(self, code):
+        """Return the number of times the k-mer with the canonical `code`
+        occurs in the genome.
+
+        """
+        position = bisect.bisect_left(self._codes, code)
+        if position < len(self._codes) and self._codes[position] == code:
+            return self._counts[position]
+        return 0
+
+    def counts(self, bases):
+        """Return a list of the genome counts of the k-mers of a sequence.
+        K-mers with bases other than A, C, G and T are skipped.
+
+        """
+        return [self.count(code) for code in encode_kmers(bases, self.k)]
+
+    def score(self, bases):
+        """Return the specificity score of a sequence: the highest genome count
+        of any of its k-mers, or 0 if it has none.
+
+        """
+        return max(self.counts(bases), default=0)
+
+
+class KmerScorer(object):
+    """Adds the specificity score of each probe to its header before passing
+    it to a `write` function.
+
+    If `max_count` is given, probes scoring more than `max_count` are omitted
+    with a warning.
+
+    """
+    def __init__(self, index, write, *, max_count=None):
+        self.index = index
+        self._write = write
+        self.max_count = max_count
+
+    def __call__(self, head, bases):
+        score = self.index.score(bases)
+        if self.max_count is not None and score > self.max_count:
+            print("Omitting probe {}: a {}-mer occurs {} times in the "
+                  "genome".format(head, self.index.k, score),
+                  file=sys.stderr)
+            return
+        self._write("{} kmer_count={}".format(head, score), bases)
+
+
+def encode_kmers(bases, k):
+    """Return an iterator of the canonical codes of the k-mers of a sequence,
+    in order. K-mers with bases other than A, C, G and T are skipped.
+
+    """
+    mask = (1 << 2*k) - 1
+    shift = 2*(k - 1)
+    forward = reverse = 0
+    length = 0
+    for base in bases.upper():
+        code = _BASE_CODES.get(base)
+        if code is None:
+            forward = reverse = length = 0
+            continue
+        forward = ((forward << 2) | code) & mask
+        reverse = (reverse >> 2) | ((3 - code) << shift)
+        length += 1
+        if length >= k:
+            yield min(forward, reverse)
+
+
+def build_index(genome_file, index_file, k, *, chunk_bases=CHUNK_BASES):
+    """Count the k-mers of the genome in `genome_file` (FASTA format) and write
+    them to `index_file`.
+
+    The chromosomes are read one at a time, and their k-mers are counted in
+    chunks of `chunk_bases` bases. Raises a ValueError if `k` is not between 1
+    and MAX_K, or if numpy is not installed and the genome file is larger
+    than PURE_PYTHON_MAX_SIZE.
+
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(
+            "the k-mer size must be between 1 and {}".format(MAX_K))
+    directory = os.path.dirname(os.path.abspath(index_file))
+    with open(genome_file, 'rb') as genome_handle, \
+            tempfile.TemporaryDirectory(dir=directory) as spill:
+        genome = reference.IndexedGenome(genome_handle)
+        if numpy is None:
+            _check_pure_python_size(genome_handle)
+        runs = []
+        for name in genome.offsets:
+            bases = genome.chromosome(name)
+            for start in range(0, max(len(bases) - k + 1, 0), chunk_bases):
+                runs.append(_spill_run(
+                    bases[start:start+chunk_bases+k-1], k, spill, len(runs)))
+        counts_path = os.path.join(spill, 'counts')
+        with open(index_file, 'wb') as index:
+            index.write(_HEADER.pack(MAGIC, k, 0))
+            with open(counts_path, 'wb') as counts:
+                size = _write_merged(
+                    (_read_run(*run) for run in runs), index, counts)
+            with open(counts_path, 'rb') as counts:
+                shutil.copyfileobj(counts, index)
+            index.seek(0)
+            index.write(_HEADER.pack(MAGIC, k, size))
+
+
+def _check_pure_python_size(genome_handle):
+    """Raise a ValueError if the genome file is too large for the k-mers to be
+    counted in pure Python.
+
+    """
+    size = os.fstat(genome_handle.fileno()).st_size
+    if size > PURE_PYTHON_MAX_SIZE:
+        raise ValueError(
+            "building a k-mer index of a genome file of more than {} bytes "
+            "needs numpy".format(PURE_PYTHON_MAX_SIZE))
+
+
+def _spill_run(bases, k, directory, number):
+    """Write the sorted canonical codes of the k-mers of a sequence and their
+    counts to two files in `directory`, and return their paths.
+
+    """
+    if numpy is None:
+        counter = collections.Counter(encode_kmers(bases, k))
+        codes = array.array('Q', sorted(counter))
+        counts = array.array('I', (counter[code] for code in codes))
+    else:
+        codes, counts = numpy.unique(
+            _encode_kmers_numpy(bases, k), return_counts=True)
+        codes = codes.astype(numpy.uint64)
+        counts = counts.astype(numpy.uint32)
+    paths = (os.path.join(directory, '{}.codes'.format(number)),
+             os.path.join(directory, '{}.counts'.format(number)))
+    for path, values in zip(paths, (codes, counts)):
+        with open(path, 'wb') as handle:
+            handle.write(values)
+    return paths
+
+
+def _read_run(codes_path, counts_path):
+    """Return an iterator of the (code, count) pairs of a run written by
+    `_spill_run`, reading a block at a time.
+
+    """
+    with open(codes_path, 'rb') as codes_handle, \
+            open(counts_path, 'rb') as counts_handle:
+        while True:
+            codes = array.array('Q', codes_handle.read(8*_BLOCK))
+            if not codes:
+                return
+            counts = array.array('I', counts_handle.read(4*len(codes)))
+            yield from zip(codes, counts)
+
+
+def _write_merged(runs, codes_handle, counts_handle):
+    """Merge runs of sorted (code, count) pairs, adding up the counts of each
+    code, and write the codes and counts to the two handles. Return the
+    number of distinct codes.
+
+    """
+    codes = array.array('Q')
+    counts = array.array('I')
+    size = 0
+    current = None
+    total = 0
+    for code, count in heapq.merge(*runs):
+        if code == current:
+            total += count
+            continue
+        if current is not None:
+            codes.append(current)
+            counts.append(min(total, _MAX_COUNT))
+        current, total = code, count
+        if len(codes) == _BLOCK:
+            size += _write_block(codes, counts, codes_handle, counts_handle)
+    if current is not None:
+        codes.append(current)
+        counts.append(min(total, _MAX_COUNT))
+    return size + _write_block(codes, counts, codes_handle, counts_handle)
+
+
+def _write_block(codes, counts, codes_handle, counts_handle):
+    """Write and empty the arrays of codes and counts. Return the number of
+    codes written.
+
+    """
+    size = len(codes)
+    codes_handle.write(codes)
+    counts_handle.write(counts)
+    del codes[:]
+    del counts[:]
+    return size
+
+
+def _encode_kmers_numpy(bases, k):
+    """Return a numpy array of the canonical codes of the k-mers of a sequence,
+    as `encode_kmers`.
+
+    """
+    lookup = numpy.full(256, 4, numpy.uint8)
+    for base, code in _BASE_CODES.items():
+        lookup[ord(base)] = code
+        lookup[ord(base.lower())] = code
+    codes = lookup[numpy.frombuffer(bases.encode('ascii'), numpy.uint8)]
+    windows = len(codes) - k + 1
+    if windows <= 0:
+        return numpy.zeros(0, numpy.uint64)
+    invalid = numpy.r_[0, numpy.cumsum(codes == 4)]
+    valid = invalid[k:] - invalid[:windows] == 0
+    codes[codes == 4] = 0
+    codes = codes.astype(numpy.uint64)
+    forward = numpy.zeros(windows, numpy.uint64)
+    reverse = numpy.zeros(windows, numpy.uint64)
+    for offset in range(k):
+        window = codes[offset:offset+windows]
+        forward = (forward << numpy.uint64(2)) | window
+        reverse |= (numpy.uint64(3) - window) << numpy.uint64(2*offset)
+    return numpy.minimum(forward, reverse)[valid]
+
+
+class InvalidKmerIndex(Exception):
+    """Raised when a file is not a k-mer index.
+
+    """
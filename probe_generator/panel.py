@@ -0,0 +1,168 @@
+"""Generate read-through fusion probes for every pair of genes in a panel.
+
+The probes for a pair of genes A and B are those of the statement
+
+    A#exon[*] -N -> B#exon[*] +N
+
+but the exon boundaries of each gene are looked up, and their sequences
+fetched, only once for the whole panel rather than once per statement: the
+sequences of the probes are assembled from the sequences of the boundary
+windows of the two genes.
+
+"""
+import itertools
+import sys
+from collections import namedtuple
+
+from probe_generator import annotation, exon_probe, reference, sequence
+from probe_generator.exceptions import NonFatalError
+from probe_generator.exon_probe import ExonProbe
+from probe_generator.print_probes import combine_annotations, print_fasta
+
+DONOR = '-'    # The side of the exon on the left of the junction
+ACCEPTOR = '+' # The side of the exon on the right of the junction
+
+
+class Window(namedtuple("Window", ["gene", "exon", "transcript", "strand",
+                                   "breakpoint", "bases"])):
+    """The bases on one side of an exon boundary of a gene, read in the
+    direction of transcription.
+
+    """
+    __slots__ = ()
+
+
+class Panel(object):
+    """Generates the junction probes of pairs of genes.
+
+    The windows of each gene are computed the first time the gene is used and
+    kept for the rest of the panel.
+
+    """
+    def __init__(self, genome, annotations, bases):
+        self.genome = genome
+        self.annotations = annotations
+        self.bases = bases
+        self._windows = {}
+
+    def probes(self, pairs):
+        """Return an iterator of the (header, bases) pairs of the probes of
+        every pair of genes in `pairs`, in order.
+
+        """
+        for gene1, gene2 in pairs:
+            for donor in self.windows(gene1, DONOR):
+                for acceptor in self.windows(gene2, ACCEPTOR):
+                    yield self._probe(donor, acceptor)
+
+    def windows(self, gene, side):
+        """Return a list of the Windows on one side of the unique exons of a
+        gene.
+
+        Windows whose sequences cannot be found are skipped with a warning.
+
+        """
+        key = (gene, side)
+        if key not in self._windows:
+            self._windows[key] = list(self._find_windows(gene, side))
+        return self._windows[key]
+
+    def _find_windows(self, gene, side):
+        exons = exon_probe.unique_exons(
+            annotation.lookup_gene(gene, self.annotations), '*')
+        if not exons:
+            print("Warning: gene {!r} is not in the annotations".format(gene),
+                  file=sys.stderr)
+        for exon in exons:
+            sequence_range, breakpoint = exon_probe.junction_window(
+                exon, side, self.bases, left=(side == DONOR))
+            try:
+                bases = reference.bases(sequence_range, self.genome)
+            except (NonFatalError, reference.NonContainedRange) as error:
+                print("Warning: {}#exon[{}]: {}".format(
+                    gene, exon.number, error),
+                      file=sys.stderr)
+                continue
+            yield Window(gene, exon.number, exon.transcripts[0], exon.strand,
+                         breakpoint, bases)
+
+    def _probe(self, donor, acceptor):
+        """Return the header and bases of the probe joining two windows.
+
+        As for exon statements with the '->' separator, the probe is
+        reverse-complemented when the left-hand gene is on the minus strand.
+
+        """
+        head = ExonProbe._STATEMENT_SKELETON.format(
+            gene1=donor.gene,
+            exon1=donor.exon,
+            side1=DONOR,
+            bases1=self.bases,
+            separator='->',
+            gene2=acceptor.gene,
+            exon2=acceptor.exon,
+            side2=ACCEPTOR,
+            bases2=self.bases,
+            breakpoint1=donor.breakpoint,
+            breakpoint2=acceptor.breakpoint,
+            transcript1=donor.transcript,
+            transcript2=acceptor.transcript,
+            comment='')
+        bases = donor.bases + acceptor.bases
+        if donor.strand == '-':
+            bases = sequence.reverse_complement(bases)
+        return head, bases
+
+
+def read_genes(handle):
+    """Return a list of every ordered pair of different genes given a handle
+    to a file of gene names, one per line.
+
+    """
+    genes = _lines(handle)
+    return list(itertools.permutations(genes, 2))
+
+
+def read_pairs(handle):
+    """Return a list of the pairs of genes given a handle to a file with a
+    pair of gene names on each line (separated by white-space).
+
+    Raises a ValueError if a line does not have exactly two names.
+
+    """
+    pairs = []
+    for line in _lines(handle):
+        pair = tuple(line.split())
+        if len(pair) != 2:
+            raise ValueError("expected a pair of genes: {!r}".format(line))
+        pairs.append(pair)
+    return pairs
+
+
+def print_panel(pairs, genome_file, annotation_files, bases, *, write=None):
+    """Print the junction probes of the pairs of genes in FASTA format.
+
+    Only the annotation rows and chromosomes of the genes in the panel are
+    loaded. Probes are passed to the `write` function (`print_fasta` by
+    default).
+
+    """
+    if write is None:
+        write = print_fasta
+    genes = set(itertools.chain.from_iterable(pairs))
+    annotations = combine_annotations(annotation_files, genes=genes)
+    with open(genome_file) as handle:
+        genome = reference.reference_genome(
+            handle,
+            chromosomes={transcript.chromosome for transcript in annotations})
+    for head, probe_bases in Panel(genome, annotations, bases).probes(pairs):
+        write(head, probe_bases)
+
+
+def _lines(handle):
+    """Return a list of the non-blank lines of a file, without comments
+    (starting with '#').
+
+    """
+    lines = (line.split('#')[0].strip() for line in handle)
+    return [line for line in lines if line]
@@ -0,0 +1,159 @@
+"""Check a statement file without loading the reference genome.
+
+Every statement is parsed and exploded into probes, using the annotations if
+the statement needs them. Nothing else is loaded. The result is a
+StatementPlan for each statement, which gives the number of probes the
+statement will produce, an estimate of the size of their output, and any
+problems found: parse errors, genes missing from the annotations, and exon or
+base indices outside their transcripts.
+
+Problems which can only be found with the genome (e.g., reference bases which
+do not match the genome) are not reported.
+
+"""
+import contextlib
+import io
+import sys
+from collections import namedtuple
+
+from probe_generator import annotation, print_probes
+from probe_generator.exceptions import NonFatalError
+
+LARGEST_STATEMENTS = 10
+
+
+class StatementPlan(namedtuple("StatementPlan", [
+        "statement", "probe_type", "probes", "bytes", "problems"])):
+    """The probes which a statement will produce.
+
+    `probe_type` is the name of the probe class which parses the statement (or
+    None if it cannot be parsed), `bytes` is the estimated size of the probes
+    in FASTA format, and `problems` is a list of messages.
+
+    """
+    __slots__ = ()
+
+
+def plan_file(statement_file, annotation_files):
+    """Return a list of the StatementPlans of the statements in a file.
+
+    The annotations are only loaded if a statement names a gene, and then only
+    the transcripts of the genes named.
+
+    """
+    with open(statement_file) as handle:
+        statements = list(handle)
+    genes = set()
+    for statement in statements:
+        parsed = print_probes.parse_statement(statement)
+        if parsed is not print_probes.Nothing:
+            genes.update(_genes(parsed[1]))
+    if genes:
+        annotations = print_probes.combine_annotations(
+            annotation_files, genes=genes)
+    else:
+        annotations = annotation.AnnotationIndex([])
+    return list(plan_statements(statements, annotations))
+
+
+def plan_statements(statements, annotations):
+    """Return an iterator of the StatementPlans of an iterable of statements.
+
+    `annotations` is an `annotation.AnnotationIndex`.
+
+    """
+    for statement in statements:
+        parsed = print_probes.parse_statement(statement)
+        if parsed is print_probes.Nothing:
+            yield StatementPlan(statement, None, 0, 0, [
+                "the statement could not be parsed"])
+            continue
+        probe_class, specification = parsed
+        problems = [
+            "the gene {!r} is not in the annotations".format(gene)
+            for gene in _genes(specification)
+            if not annotations.transcripts(gene)]
+        warnings = io.StringIO()
+        with contextlib.redirect_stderr(warnings):
+            try:
+                probes = list(print_probes.explode_statement(
+                    probe_class, statement, annotations))
+            except NonFatalError as error:
+                problems.append(str(error))
+                probes = None
+        problems.extend(warnings.getvalue().splitlines())
+        if probes is None:
+            yield StatementPlan(
+                statement, probe_class.__name__, 0, 0, problems)
+            continue
+        size = 0
+        for probe in probes:
+            try:
+                ranges = probe.get_ranges()
+            except NonFatalError as error:
+                problems.append("{}: {}".format(probe, error))
+                continue
+            size += len(str(probe)) + _length(ranges) + 3
+        if not probes:
+            problems.append("no probes would be generated")
+        yield StatementPlan(
+            statement, probe_class.__name__, len(probes), size, problems)
+
+
+def print_problems(plans, handle=sys.stdout):
+    """Print the problems found in the statements, and return the number of
+    statements with problems.
+
+    """
+    count = 0
+    for plan in plans:
+        if plan.problems:
+            count += 1
+        for problem in plan.problems:
+            print("{!r}: {}".format(plan.statement.strip(), problem),
+                  file=handle)
+    print("{} of {} statements have problems".format(count, len(plans)),
+          file=handle)
+    return count
+
+
+def print_plan(plans, handle=sys.stdout):
+    """Print the number of probes and estimated output size of each statement,
+    followed by a summary.
+
+    """
+    print("probes\tbytes\tstatement", file=handle)
+    for plan in plans:
+        print("{}\t{}\t{}".format(
+            plan.probes, plan.bytes, plan.statement.strip()),
+              file=handle)
+    print("\nTotal: {} statements, {} probes, {} bytes ({:.1f} MB)".format(
+        len(plans),
+        sum(plan.probes for plan in plans),
+        sum(plan.bytes for plan in plans),
+        sum(plan.bytes for plan in plans) / 2**20),
+          file=handle)
+    largest = sorted(plans, key=lambda plan: plan.probes, reverse=True)
+    print("\nLargest statements:", file=handle)
+    for plan in largest[:LARGEST_STATEMENTS]:
+        print("    {:>10} probes: {!r}".format(
+            plan.probes, plan.statement.strip()),
+              file=handle)
+
+
+def _genes(specification):
+    """Return the gene names in a statement specification.
+
+    """
+    return [specification[field] for field in print_probes.GENE_FIELDS
+            if field in specification]
+
+
+def _length(ranges):
+    """Return the number of bases of a probe given its SequenceRanges.
+
+    """
+    return sum(len(sequence_range.mutation)
+               if sequence_range.mutation is not None
+               else sequence_range.end - sequence_range.start
+               for sequence_range in ranges)
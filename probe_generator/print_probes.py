@@ -1,19 +1,56 @@
 """Find the sequences of probes and print them in FASTA format.
 
 """
+import contextlib
 import sys
+from collections import namedtuple
 
 # Utilities
-from probe_generator import reference, annotation
+from probe_generator import reference, annotation, profiling
+from probe_generator.cache import LruCache
+from probe_generator.transcript import SplicedSequenceCache
 # Probe classes
 from probe_generator.coordinate_probe import CoordinateProbe
-from probe_generator.snp_probe        import SnpProbe
+from probe_generator.snp_probe        import SnpProbe, SnpRegionProbe
 from probe_generator.gene_snp_probe   import GeneSnpProbe
-from probe_generator.amino_acid_probe import AminoAcidProbe
+from probe_generator.amino_acid_probe import (AminoAcidProbe,
+                                              AminoAcidSaturationProbe)
 from probe_generator.exon_probe       import ExonProbe
 from probe_generator.gene_indel_probe import GeneIndelProbe
+from probe_generator.tiling_probe     import TilingProbe
 # Exceptions
-from probe_generator.probe import InvalidStatement, NonFatalError
+from probe_generator.probe import InvalidStatement, NonFatalError, fetch_many
+
+PROBE_CLASSES = (
+    CoordinateProbe,
+    SnpProbe,
+    SnpRegionProbe,
+    GeneSnpProbe,
+    AminoAcidProbe,
+    AminoAcidSaturationProbe,
+    ExonProbe,
+    GeneIndelProbe,
+    TilingProbe,
+    )
+
+_ANNOTATION_FREE_CLASSES = (
+    # Probe classes whose 'explode' methods do not take an annotation.
+    CoordinateProbe,
+    SnpProbe,
+    SnpRegionProbe,
+    )
+
+GENE_FIELDS = ('gene', 'gene1', 'gene2')
+
+CHROMOSOME_FIELDS = ('chromosome', 'chromosome1', 'chromosome2')
+
+_GENOME_CLASSES = (
+    # Probe classes whose 'explode' methods also take the reference genome.
+    AminoAcidProbe,
+    AminoAcidSaturationProbe,
+    SnpProbe,
+    SnpRegionProbe,
+    )
 
 NO_PROBES_WARNING = (
     "WARNING: no probes could be generated for statement {!r}")
@@ -21,6 +58,35 @@ NO_PROBES_WARNING = (
 INVALID_STATEMENT_WARNING = (
     "WARNING: the statement {!r} could not be parsed")
 
+SPLICED_SEQUENCE_CACHE_SIZE = 50000000 # bases
+
+
+class ProbeResult(namedtuple("ProbeResult",
+                               ["probe", "head", "bases", "error"])):
+    """The outcome of finding the sequence of one probe.
+
+    """
+    __slots__ = ()
+
+
+class GeneratedProbe(namedtuple("GeneratedProbe", [
+        "statement", "probe", "header", "sequence", "error"])):
+    """A probe generated from a statement, or the reason why none could be.
+
+    `probe` is the probe object, `header` its FASTA header and `sequence` its
+    bases. If the sequence could not be determined, `sequence` is None and
+    `error` is the exception raised. If the statement could not be parsed or
+    gave no probes, `probe` and `header` are None as well.
+
+    """
+    __slots__ = ()
+
+
+class NoProbesError(NonFatalError):
+    """Signals that no probes could be generated for a statement.
+
+    """
+
 
 class Nothing(object):
     """Represents a failed computation.
@@ -71,58 +137,294 @@ class TryChain(object):
             self.bind(function)
 
 
-def print_probes(statement_file, genome_file, *annotation_files):
+def print_probes(statement_file, genome_file, *annotation_files,
+                 write=None, deduplicator=None, cache_size=0, profiler=None,
+                 timings=None, checkpoint=None, shard=None, mark=None):
     """Print probes in FASTA format given a reference genome file and a file
     containing SNP probe statements.
 
+    The probes and sequences of up to `cache_size` statements are cached, so
+    that repeated statements (ignoring white-space, comments, and the case of
+    everything but gene and chromosome names) are only exploded once. Only the
+    comment of a repeated statement is used in the headers of its probes.
+
+    If a `checkpoint` is given (a `checkpoint.Checkpoint` object), only the
+    statements not completed by an earlier run are processed, and progress is
+    recorded as the run goes.
+
+    If a `shard` is given (a `shard.Shard` object), only the statements in
+    that shard are processed, and only the annotation rows and chromosomes
+    they name are loaded. The `mark` function is called with the line number of
+    each statement before its probes are written.
+
+    See `print_statements` for the other keyword arguments.
+
+    """
+    if timings is None:
+        timings = profiling.NoTimings()
+    genes = chromosomes = None
+    if shard is not None:
+        with timings.phase('parse'), open(statement_file) as statements:
+            genes, chromosomes = shard.requirements(statements)
+    with _open_statements(statement_file, checkpoint) as statements, \
+            open(genome_file) as genome:
+        with timings.phase('annotations'):
+            annotations = combine_annotations(annotation_files, genes=genes)
+        if chromosomes is not None:
+            chromosomes.update(
+                transcript.chromosome for transcript in annotations)
+        with timings.phase('genome'):
+            ref_genome = reference.CachedGenome(reference.reference_genome(
+                genome, chromosomes=chromosomes))
+        if shard is not None:
+            start = 0 if checkpoint is None else checkpoint.statements_done
+            statements = shard.select(statements, start=start, mark=mark)
+        cache = LruCache(cache_size)
+        timings.add_cache('statements', cache)
+        timings.add_cache('genome_windows', ref_genome.windows)
+        print_statements(statements, ref_genome, annotations,
+                         write=write,
+                         deduplicator=deduplicator,
+                         cache=cache,
+                         profiler=profiler,
+                         timings=timings)
+
+
+def print_statements(statements, genome, annotations, *, write=None,
+                     deduplicator=None, cache=None, profiler=None,
+                     timings=None):
+    """Print probes in FASTA format given an iterable of probe statements, a
+    reference genome and an annotation.
+
+    Probes are passed to the `write` function (`print_fasta` by default). If a
+    `deduplicator` is given (see the `dedup` module), probes are passed to its
+    `add` method instead. Warnings are printed to standard error.
+
+    See `generate_probes` for the other keyword arguments.
+
     """
-    with open(statement_file) as statements, open(genome_file) as genome:
-        ref_genome = reference.reference_genome(genome)
-        annotations = _combine_annotations(annotation_files)
-        for statement in statements:
-            chain = TryChain(InvalidStatement)
-            chain.bind_all(
-                lambda: CoordinateProbe.explode(statement),
-                lambda: SnpProbe.explode(statement),
-                lambda: GeneSnpProbe.explode(statement, annotations),
-                lambda: AminoAcidProbe.explode(statement, annotations),
-                lambda: ExonProbe.explode(statement, annotations),
-                lambda: GeneIndelProbe.explode(statement, annotations))
-
-            if chain.value is Nothing:
-                print(INVALID_STATEMENT_WARNING.format(statement),
-                      file=sys.stderr)
+    if timings is None:
+        timings = profiling.NoTimings()
+    if deduplicator is not None:
+        write = deduplicator.add
+    elif write is None:
+        write = print_fasta
+    # The phases of generate_probes pause the output phase while they run.
+    with timings.phase('output'):
+        for result in generate_probes(statements, genome, annotations,
+                                      cache=cache,
+                                      profiler=profiler,
+                                      timings=timings):
+            if result.error is None:
+                write(result.header, result.sequence)
             else:
-                probes = chain.value
+                print(warning(result), file=sys.stderr)
+        if deduplicator is not None:
+            deduplicator.flush()
 
-                one_probe_printed = False
-                for probe in probes:
-                    try:
-                        print_fasta(probe, probe.sequence(ref_genome))
-                    except NonFatalError as error:
-                        print(
-                            "In probe: {}: {}".format(probe, error),
-                            file=sys.stderr)
-                    else:
-                        one_probe_printed = True
 
-                if not one_probe_printed: # i.e., the generator was empty
-                    print(NO_PROBES_WARNING.format(statement), file=sys.stderr)
+def generate_probes(statements, genome, annotations, *, cache=None,
+                    profiler=None, timings=None, spliced_sequences=None):
+    """Return an iterator of GeneratedProbe objects given an iterable of probe
+    statements, a reference genome and an annotation.
 
+    Every probe of every statement is returned, whether or not its sequence
+    could be found. Statements which cannot be parsed, and statements without
+    a single probe whose sequence could be found, are also reported by a
+    GeneratedProbe with no probe and an error (an InvalidStatement or
+    NoProbesError respectively).
 
-def print_fasta(head, bases):
-    """Print a single string in FASTA format.
+    If a `cache` is given (an LruCache object), it is used to store the probes
+    and sequences of statements, so that repeated statements are only exploded
+    once.
+
+    If a `profiler` is given (see the `profiling` module), a StatementRecord is
+    added to it for every statement.
+
+    If `timings` are given (a `profiling.PhaseTimings` object), the time taken
+    by each phase of the run is added to them.
+
+    The spliced coding sequences of transcripts are cached in
+    `spliced_sequences` (a `transcript.SplicedSequenceCache`), so that the
+    '[trans]' probes of a transcript are sliced from a single copy of its
+    sequence. A new cache is used if none is given.
 
     """
-    print(">{}\n{}".format(head, bases))
+    if timings is None:
+        timings = profiling.NoTimings()
+    if cache is None:
+        cache = LruCache(0)
+    if spliced_sequences is None:
+        spliced_sequences = SplicedSequenceCache(
+            genome, SPLICED_SEQUENCE_CACHE_SIZE)
+    for statement in statements:
+        with timings.phase('parse'):
+            parsed = parse_statement(statement)
+        if parsed is Nothing:
+            yield GeneratedProbe(statement, None, None, None, InvalidStatement(
+                "the statement {!r} could not be parsed".format(statement)))
+            continue
+        probe_class, specification = parsed
+        comment = specification['comment']
+        record = profiling.StatementRecord(statement, probe_class)
+
+        with timings.phase('parse'):
+            key = canonical_key(probe_class, specification)
+        results = cache.get(key)
+        if results is None:
+            with timings.phase('explode'), record.explode_timer:
+                probes = explode_statement(
+                    probe_class, statement, annotations, genome)
+            with timings.phase('fetch'), record.fetch_timer:
+                results = fetch_sequences(
+                    probes, comment, genome, spliced_sequences)
+            cache.put(key, results)
+        else:
+            record.cached = True
+
+        one_probe_found = False
+        for result in results:
+            record.probes += 1
+            head = result.head + comment
+            if result.error is None:
+                record.add_output(head, result.bases)
+                one_probe_found = True
+            yield GeneratedProbe(
+                statement, result.probe, head, result.bases, result.error)
 
+        if not one_probe_found: # i.e., the generator was empty
+            yield GeneratedProbe(statement, None, None, None, NoProbesError(
+                "no probes could be generated for statement {!r}".format(
+                    statement)))
+        if profiler is not None:
+            profiler.add(record)
 
-def _combine_annotations(annotation_files):
-    """Given a list of annotation files, return a single annotation.
+
+def warning(result):
+    """Return the warning printed for a GeneratedProbe with an error.
+
+    """
+    if result.probe is not None:
+        return "In probe: {}: {}".format(result.header, result.error)
+    elif isinstance(result.error, InvalidStatement):
+        return INVALID_STATEMENT_WARNING.format(result.statement)
+    else:
+        return NO_PROBES_WARNING.format(result.statement)
+
+
+def parse_statement(statement):
+    """Return a tuple of the probe class which can parse the statement and the
+    specification parsed from it.
+
+    Returns Nothing if the statement cannot be parsed by any probe class.
+
+    """
+    chain = TryChain(InvalidStatement)
+    chain.bind_all(*[_parser(probe_class, statement)
+                     for probe_class in PROBE_CLASSES])
+    return chain.value
+
+
+def canonical_key(probe_class, specification):
+    """Return a hashable key identifying a parsed statement.
+
+    Statements which differ only in white-space or comments have the same
+    key. Case is preserved, since it can be significant in the headers and
+    sequences of probes (e.g., the case of a mutation base).
+
+    """
+    return (probe_class,
+            tuple(sorted(
+                (field, value)
+                for field, value in specification.items()
+                if field != 'comment')))
+
+
+def explode_statement(probe_class, statement, annotations, genome=None):
+    """Return the probes of a statement which can be parsed by `probe_class`.
+
+    The `genome` is only used by probe classes which need to read the
+    reference sequence to find their probes.
+
+    """
+    if probe_class in _ANNOTATION_FREE_CLASSES:
+        if probe_class in _GENOME_CLASSES:
+            return probe_class.explode(statement, genome=genome)
+        return probe_class.explode(statement)
+    elif probe_class in _GENOME_CLASSES:
+        return probe_class.explode(statement, annotations, genome)
+    else:
+        return probe_class.explode(statement, annotations)
+
+
+def fetch_sequences(probes, comment, genome, spliced_sequences=None):
+    """Return a list of ProbeResult objects for the probes of a statement.
+
+    The 'head' of each result is the header of the probe without the
+    `comment` of the statement. The 'bases' are None and the 'error' is set for
+    probes whose sequences could not be determined because of a NonFatalError.
+
+    `spliced_sequences` is an optional `transcript.SplicedSequenceCache`.
+
+    The sequences of all of the probes are fetched together (see
+    `probe.fetch_many`).
+
+    """
+    probes = list(probes)
+    results = []
+    sequences = fetch_many(
+        probes, genome, spliced_sequences=spliced_sequences)
+    for probe, (bases, error) in zip(probes, sequences):
+        head = str(probe)
+        head = head[:len(head)-len(comment)]
+        results.append(ProbeResult(probe, head, bases, error))
+    return results
+
+
+def print_fasta(head, bases, file=None):
+    """Print a single string in FASTA format to the `file` (standard output by
+    default).
+
+    """
+    print(">{}\n{}".format(head, bases), file=file)
+
+
+def combine_annotations(annotation_files, genes=None):
+    """Given a list of annotation files, return a single annotation indexed by
+    gene name.
+
+    If a set of `genes` is given, only the transcripts of those genes are kept.
 
     """
     rows = []
     for annotation_file in annotation_files:
         with open(annotation_file) as handle:
-            rows.extend(annotation.parse_ucsc_file(handle))
-    return rows
+            rows.extend(
+                transcript for transcript in annotation.parse_ucsc_file(handle)
+                if genes is None or transcript.gene_id in genes)
+    return annotation.AnnotationIndex(rows)
+
+
+@contextlib.contextmanager
+def _open_statements(statement_file, checkpoint):
+    """Open the statement file, or the part of it not yet completed if a
+    `checkpoint` is given.
+
+    """
+    if checkpoint is None:
+        with open(statement_file) as statements:
+            yield statements
+    else:
+        statements = checkpoint.statements(statement_file)
+        try:
+            yield statements
+        finally:
+            statements.close()
+
+
+def _parser(probe_class, statement):
+    """Return a nullary function parsing the statement with the probe class.
+
+    """
+    return lambda: (probe_class, probe_class.parse(statement))
+
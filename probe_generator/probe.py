@@ -4,24 +4,33 @@
 from abc import ABCMeta, abstractmethod
 import sys
 
-from probe_generator import reference
+from probe_generator import reference, sequence
 from probe_generator.exceptions import NonFatalError
+from probe_generator.sequence_range import SequenceRange
 
 
 class AbstractProbe(object, metaclass=ABCMeta):
     """Super-class for Probe objects.
 
-    Subclasses provide the _STATEMENT_SKELETON property, an 'explode' static
-    method, and a 'get_ranges' method. The '__init__', '__str__', and
+    Subclasses provide the _STATEMENT_SKELETON property, 'parse' and 'explode'
+    static methods, and a 'get_ranges' method. The '__init__', '__str__', and
     'sequence' methods are mixed-in.
 
+    Probes declare `__slots__`, so that no per-probe `__dict__` is allocated.
+
     """
+    __slots__ = ()
+
     variant = NotImplemented # provided by children
 
-    def sequence(self, genome):
+    def sequence(self, genome, *, spliced_sequences=None):
         """Return the sequence of the probe given a reference genome object
         using the SequenceRange objects returned by the get_ranges method.
 
+        If a `transcript.SplicedSequenceCache` is given as `spliced_sequences`,
+        the sequences of probes of transcript variants are instead sliced from
+        the spliced sequence of their transcript.
+
         Raises a MissingChromosome exception (non-fatal) when the chromosome is
         not present in the reference genome.
 
@@ -33,6 +42,12 @@ class AbstractProbe(object, metaclass=ABCMeta):
         outside the chromosome.
 
         """
+        if (spliced_sequences is not None and
+                getattr(self.variant, 'is_transcript', False)):
+            spliced = spliced_sequences.get(self.variant.transcript)
+            bases = self.variant.spliced_sequence(spliced)
+            self._get_sequence(self.variant.mutation_range(), genome)
+            return bases
         ranges = self.get_ranges()
         return ''.join(self._get_sequence(seq_range, genome)
                        for seq_range in ranges)
@@ -77,6 +92,16 @@ class AbstractProbe(object, metaclass=ABCMeta):
 
         """
 
+    @staticmethod
+    @abstractmethod
+    def parse(statement):
+        """Return the specification of a probe statement as a dictionary.
+
+        Raises an InvalidStatement exception when the statement cannot be
+        parsed.
+
+        """
+
     @staticmethod
     @abstractmethod
     def explode(statement, genome_annotation=None):
@@ -86,6 +111,97 @@ class AbstractProbe(object, metaclass=ABCMeta):
         """
 
 
+def fetch_many(probes, genome, *, spliced_sequences=None):
+    """Return a list of (bases, error) pairs giving the sequence of each of the
+    probes, in order.
+
+    The ranges of all of the probes are collected, and each distinct range is
+    read from the genome once, in order of chromosome and position; the
+    sequences of the probes are then assembled from them, checking the
+    reference bases of mutations as `AbstractProbe.sequence` does. Probes with
+    their own `sequence` method, and probes of transcript variants when
+    `spliced_sequences` are given, are fetched with their `sequence` method.
+
+    `bases` is None, and `error` the exception, for probes whose sequences
+    could not be determined because of a NonFatalError; fatal errors are
+    raised as by `AbstractProbe.sequence`.
+
+    """
+    probes = list(probes)
+    probe_ranges = []
+    for probe in probes:
+        if not _batched(probe, spliced_sequences):
+            probe_ranges.append(None)
+            continue
+        try:
+            probe_ranges.append(list(probe.get_ranges()))
+        except NonFatalError as error:
+            probe_ranges.append(error)
+
+    windows = {}
+    for ranges in probe_ranges:
+        if isinstance(ranges, list):
+            for sequence_range in ranges:
+                windows[_forward_key(sequence_range)] = None
+    for key in sorted(windows):
+        try:
+            windows[key] = reference.bases(SequenceRange(*key), genome)
+        except (NonFatalError, reference.NonContainedRange) as error:
+            windows[key] = error
+
+    results = []
+    for probe, ranges in zip(probes, probe_ranges):
+        try:
+            if ranges is None:
+                bases = probe.sequence(
+                    genome, spliced_sequences=spliced_sequences)
+            elif isinstance(ranges, NonFatalError):
+                raise ranges
+            else:
+                bases = ''.join(_assemble(probe, sequence_range, windows)
+                                for sequence_range in ranges)
+        except NonFatalError as error:
+            results.append((None, error))
+        else:
+            results.append((bases, None))
+    return results
+
+
+def _batched(probe, spliced_sequences):
+    """Return True if the sequence of a probe can be assembled by `fetch_many`
+    from the ranges of the probe.
+
+    """
+    if type(probe).sequence is not AbstractProbe.sequence:
+        return False
+    return not (spliced_sequences is not None and
+                getattr(probe.variant, 'is_transcript', False))
+
+
+def _forward_key(sequence_range):
+    """Return the chromosome, start and end of a SequenceRange, by which the
+    windows read by `fetch_many` are sorted.
+
+    """
+    return (sequence_range.chromosome, sequence_range.start, sequence_range.end)
+
+
+def _assemble(probe, sequence_range, windows):
+    """Return the bases of one range of a probe given the windows read by
+    `fetch_many`, as `AbstractProbe._get_sequence` does.
+
+    """
+    window = windows[_forward_key(sequence_range)]
+    if isinstance(window, Exception):
+        raise window
+    if sequence_range.reverse_complement:
+        window = sequence.reverse_complement(window)
+    if sequence_range.mutation is not None:
+        probe._assert_reference_matches(window)
+        return sequence_range.mutation
+    return window
+
+
 class ReferenceMismatch(NonFatalError):
     """Raised when the reference base of the genome does not match the
     reference base of the spec.
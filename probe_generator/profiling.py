@@ -0,0 +1,428 @@
+"""Record where the time goes while probes are generated.
+
+A Profiler collects a StatementRecord for every statement processed and, while
+it is active, the total time spent in `annotation.lookup_gene`, the
+coordinate-mapping methods of Transcript objects, and `reference.bases`. The
+`report` method prints a summary.
+
+PhaseTimings measures the wall time and peak memory use of each phase of a run
+(loading the genome, parsing the annotations, etc.).
+
+"""
+import cProfile
+import functools
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+from probe_generator import annotation, reference
+from probe_generator.transcript import Transcript
+
+_TRANSCRIPT_METHODS = (
+    # Transcript methods which map between transcript and genomic coordinates.
+    '__len__',
+    'exons',
+    'coding_exons',
+    'exon',
+    'nucleotide_index',
+    'codon_index',
+    'base_index',
+    'transcript_range',
+    )
+
+_HISTOGRAM_BUCKETS = (0.001, 0.01, 0.1, 1, 10) # seconds
+
+_HISTOGRAM_LABELS = ("<1ms", "<10ms", "<100ms", "<1s", "<10s", ">=10s")
+
+PHASES = (
+    'genome',      # reading the reference genome
+    'annotations', # parsing the annotation files
+    'parse',       # parsing the probe statements
+    'explode',     # expanding statements into probes
+    'fetch',       # fetching the sequences of the probes
+    'output',      # printing the probes
+    )
+
+
+class Timer(object):
+    """A context manager accumulating the time spent inside it.
+
+    Re-entering the timer from inside itself (e.g., in a recursive or nested
+    call) does not count the same time twice.
+
+    The `calls` attribute is not maintained by the timer itself, but is
+    available to count calls to timed functions.
+
+    """
+    def __init__(self):
+        self.total = 0.0
+        self.calls = 0
+        self._depth = 0
+        self._start = None
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._start = time.perf_counter()
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            self.total += time.perf_counter() - self._start
+
+
+class StatementRecord(object):
+    """The time taken to process one statement and the output produced.
+
+    `cached` is True if the probes of the statement were served from the
+    statement cache.
+
+    """
+    def __init__(self, statement, probe_class):
+        self.statement = statement.strip()
+        self.probe_type = probe_class.__name__
+        self.explode_timer = Timer()
+        self.fetch_timer = Timer()
+        self.probes = 0
+        self.bytes = 0
+        self.cached = False
+
+    @property
+    def time(self):
+        """The total time spent exploding the statement and fetching the
+        sequences of its probes.
+
+        """
+        return self.explode_timer.total + self.fetch_timer.total
+
+    def add_output(self, head, bases):
+        """Count the bytes of a probe printed in FASTA format.
+
+        """
+        self.bytes += len(head) + len(bases) + 3 # '>' and two newlines
+
+
+class Profiler(object):
+    """Collects StatementRecords and times calls to the annotation, transcript
+    and reference modules.
+
+    Use the profiler as a context manager to time the instrumented functions
+    (and to run cProfile, if a `stats_file` is given) inside the block:
+
+        with profiler:
+            print_probes.print_probes(..., profiler=profiler)
+        profiler.report(sys.stderr)
+
+    """
+    def __init__(self, *, top=20, stats_file=None):
+        self.records = []
+        self.top = top
+        self.function_timers = {
+            'annotation.lookup_gene':        Timer(),
+            'Transcript coordinate mapping': Timer(),
+            'reference.bases':               Timer(),
+            }
+        self._stats_file = stats_file
+        self._cprofile = None
+        self._originals = []
+
+    def __enter__(self):
+        self._patch(annotation, 'lookup_gene', _timed_generator(
+            annotation.lookup_gene,
+            self.function_timers['annotation.lookup_gene']))
+        self._patch(reference, 'bases', _timed_function(
+            reference.bases,
+            self.function_timers['reference.bases']))
+        for method in _TRANSCRIPT_METHODS:
+            self._patch(Transcript, method, _timed_function(
+                getattr(Transcript, method),
+                self.function_timers['Transcript coordinate mapping']))
+        if self._stats_file is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._stats_file)
+            self._cprofile = None
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def add(self, record):
+        """Add the StatementRecord of a statement.
+
+        """
+        self.records.append(record)
+
+    def report(self, handle=sys.stderr):
+        """Print a summary of the profile to `handle`.
+
+        """
+        print("\nProfile of {} statements ({} probes, {} bytes) "
+              "in {:.3f}s".format(
+                  len(self.records),
+                  sum(record.probes for record in self.records),
+                  sum(record.bytes for record in self.records),
+                  sum(record.time for record in self.records)),
+              file=handle)
+        self._report_classes(handle)
+        self._report_slowest(handle)
+        print("\nTime in functions:", file=handle)
+        for name, timer in sorted(self.function_timers.items()):
+            print("    {:<32}{:>10.3f}s {:>10} calls".format(
+                name, timer.total, timer.calls),
+                  file=handle)
+
+    def _report_classes(self, handle):
+        """Print a histogram of statement times per probe class.
+
+        """
+        print("\n    {:<16}{:>8}{:>10}{:>11}{:>11}{:>14}   {}".format(
+            "probe class", "stmts", "probes", "explode", "fetch", "bytes",
+            " ".join("{:>6}".format(label) for label in _HISTOGRAM_LABELS)),
+              file=handle)
+        classes = sorted(set(record.probe_type for record in self.records))
+        for probe_type in classes:
+            records = [record for record in self.records
+                       if record.probe_type == probe_type]
+            histogram = [0] * len(_HISTOGRAM_LABELS)
+            for record in records:
+                histogram[_bucket(record.time)] += 1
+            print("    {:<16}{:>8}{:>10}{:>10.3f}s{:>10.3f}s{:>14}   {}".format(
+                probe_type,
+                len(records),
+                sum(record.probes for record in records),
+                sum(record.explode_timer.total for record in records),
+                sum(record.fetch_timer.total for record in records),
+                sum(record.bytes for record in records),
+                " ".join("{:>6}".format(count) for count in histogram)),
+                  file=handle)
+
+    def _report_slowest(self, handle):
+        """Print the `top` slowest statements.
+
+        """
+        slowest = sorted(self.records,
+                         key=lambda record: record.time,
+                         reverse=True)[:self.top]
+        print("\nSlowest {} statements:".format(len(slowest)), file=handle)
+        for record in slowest:
+            print("    {:>10.3f}s (explode {:.3f}s, fetch {:.3f}s) "
+                  "{} {} probes: {!r}".format(
+                      record.time,
+                      record.explode_timer.total,
+                      record.fetch_timer.total,
+                      record.probe_type,
+                      record.probes,
+                      record.statement),
+                  file=handle)
+
+    def _patch(self, owner, name, replacement):
+        self._originals.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+
+def _bucket(seconds):
+    """Return the index of the histogram bucket for a time in seconds.
+
+    """
+    for index, limit in enumerate(_HISTOGRAM_BUCKETS):
+        if seconds < limit:
+            return index
+    return len(_HISTOGRAM_BUCKETS)
+
+
+def _timed_function(function, timer):
+    """Return a function which calls `function` inside the `timer`.
+
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        timer.calls += 1
+        with timer:
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def _timed_generator(function, timer):
+    """As in `_timed_function`, but for a generator function. The time spent
+    producing each item is counted.
+
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        timer.calls += 1
+        iterator = function(*args, **kwargs)
+        while True:
+            with timer:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    return wrapper
+
+
+class PhaseTimings(object):
+    """Measures the wall time and peak memory use of the phases of a run.
+
+    Use the object as a context manager around the whole run, and its `phase`
+    method as a context manager around each piece of work:
+
+        with timings:
+            with timings.phase('genome'):
+                ...
+
+    A phase may be entered many times (e.g., once per statement); the times are
+    added together. A phase entered while another is running pauses it, so
+    that, e.g., the 'output' phase can be entered once around a loop which
+    also parses statements without counting the parsing as output. The hits and misses of caches registered with `add_cache`
+    are reported with the phases. The peak memory of a phase is the highest
+    value seen while it was running: the peak size of the memory blocks traced
+    by `tracemalloc` (in bytes). The resident set size (from the `resource`
+    module, in kB) is only known for the whole process, so each phase reports
+    how much the process's peak grew while it ran and the process's peak when
+    it ended. Tracing memory allocations slows the run down considerably.
+
+    """
+    def __init__(self):
+        running = []
+        self.phases = {name: _PhaseRecord(running) for name in PHASES}
+        self.caches = {}
+        self._total = Timer()
+
+    def __enter__(self):
+        tracemalloc.start()
+        self._total.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._total.__exit__(*exc_info)
+        tracemalloc.stop()
+
+    def phase(self, name):
+        """Return a context manager which times the phase called `name`.
+
+        """
+        return self.phases[name]
+
+    def add_cache(self, name, cache):
+        """Report the hits and misses of an LruCache under `name`.
+
+        """
+        self.caches[name] = cache
+
+    def as_dict(self):
+        """Return the timings as a dictionary suitable for JSON output.
+
+        """
+        return {
+            'seconds':     self._total.total,
+            'peak_rss_kb': _peak_rss(),
+            'phases':      {name: record.as_dict()
+                            for name, record in self.phases.items()},
+            'caches':      {name: {'hits':    cache.hits,
+                                   'misses':  cache.misses,
+                                   'entries': len(cache)}
+                            for name, cache in self.caches.items()},
+            }
+
+    def write(self, handle):
+        """Write the timings to `handle` as a single line of JSON.
+
+        """
+        print(json.dumps(self.as_dict(), sort_keys=True), file=handle)
+
+
+class NoTimings(object):
+    """Stands in for a PhaseTimings object when timings are not requested.
+
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def phase(self, name):
+        return self
+
+    def add_cache(self, name, cache):
+        pass
+
+
+class _PhaseRecord(Timer):
+    """A Timer which also records peak memory use.
+
+    `running` is the list of the phases running, shared by the records of a
+    PhaseTimings object; the innermost phase is the only one timed.
+
+    """
+    def __init__(self, running):
+        super().__init__()
+        self.rss_growth_kb = 0
+        self.process_peak_rss_kb = 0
+        self.peak_traced_bytes = 0
+        self._rss_at_start = 0
+        self._running = running
+
+    def __enter__(self):
+        if self._depth == 0:
+            if self._running:
+                self._running[-1]._pause()
+            self._running.append(self)
+            self._rss_at_start = _peak_rss()
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        if self._depth == 0:
+            self.calls += 1
+            self._record_peaks()
+            self._running.pop()
+            if self._running:
+                self._running[-1]._resume()
+
+    def _pause(self):
+        self.total += time.perf_counter() - self._start
+        self._record_peaks()
+
+    def _resume(self):
+        self._start = time.perf_counter()
+        self._rss_at_start = _peak_rss()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def _record_peaks(self):
+        peak_rss = _peak_rss()
+        self.rss_growth_kb += peak_rss - self._rss_at_start
+        self.process_peak_rss_kb = max(self.process_peak_rss_kb, peak_rss)
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_traced_bytes = max(self.peak_traced_bytes, peak)
+
+    def as_dict(self):
+        return {
+            'seconds':             self.total,
+            'calls':               self.calls,
+            'rss_growth_kb':       self.rss_growth_kb,
+            'process_peak_rss_kb': self.process_peak_rss_kb,
+            'peak_traced_bytes':   self.peak_traced_bytes,
+            }
+
+
+def _peak_rss():
+    """Return the peak resident set size of the process so far.
+
+    This is in kB on Linux (but bytes on OS X).
+
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -2,33 +2,83 @@
 
 """
 from probe_generator import sequence
+from probe_generator.cache import LruCache
 from probe_generator.exceptions import NonFatalError
 
+WINDOW_CACHE_SIZE = 10000000 # bases
+
 def bases(sequence_range, genome):
     """Return the bases from a SequenceRange object.
 
+    If the genome is a CachedGenome, the bases are looked up in (and added to)
+    its cache of windows.
+
     """
+    if isinstance(genome, CachedGenome):
+        key = _window_key(sequence_range)
+        cached = genome.windows.get(key)
+        if cached is not None:
+            return cached
     raw_bases = _raw_bases(
         sequence_range.chromosome,
         sequence_range.start,
         sequence_range.end,
         genome)
     if sequence_range.reverse_complement:
-        return sequence.reverse_complement(raw_bases)
+        window = sequence.reverse_complement(raw_bases)
     else:
-        return raw_bases
+        window = raw_bases
+    if isinstance(genome, CachedGenome):
+        genome.windows.put(key, window)
+    return window
+
+
+class CachedGenome(dict):
+    """A reference genome (mapping chromosomes to base pair sequences) which
+    remembers the windows most recently fetched from it by `bases`.
+
+    The least-recently used windows are discarded when their total length
+    exceeds `maxsize` bases. The number of windows found in the cache, and not
+    found, are counted by the `hits` and `misses` attributes of the `windows`
+    (an LruCache).
+
+    """
+    def __init__(self, genome, *, maxsize=WINDOW_CACHE_SIZE):
+        super().__init__(genome)
+        self.windows = LruCache(maxsize, sizeof=len)
+
+
+def _window_key(sequence_range):
+    """Return the key of a window in the cache of a CachedGenome: the
+    SequenceRange without its mutation, which does not affect the bases.
+
+    """
+    return (sequence_range.chromosome,
+            sequence_range.start,
+            sequence_range.end,
+            sequence_range.reverse_complement)
 
 
-def reference_genome(genome):
+def chromosome_name(name):
+    """Return a chromosome name without its 'chr' prefix (if any), as the
+    chromosomes of annotations are named.
+
+    """
+    return name.removeprefix('chr')
+
+
+def reference_genome(genome, chromosomes=None):
     """Map chromosomes to base pair sequences.
 
-    `genome` is a handle to a reference genome in Ensembl FASTA format.
+    `genome` is a handle to a reference genome in Ensembl FASTA format. If a
+    set of `chromosomes` is given, only those chromosomes are kept.
 
     Returns a dictionary.
 
     """
     genome_map = {}
     chromosome = None
+    bases = None
     for line in genome:
         if line.startswith('>'):
             chromosome = line[1:].split()[0]
@@ -37,20 +87,68 @@ def reference_genome(genome):
             # E.g.:
             #   >chr Homo spaiens some chromosome etc etc
             #   NNN...
-            genome_map[chromosome] = []
+            if chromosomes is None or chromosome in chromosomes:
+                bases = genome_map[chromosome] = []
+            else:
+                bases = None
         elif chromosome is None:
             raise InvalidGenomeFile(
                     "could not parse input: {!r}".format(
                         line))
-        else:
-            genome_map[chromosome].append(line.strip())
-    if not genome_map:
+        elif bases is not None:
+            bases.append(line.strip())
+    if chromosome is None:
         raise InvalidGenomeFile("genome file empty!")
     return {chromosome: ''.join(bases)
             for (chromosome, bases)
             in genome_map.items()}
 
 
+class IndexedGenome(object):
+    """A reference genome in FASTA format from which one chromosome at a time
+    is read.
+
+    `handle` is a handle to the genome file opened in binary mode. The file is
+    scanned once for the positions of the chromosomes; `chromosome` then reads
+    only the lines of the chromosome requested.
+
+    Raises an InvalidGenomeFile exception if the file has no chromosomes.
+
+    """
+    def __init__(self, handle):
+        self._handle = handle
+        self.offsets = {}
+        offset = 0
+        for line in handle:
+            if line.startswith(b'>'):
+                chromosome = line[1:].split()[0].decode('utf-8')
+                self.offsets[chromosome] = offset + len(line)
+            offset += len(line)
+        if not self.offsets:
+            raise InvalidGenomeFile("genome file empty!")
+
+    def __contains__(self, chromosome):
+        return chromosome in self.offsets
+
+    def chromosome(self, chromosome):
+        """Return the base pairs of a chromosome as a string.
+
+        Raises a MissingChromosome exception if the chromosome is not in the
+        genome.
+
+        """
+        if chromosome not in self.offsets:
+            raise MissingChromosome(
+                "no such chromosome: {!r}".format(chromosome))
+        self._handle.seek(self.offsets[chromosome])
+        bases = []
+        for line in self._handle:
+            if line.startswith(b'>'):
+                break
+            bases.append(line.strip().decode('utf-8'))
+        return ''.join(bases)
+
+
 def _raw_bases(chromosome, start, end, genome):
     """Return a string of the base pairs of chromosome from start to end.
 
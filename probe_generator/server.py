@@ -0,0 +1,327 @@
+"""Serve probes from a reference genome and annotations which are loaded once.
+
+The server accepts batches of probe statements over HTTP, either on a local TCP
+port or on a Unix socket. Statements are POSTed, one per line, to '/probes'.
+The response is the probes in FASTA format or, given the query string
+'?format=json', a JSON object:
+
+    {"probes":   [{"header": "...", "sequence": "..."}, ...],
+     "warnings": ["...", ...]}
+
+The warnings are the messages which `probe-generator` would have printed to
+standard error. Requests which arrive together are run as a single batch.
+
+A request whose body cannot be read as UTF-8 text gets a 400 response. If the
+probes of a request cannot be generated, the error is logged to standard error
+and the response is 500.
+
+"""
+import asyncio
+import errno
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from http import client, server
+from urllib import parse
+
+from probe_generator import batching, print_probes, session
+
+DEFAULT_ADDRESS = 'localhost:8470'
+
+
+class StatementRunner(object):
+    """Generates probes from batches of statements using a ProbeGenerator.
+
+    Batches are run one at a time. The statement cache is shared between
+    batches.
+
+    """
+    def __init__(self, generator):
+        self.generator = generator
+        self._lock = threading.Lock()
+
+    def run(self, statements):
+        """Return a tuple of the list of (header, sequence) pairs of the probes
+        of the `statements`, and the list of warning messages.
+
+        """
+        with self._lock:
+            return _split_results(self.generator.generate(statements))
+
+    def close(self):
+        """Nothing needs releasing.
+
+        """
+
+
+class BatchingStatementRunner(object):
+    """As StatementRunner, but requests made at the same time by different
+    clients are run together as one batch (see the `batching` module).
+
+    The batches are scheduled by an asyncio event loop in a background thread.
+
+    """
+    def __init__(self, generator, **options):
+        self.batcher = batching.BatchingGenerator(generator, **options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='probe-batcher', daemon=True)
+        self._thread.start()
+
+    def run(self, statements):
+        """As `StatementRunner.run`.
+
+        """
+        results = asyncio.run_coroutine_threadsafe(
+            self.batcher.generate(list(statements)), self._loop).result()
+        return _split_results(results)
+
+    def close(self):
+        """Stop the event loop and the worker thread.
+
+        """
+        asyncio.run_coroutine_threadsafe(
+            self.batcher.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def _split_results(results):
+    """Return a tuple of the list of (header, sequence) pairs of the probes in
+    an iterable of GeneratedProbe objects, and the list of warning messages.
+
+    """
+    probes = []
+    warnings = []
+    for result in results:
+        if result.error is None:
+            probes.append((result.header, result.sequence))
+        else:
+            warnings.append(print_probes.warning(result))
+    return probes, warnings
+
+
+class ProbeRequestHandler(server.BaseHTTPRequestHandler):
+    """Handles requests to a probe server.
+
+    """
+    server_version = 'ProbeGenerator'
+
+    def do_GET(self):
+        self._respond(200, 'text/plain', "ProbeGenerator server\n")
+
+    def do_POST(self):
+        url = parse.urlparse(self.path)
+        if url.path != '/probes':
+            self._respond(404, 'text/plain', "no such resource\n")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length).decode('utf-8')
+        except (ValueError, UnicodeDecodeError) as error:
+            self.send_error(400, "malformed request body: {}".format(error))
+            return
+        try:
+            probes, warnings = self.server.runner.run(io.StringIO(body))
+        except Exception as error:
+            self.log_error("could not generate probes: %r", error)
+            self.send_error(500, "could not generate probes: {}".format(error))
+            return
+        if parse.parse_qs(url.query).get('format') == ['json']:
+            self._respond(200, 'application/json', json.dumps({
+                'probes':   [{'header': head, 'sequence': bases}
+                             for head, bases in probes],
+                'warnings': warnings}))
+        else:
+            self._respond(200, 'text/plain', ''.join(
+                ">{}\n{}\n".format(head, bases) for head, bases in probes))
+
+    def address_string(self):
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        else:
+            return 'unix-socket'
+
+    def _respond(self, status, content_type, text):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TcpProbeServer(socketserver.ThreadingMixIn, server.HTTPServer):
+    """A probe server listening on a TCP port.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, address, runner):
+        self.runner = runner
+        super().__init__(address, ProbeRequestHandler)
+
+
+class UnixProbeServer(socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+    """A probe server listening on a Unix socket.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, path, runner):
+        self.runner = runner
+        _remove_stale_socket(path)
+        super().__init__(path, ProbeRequestHandler)
+
+
+def make_server(address, runner):
+    """Return a probe server listening on the `address`, which is either the
+    path to a Unix socket or 'host:port'.
+
+    """
+    kind, location = parse_address(address)
+    if kind == 'unix':
+        return UnixProbeServer(location, runner)
+    else:
+        return TcpProbeServer(location, runner)
+
+
+def serve(genome_file, annotation_files, address=DEFAULT_ADDRESS, *,
+          cache_size=10000):
+    """Load the genome and annotations and serve probes until interrupted.
+
+    """
+    runner = BatchingStatementRunner(session.ProbeGenerator.from_files(
+        genome_file, *annotation_files, cache_size=cache_size))
+    probe_server = make_server(address, runner)
+    print("Serving probes on {}".format(address), file=sys.stderr)
+    try:
+        probe_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        probe_server.server_close()
+        runner.close()
+
+
+def request_probes(address, statements):
+    """Send a string of statements to the server at `address` and return a
+    tuple of the list of (header, sequence) pairs of the probes and the list of
+    warnings.
+
+    Raises a ServerError if the server does not respond successfully.
+
+    """
+    kind, location = parse_address(address)
+    if kind == 'unix':
+        connection = _UnixHTTPConnection(location)
+    else:
+        connection = client.HTTPConnection(*location)
+    try:
+        connection.request(
+            'POST', '/probes?format=json', statements.encode('utf-8'),
+            {'Content-Type': 'text/plain; charset=utf-8'})
+        response = connection.getresponse()
+        body = response.read().decode('utf-8')
+    except (OSError, client.HTTPException) as error:
+        raise ServerError(
+            "could not reach server at {!r}: {}".format(address, error))
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise ServerError("server at {!r} responded {} {}".format(
+            address, response.status, response.reason))
+    data = json.loads(body)
+    return ([(probe['header'], probe['sequence']) for probe in data['probes']],
+            data['warnings'])
+
+
+def print_remote_probes(statement_file, address, *, write=None,
+                        deduplicator=None):
+    """As `print_probes.print_probes`, but have the server at `address`
+    generate the probes.
+
+    """
+    with open(statement_file) as handle:
+        probes, warnings = request_probes(address, handle.read())
+    if deduplicator is not None:
+        write = deduplicator.add
+    elif write is None:
+        write = print_probes.print_fasta
+    for warning in warnings:
+        print(warning, file=sys.stderr)
+    for head, bases in probes:
+        write(head, bases)
+    if deduplicator is not None:
+        deduplicator.flush()
+
+
+def parse_address(address):
+    """Return ('unix', path) or ('tcp', (host, port)) given a server address.
+
+    Addresses containing a '/' (optionally starting 'unix:') are Unix socket
+    paths. Otherwise the address is 'host:port', 'port', or
+    'http://host:port'.
+
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if address.startswith('http://'):
+        address = address[len('http://'):].rstrip('/')
+    if '/' in address:
+        return 'unix', address
+    host, _, port = address.rpartition(':')
+    try:
+        return 'tcp', (host or 'localhost', int(port))
+    except ValueError:
+        raise ServerError("invalid server address: {!r}".format(address))
+
+
+class _UnixHTTPConnection(client.HTTPConnection):
+    """An HTTP connection over a Unix socket.
+
+    """
+    def __init__(self, path):
+        super().__init__('localhost')
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._path)
+
+
+def _remove_stale_socket(path):
+    """Remove the Unix socket at `path` left over from a previous server.
+
+    The socket is only removed if nothing is listening on it. Raises an
+    OSError (EADDRINUSE) if a server is still listening. Anything other than
+    a socket is left alone.
+
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError(errno.EADDRINUSE,
+                  "Address already in use by a running server", path)
+
+
+class ServerError(Exception):
+    """Raised when a probe server cannot be reached or returns an error.
+
+    """
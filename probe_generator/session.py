@@ -0,0 +1,66 @@
+"""Generate probes from within Python.
+
+A ProbeGenerator loads a reference genome and annotations once, and can then
+generate the probes of any number of batches of statements:
+
+    >>> generator = ProbeGenerator.from_files('hg19.fa', 'refGene.txt')
+    >>> for result in generator.generate(["FOO#exon[1]-5/BAR#exon[*]+5"]):
+    ...     if result.error is None:
+    ...         print(result.header, result.sequence)
+
+Nothing is printed; warnings are given by the `error` of each result.
+
+"""
+from probe_generator import annotation, print_probes, reference
+from probe_generator.cache import LruCache
+from probe_generator.transcript import SplicedSequenceCache
+
+
+class ProbeGenerator(object):
+    """Generates probes using a reference genome and an annotation which are
+    kept in memory.
+
+    `genome` is a reference genome as returned by `reference.reference_genome`
+    and `annotations` an iterable of transcripts (see `annotation`). The
+    probes and sequences of up to `cache_size` distinct statements are cached
+    between calls to `generate`, as are the spliced sequences of transcripts
+    and the windows fetched from the genome (see `reference.CachedGenome`).
+
+    """
+    def __init__(self, genome, annotations=(), *, cache_size=10000):
+        if not isinstance(genome, reference.CachedGenome):
+            genome = reference.CachedGenome(genome)
+        self.genome = genome
+        if not isinstance(annotations, annotation.AnnotationIndex):
+            annotations = annotation.AnnotationIndex(annotations)
+        self.annotations = annotations
+        self._cache = LruCache(cache_size)
+        self._spliced_sequences = SplicedSequenceCache(
+            genome, print_probes.SPLICED_SEQUENCE_CACHE_SIZE)
+
+    @classmethod
+    def from_files(cls, genome_file, *annotation_files, cache_size=10000):
+        """Return a ProbeGenerator given the paths of a reference genome in
+        FASTA format and any number of UCSC annotation files.
+
+        """
+        with open(genome_file) as handle:
+            genome = reference.reference_genome(handle)
+        return cls(genome,
+                   print_probes.combine_annotations(annotation_files),
+                   cache_size=cache_size)
+
+    def generate(self, statements, *, profiler=None):
+        """Return an iterator of `print_probes.GeneratedProbe` objects given an
+        iterable of probe statements (or a single statement as a string).
+
+        See `print_probes.generate_probes` for details.
+
+        """
+        if isinstance(statements, str):
+            statements = [statements]
+        return print_probes.generate_probes(
+            statements, self.genome, self.annotations,
+            cache=self._cache,
+            profiler=profiler,
+            spliced_sequences=self._spliced_sequences)
@@ -0,0 +1,158 @@
+"""Split a statement file between the tasks of a cluster array job.
+
+Shard I of N (counting from 1) processes either every Nth statement, starting
+with the Ith ('line'), or the statements whose gene (or, for statements
+without a gene, chromosome) hashes to I ('gene'). The second keeps every
+statement on a gene in the same shard, so that each shard needs fewer
+annotation rows and chromosomes.
+
+The output of a shard is in FASTA format, with a marker line before the probes
+of each statement giving its line number in the statement file:
+
+    ;12
+    >1:4_t>g/8
+    acggacgt
+
+`merge_shards` combines the outputs of the shards in the order of the original
+statement file, removing the markers.
+
+"""
+import heapq
+import zlib
+from collections import namedtuple
+
+from probe_generator import print_probes
+
+SHARD_BY = ('line', 'gene')
+
+MARKER = ';'
+
+
+class Shard(namedtuple("Shard", ["index", "count", "by"])):
+    """One of `count` parts of a statement file (`index` counts from 1).
+
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return "{}/{}".format(self.index, self.count)
+
+    def contains(self, number, statement):
+        """Return True if the statement on line `number` (counting from 0)
+        belongs to the shard.
+
+        """
+        if self.by == 'line':
+            bucket = number % self.count
+        else:
+            key = shard_key(statement).encode('utf-8')
+            bucket = zlib.crc32(key) % self.count
+        return bucket == self.index - 1
+
+    def select(self, statements, *, start=0, mark=None):
+        """Return an iterator of the statements which belong to the shard.
+
+        `start` is the line number of the first statement. If a `mark`
+        function is given, it is called with the line number of each statement
+        before the statement is returned.
+
+        """
+        for number, statement in enumerate(statements, start):
+            if self.contains(number, statement):
+                if mark is not None:
+                    mark(number)
+                yield statement
+
+    def requirements(self, statements):
+        """Return a tuple of the set of gene names and the set of chromosomes
+        named by the statements which belong to the shard.
+
+        """
+        genes = set()
+        chromosomes = set()
+        for statement in self.select(statements):
+            parsed = print_probes.parse_statement(statement)
+            if parsed is print_probes.Nothing:
+                continue
+            _, specification = parsed
+            genes.update(specification[field]
+                         for field in print_probes.GENE_FIELDS
+                         if field in specification)
+            chromosomes.update(specification[field]
+                               for field in print_probes.CHROMOSOME_FIELDS
+                               if field in specification)
+        return genes, chromosomes
+
+
+def parse_shard(text, by='line'):
+    """Return a Shard given a string 'I/N'.
+
+    Raises a ValueError if the string is not of that form or I is not between
+    1 and N.
+
+    """
+    if by not in SHARD_BY:
+        raise ValueError("cannot shard by {!r}: expected one of {}".format(
+            by, ", ".join(SHARD_BY)))
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError("invalid shard {!r}: expected I/N".format(text))
+    if not 1 <= index <= count:
+        raise ValueError(
+            "invalid shard {!r}: I must be between 1 and N".format(text))
+    return Shard(index, count, by)
+
+
+def shard_key(statement):
+    """Return the gene name (or chromosome) by which a statement is sharded.
+
+    Statements which cannot be parsed are sharded by their text.
+
+    """
+    parsed = print_probes.parse_statement(statement)
+    if parsed is print_probes.Nothing:
+        return statement.strip()
+    _, specification = parsed
+    for field in print_probes.GENE_FIELDS + print_probes.CHROMOSOME_FIELDS:
+        if field in specification:
+            return specification[field]
+
+
+def print_marker(number, file=None):
+    """Print the marker line preceding the probes of the statement on line
+    `number`.
+
+    """
+    print("{}{}".format(MARKER, number), file=file)
+
+
+def read_shard(handle):
+    """Return an iterator of (line number, [(header, bases)...]) pairs giving
+    the probes of each statement in the output of a shard.
+
+    """
+    number = None
+    probes = []
+    for line in handle:
+        if line.startswith(MARKER):
+            if number is not None:
+                yield number, probes
+            number = int(line[len(MARKER):])
+            probes = []
+        elif line.startswith('>'):
+            probes.append((line[1:].rstrip('\n'), next(handle).rstrip('\n')))
+    if number is not None:
+        yield number, probes
+
+
+def merge_shards(handles, write=print_probes.print_fasta):
+    """Pass the probes in the outputs of shards to the `write` function in the
+    order of the original statement file.
+
+    """
+    statements = heapq.merge(*[read_shard(handle) for handle in handles],
+                             key=lambda statement: statement[0])
+    for _, probes in statements:
+        for head, bases in probes:
+            write(head, bases)
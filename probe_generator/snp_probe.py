@@ -2,8 +2,11 @@
 
 """
 import re
+import sys
 from collections import namedtuple
 
+from probe_generator import reference
+from probe_generator.exceptions import NonFatalError
 from probe_generator.probe import AbstractProbe, InvalidStatement
 from probe_generator.sequence_range import SequenceRange
 
@@ -28,8 +31,33 @@ _STATEMENT_REGEX = re.compile(r"""
         (--.*|\s*)      # comment
         """, re.VERBOSE)
 
+_REGION_REGEX = re.compile(r"""
+        \s*
+        ([a-zA-Z0-9.]+) # chromosome
+        \s*
+        :               # colon separator
+        \s*
+        (\d+)           # first base pair index
+        \s*
+        -               # hyphen separator
+        \s*
+        (\d+)           # last base pair index
+        \s*
+        ([acgtACGT*])   # reference base
+        \s*
+        >               # arrow separator
+        \s*
+        ([acgtACGT*])   # mutant base
+        \s*
+        /               # solidus separator
+        \s*
+        (\d+)           # bases
+        \s*
+        (--.*|\s*)      # comment
+        """, re.VERBOSE)
+
 # TODO: Fix this ugly hack
-FakeVariant = namedtuple("FakeVariant", "reference")
+FakeVariant = namedtuple("FakeVariant", "reference mutation")
 
 
 class SnpProbe(AbstractProbe):
@@ -47,44 +75,221 @@ class SnpProbe(AbstractProbe):
     _STATEMENT_SKELETON = ("{chromosome}:{index}_"
                            "{reference}>{mutation}/{bases}{comment}")
 
-    def __init__(self, specification):
-        self._spec = specification
-        self.variant = FakeVariant(self._spec["reference"])
+    __slots__ = ('_partial', 'variant')
+
+    def __init__(self, partial_specification, variant):
+        """`partial_specification` is the specification parsed from the
+        statement, which is shared by all of its probes, and `variant` holds
+        the reference and mutation bases of this probe.
+
+        """
+        self._partial = partial_specification
+        self.variant = variant
 
     def __str__(self):
         return self._STATEMENT_SKELETON.format(**self._spec)
 
+    @property
+    def _spec(self):
+        """The full specification of the probe as a dictionary.
+
+        """
+        return dict(self._partial,
+                    reference=self.variant.reference,
+                    mutation=self.variant.mutation)
+
     def get_ranges(self):
-        bases = self._spec['bases']
-        chromosome = self._spec['chromosome']
-        index = self._spec['index'] - 1 # Convert from 0- to 1-based indexing
-        left_buffer = bases // 2 - 1
-        right_buffer = bases - left_buffer
-        return (
-            SequenceRange(chromosome,
-                          index-left_buffer,
-                          index),
-            SequenceRange(chromosome,
-                          index,
-                          index+1,
-                          mutation=self._spec["mutation"]),
-            SequenceRange(chromosome,
-                          index+1,
-                          index+right_buffer))
+        return _snp_ranges(self._partial['chromosome'],
+                           self._partial['index'] - 1, # Convert to 0-based
+                           self._partial['bases'],
+                           self.variant.mutation)
+
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
 
     @staticmethod
-    def explode(statement, genome_annotation=None):
+    def explode(statement, genome_annotation=None, genome=None):
         """Yield probe statements with globbed reference and mutation
         bases filled in.
 
+        If the reference base is globbed and a genome is given, the reference
+        base is read from the genome and only the mutations of that base are
+        returned. Otherwise (or if the base cannot be read), a probe is
+        returned for every reference base.
+
         """
         if genome_annotation is not None:
             raise Exception(
                 "SnpProbe.explode does not take a 'genome_annotation' "
                 "argument")
         partial_spec = _parse(statement)
-        specs = _expand(partial_spec)
-        return [SnpProbe(spec) for spec in specs]
+        if partial_spec['reference'] == '*' and genome is not None:
+            reference_base = _reference_base(partial_spec, genome)
+            if reference_base is not None:
+                partial_spec['reference'] = reference_base
+        return [SnpProbe(partial_spec, variant)
+                for variant in _expand(partial_spec['reference'],
+                                       partial_spec['mutation'])]
+
+
+class SnpRegionProbe(SnpProbe):
+    """A probe for a single-nucleotide polymorphism event at one base of a
+    genomic region (saturation mutagenesis of the region).
+
+    The statement is in the following form:
+
+        chromosome:first-last reference>mutant / bases
+
+    For example: '7:100-200 *>* /51' gives a probe for every possible SNP from
+    the 100th to the 200th base pair of chromosome 7. The probes are the same
+    as those of the SNP statements '7:100 *>* /51', '7:101 *>* /51', etc.
+
+    The probes of a region share a SnpWindow, so the region and its flanking
+    bases are read from the genome once and each probe is a slice of it.
+
+    """
+    __slots__ = ('index', 'window')
+
+    def __init__(self, partial_specification, variant, *, index, window):
+        """`index` is the 1-based index of the mutated base. `window` is the
+        SnpWindow of the region, or None if it is not known.
+
+        """
+        super().__init__(partial_specification, variant)
+        self.index = index
+        self.window = window
+
+    @property
+    def _spec(self):
+        return dict(super()._spec, index=self.index)
+
+    def get_ranges(self):
+        return _snp_ranges(self._partial['chromosome'],
+                           self.index - 1, # Convert to 0-based
+                           self._partial['bases'],
+                           self.variant.mutation)
+
+    def sequence(self, genome, *, spliced_sequences=None):
+        """Return the sequence of the probe given a reference genome.
+
+        The bases are sliced from the window of the region, which is read from
+        the genome once. Errors are raised as by `AbstractProbe.sequence`.
+
+        """
+        if self.window is None:
+            return super().sequence(genome)
+        bases = self.window.sequence(genome)
+        left_buffer, right_buffer = _buffers(self._partial['bases'])
+        offset = self.index - 1 - self.window.start
+        self._assert_reference_matches(bases[offset])
+        return (bases[offset-left_buffer:offset] +
+                self.variant.mutation +
+                bases[offset+1:offset+right_buffer])
+
+    @staticmethod
+    def parse(statement):
+        return _parse_region(statement)
+
+    @staticmethod
+    def explode(statement, genome_annotation=None, genome=None):
+        """Return the probes for every SNP at every base of the region.
+
+        If a genome is given, the region is read from it once; where the
+        reference base is globbed, the base at each position is used, and
+        where it is given, positions with a different base are skipped.
+        Without a genome (or if the region cannot be read), every base of the
+        region is expanded as by `SnpProbe.explode`.
+
+        """
+        if genome_annotation is not None:
+            raise Exception(
+                "SnpRegionProbe.explode does not take a 'genome_annotation' "
+                "argument")
+        partial_spec = _parse_region(statement)
+        window = None
+        if genome is not None:
+            window = SnpWindow(partial_spec)
+            try:
+                bases = window.sequence(genome)
+            except (NonFatalError, reference.NonContainedRange) as error:
+                print("Warning: {}".format(error), file=sys.stderr)
+                window = None
+
+        spec_reference = partial_spec['reference']
+        probes = []
+        for index in range(partial_spec['index'], partial_spec['end']+1):
+            reference_base = spec_reference
+            if window is not None:
+                base = bases[index - 1 - window.start].upper()
+                if base not in ('A', 'C', 'G', 'T'):
+                    continue
+                elif spec_reference == '*':
+                    reference_base = base
+                elif spec_reference.upper() != base:
+                    continue
+            for variant in _expand(reference_base,
+                                   partial_spec['mutation']):
+                probes.append(SnpRegionProbe(
+                    partial_spec, variant, index=index, window=window))
+        return probes
+
+
+class SnpWindow(object):
+    """The bases of a region of a SnpRegionProbe statement, with enough
+    flanking bases on either side for the probes at its ends.
+
+    `start` is the 0-based index of the first base of the window.
+
+    """
+    def __init__(self, specification):
+        left_buffer, right_buffer = _buffers(specification['bases'])
+        self.range = SequenceRange(
+            specification['chromosome'],
+            specification['index'] - 1 - left_buffer,
+            specification['end'] - 1 + right_buffer)
+        self.start = self.range.start
+        self._genome = None
+        self._bases = None
+
+    def sequence(self, genome):
+        """Return the bases of the window given a reference genome.
+
+        The bases are only fetched from the genome once.
+
+        """
+        if self._genome is not genome:
+            self._bases = reference.bases(self.range, genome)
+            self._genome = genome
+        return self._bases
+
+
+def _buffers(bases):
+    """Return the number of bases to the left and right of the mutated base of
+    a SNP probe of `bases` bases. The right buffer includes the mutated base.
+
+    """
+    left_buffer = bases // 2 - 1
+    return left_buffer, bases - left_buffer
+
+
+def _snp_ranges(chromosome, index, bases, mutation):
+    """Return the SequenceRange objects of a SNP probe given the 0-based
+    index of the mutated base.
+
+    """
+    left_buffer, right_buffer = _buffers(bases)
+    return (
+        SequenceRange(chromosome,
+                      index-left_buffer,
+                      index),
+        SequenceRange(chromosome,
+                      index,
+                      index+1,
+                      mutation=mutation),
+        SequenceRange(chromosome,
+                      index+1,
+                      index+right_buffer))
 
 
 def _parse(statement):
@@ -112,20 +317,68 @@ def _parse(statement):
             "comment":    comment}
 
 
-def _expand(partial_spec):
-    """Given a possibly globbed SNP probe specification, fill in all
-    possible combinations of reference and mutation bases.
+def _parse_region(statement):
+    """Return a partial SnpRegionProbe specification given a probe statement.
+    The 'index' is that of the first base of the region, and 'end' that of the
+    last.
+
+    Raises an InvalidStatement exception when the statement does not match the
+    format of a region statement.
 
     """
-    spec_reference = partial_spec['reference']
-    spec_mutation = partial_spec['mutation']
+    match = _REGION_REGEX.match(statement)
 
+    if not match:
+        raise InvalidStatement(
+            "could not parse snp region statement {!r}".format(
+                    statement))
+
+    (chromosome,
+     first,
+     last,
+     reference_base,
+     mutation,
+     bases,
+     comment) = match.groups()
+    if not 1 <= int(first) <= int(last):
+        raise InvalidStatement(
+            "Invalid region: {}-{}".format(first, last))
+    return {"chromosome": chromosome,
+            "index":      int(first),
+            "end":        int(last),
+            "reference":  reference_base,
+            "mutation":   mutation,
+            "bases":      int(bases),
+            "comment":    comment}
+
+
+def _reference_base(partial_spec, genome):
+    """Return the reference base at the index of a SNP probe specification
+    (in upper case), or None if it cannot be read from the genome or is not
+    one of 'ACGT'.
+
+    """
+    index = partial_spec['index'] - 1
+    try:
+        base = reference.bases(
+            SequenceRange(partial_spec['chromosome'], index, index+1),
+            genome).upper()
+    except (NonFatalError, reference.NonContainedRange) as error:
+        print("Warning: {}".format(error), file=sys.stderr)
+        return None
+    return base if base in ('A', 'C', 'G', 'T') else None
+
+
+def _expand(spec_reference, spec_mutation):
+    """Given possibly globbed reference and mutation bases of a SNP probe
+    specification, return an iterator of FakeVariants for all possible
+    combinations of reference and mutation bases.
+
+    """
     ref_bases    = 'ACGT' if spec_reference == '*' else spec_reference
     mutant_bases = 'ACGT' if spec_mutation  == '*' else spec_mutation
 
     for ref_base in ref_bases:
         for mutant_base in mutant_bases:
             if ref_base.upper() != mutant_base.upper():
-                yield dict(partial_spec,
-                           reference=ref_base,
-                           mutation=mutant_base)
+                yield FakeVariant(ref_base, mutant_base)
@@ -1,7 +1,9 @@
 import unittest
 
 from probe_generator.test.test_constants import GENOME, ANNOTATION
-from probe_generator.amino_acid_probe import AminoAcidProbe
+from probe_generator.amino_acid_probe import (
+    AminoAcidProbe, AminoAcidSaturationProbe)
+from probe_generator.probe import InvalidStatement
 
 class TestAminoAcidProbe(unittest.TestCase):
     def setUp(self):
@@ -47,6 +49,61 @@ class TestAminoAcidProbe(unittest.TestCase):
         self.assertEqual(
             len(list(AminoAcidProbe.explode("GHI: M2X /9", ANNOTATION))), 63)
 
+    def test_explode_with_genome_only_mutates_the_reference_codon(self):
+        probes = AminoAcidProbe.explode("GHI: P2X /9", ANNOTATION, GENOME)
+        self.assertEqual(len(probes), 60)
+        self.assertEqual({probe.variant.reference for probe in probes},
+                         {"CCC"})
+
+    def test_explode_with_genome_skips_mismatched_reference(self):
+        self.assertEqual(
+            AminoAcidProbe.explode("GHI: L2* /9", ANNOTATION, GENOME), [])
+
+
+class TestAminoAcidSaturationProbe(unittest.TestCase):
+    def test_parse_all_codons(self):
+        specification = AminoAcidSaturationProbe.parse("GHI: *all* /9")
+        self.assertEqual(specification["first"], 1)
+        self.assertIsNone(specification["last"])
+        self.assertEqual(specification["bases"], 9)
+
+    def test_parse_codon_range(self):
+        specification = AminoAcidSaturationProbe.parse(
+            "GHI: 2-5 * [trans] /9 -- comment")
+        self.assertEqual(specification["first"], 2)
+        self.assertEqual(specification["last"], 5)
+        self.assertEqual(specification["transcript_sequence"], "[trans]")
+
+    def test_parse_rejects_reversed_range(self):
+        with self.assertRaises(InvalidStatement):
+            AminoAcidSaturationProbe.parse("GHI: 5-2 * /9")
+
+    def test_amino_acid_statements_are_not_saturation_statements(self):
+        with self.assertRaises(InvalidStatement):
+            AminoAcidSaturationProbe.parse("GHI: P2X /9")
+
+    def test_explode_without_genome_gives_an_upper_bound(self):
+        probes = AminoAcidSaturationProbe.explode("GHI: *all* /9", ANNOTATION)
+        self.assertEqual(len(probes), 2 * 64)
+        self.assertEqual(str(probes[0]), "GHI:X1K(NNN>AAA)/9_BAZ_3:21")
+        self.assertLessEqual(
+            len(AminoAcidSaturationProbe.explode(
+                "GHI: *all* /9", ANNOTATION, GENOME)),
+            len(probes))
+
+    def test_explode_matches_amino_acid_probes_of_reference_codon(self):
+        saturation = AminoAcidSaturationProbe.explode(
+            "GHI: 2-2 * /9", ANNOTATION, GENOME)
+        expected = [
+            probe for probe in AminoAcidProbe.explode("GHI: P2X /9", ANNOTATION)
+            if probe.variant.reference == "CCC"]
+        self.assertEqual(
+            sorted(str(probe) for probe in saturation),
+            sorted(str(probe) for probe in expected))
+        self.assertEqual(
+            sorted(probe.sequence(GENOME) for probe in saturation),
+            sorted(probe.sequence(GENOME) for probe in expected))
+
 
 def select_reference_codon(probes, codon):
     for probe in probes:
@@ -3,7 +3,7 @@ import os
 
 from probe_generator import annotation
 from probe_generator.sequence_range import SequenceRange
-from probe_generator.test.test_constants import VALIDATION_DATA_DIR
+from probe_generator.test.test_constants import VALIDATION_DATA_DIR, ANNOTATION
 
 MOCK_ANNOTATION_FILE = [ # input is any iterable of strings
         # UCSC annotation files have a header in this format:
@@ -56,3 +56,18 @@ class TestAnnotationValidation(unittest.TestCase):
     def test_ucsc_gene_table(self):
         with open(MOCK_UCSC_GENES_FILE) as handle:
             self.assert_mock_gene_in_file(handle)
+
+
+class TestAnnotationIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = annotation.AnnotationIndex(ANNOTATION)
+
+    def test_index_iterates_over_every_transcript_in_order(self):
+        self.assertEqual(list(self.index), ANNOTATION)
+        self.assertEqual(len(self.index), len(ANNOTATION))
+
+    def test_lookup_gene_uses_index(self):
+        for gene in ("ABC", "DEF", "NOT_A_GENE"):
+            self.assertEqual(
+                list(annotation.lookup_gene(gene, self.index)),
+                list(annotation.lookup_gene(gene, ANNOTATION)))
@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+from probe_generator import batching, session
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+
+class FailingGenerator(object):
+    """Fails on the statement 'banana'.
+
+    """
+    def generate(self, statements):
+        for statement in statements:
+            if statement == "banana":
+                raise RuntimeError("no genome")
+            yield "probe for {}".format(statement)
+
+
+class CountingGenerator(session.ProbeGenerator):
+    """Counts the calls to `generate`.
+
+    """
+    calls = 0
+
+    def generate(self, statements, **kwargs):
+        self.calls += 1
+        return super().generate(statements, **kwargs)
+
+
+class TestBatchingGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = session.ProbeGenerator(GENOME, ANNOTATION)
+
+    def run_requests(self, batcher, *requests):
+        async def run():
+            try:
+                return await asyncio.gather(
+                    *[batcher.generate(request) for request in requests],
+                    return_exceptions=True)
+            finally:
+                await batcher.close()
+        return asyncio.run(run())
+
+    def test_each_caller_receives_its_own_probes(self):
+        batcher = batching.BatchingGenerator(self.generator)
+        first, second = self.run_requests(
+            batcher, ["1:4 t>g /8\n"], ["1:4 t>a /8\n", "1:4 t>c /8\n"])
+        self.assertEqual([result.header for result in first],
+                         ["1:4_t>g/8"])
+        self.assertEqual([result.header for result in second],
+                         ["1:4_t>a/8", "1:4_t>c/8"])
+
+    def test_concurrent_requests_are_batched(self):
+        batcher = batching.BatchingGenerator(self.generator)
+        results = self.run_requests(
+            batcher, *[["1:4 t>g /8\n"] for _ in range(5)])
+        self.assertEqual(batcher.batch_sizes, [5])
+        self.assertEqual([len(result) for result in results], [1] * 5)
+
+    def test_each_batch_is_generated_by_one_call(self):
+        generator = CountingGenerator(GENOME, ANNOTATION)
+        batcher = batching.BatchingGenerator(generator)
+        results = self.run_requests(
+            batcher, ["1:4 t>g /8\n"], ["banana\n"],
+            ["1:4 t>a /8\n", "1:4 t>g /8\n"])
+        self.assertEqual(batcher.batch_sizes, [3])
+        self.assertEqual(generator.calls, 1)
+        self.assertEqual([[result.header for result in result_list]
+                          for result_list in results],
+                         [["1:4_t>g/8"], [None], ["1:4_t>a/8", "1:4_t>g/8"]])
+
+    def test_batches_are_limited_to_max_batch_statements(self):
+        batcher = batching.BatchingGenerator(self.generator, max_batch=2)
+        self.run_requests(batcher, *[["1:4 t>g /8\n"] for _ in range(5)])
+        self.assertEqual(batcher.batch_sizes, [2, 2, 1])
+
+    def test_errors_are_raised_only_in_the_failing_caller(self):
+        batcher = batching.BatchingGenerator(FailingGenerator())
+        first, second, third = self.run_requests(
+            batcher, ["apple"], ["banana"], ["cherry"])
+        self.assertEqual(batcher.batch_sizes, [3])
+        self.assertEqual(first, ["probe for apple"])
+        self.assertIsInstance(second, RuntimeError)
+        self.assertEqual(third, ["probe for cherry"])
@@ -0,0 +1,74 @@
+import io
+import unittest
+from unittest import mock
+
+from probe_generator import bedpe, reference
+from probe_generator.coordinate_probe import CoordinateProbe
+from probe_generator.probe import InvalidStatement
+
+GENOME_FILE = (b">1 chromosome 1\n"
+               b"AAAACCCCGG\n"
+               b"GGTTTT\n"
+               b">2\n"
+               b"acgtacgtacgt\n"
+               b">hs37d5\n"
+               b"acgtacgtacgt\n")
+
+RECORDS = [
+    "#chrom1\tstart1\tend1\tchrom2\tstart2\tend2\tname\tscore\t"
+    "strand1\tstrand2\n",
+    "1\t5\t6\t2\t7\t8\tdel1\t.\t+\t-\n",
+    "chr1\t5\t6\tchr2\t7\t8\tinv1\t.\t+\t+\n",
+    "1\t5\t6\t2\t7\t8\t.\t.\t-\t-\n",
+    "1\t5\t6\t2\t7\t8\n",
+    ]
+
+
+class TestBedpe(unittest.TestCase):
+    def setUp(self):
+        self.genome = reference.IndexedGenome(io.BytesIO(GENOME_FILE))
+
+    def generate(self, records, bases=6):
+        return list(bedpe.generate_bedpe_probes(records, self.genome, bases))
+
+    def test_probes_match_coordinate_statements(self):
+        genome = {'1': "AAAACCCCGGGGTTTT", '2': "acgtacgtacgt"}
+        statements = ["1:6-3/2:8+3", "1:6-3/2:8-3",
+                      "1:6+3/2:8+3", "1:6-3/2:8+3"]
+        expected = []
+        for statement in statements:
+            probe, = CoordinateProbe.explode(statement)
+            expected.append(probe.sequence(genome))
+        self.assertEqual(
+            [(result.header, result.sequence)
+             for result in self.generate(RECORDS)],
+            [("1:6/2:8_del1", expected[0]),
+             ("1:6/2:5_inv1", expected[1]),
+             ("1:9/2:8", expected[2]),
+             ("1:6/2:8", expected[3])])
+
+    def test_only_a_chr_prefix_is_removed(self):
+        expected, = self.generate(["1\t5\t6\t2\t7\t8\n"])
+        result, = self.generate(["chr1\t5\t6\ths37d5\t7\t8\n"])
+        self.assertEqual((result.header, result.sequence),
+                         ("1:6/hs37d5:8", expected.sequence))
+
+    def test_missing_chromosome(self):
+        result, = self.generate(["Y\t5\t6\t2\t7\t8\n"])
+        self.assertIsInstance(result.error, reference.MissingChromosome)
+
+    def test_invalid_record(self):
+        result, = self.generate(["1\tfive\t6\t2\t7\t8\n"])
+        self.assertIsNone(result.probe)
+        self.assertIsInstance(result.error, InvalidStatement)
+
+    def test_invalid_strand(self):
+        result, = self.generate(["1\t5\t6\t2\t7\t8\t.\t.\t+\tx\n"])
+        self.assertIsInstance(result.error, InvalidStatement)
+
+    def test_chromosomes_of_consecutive_records_are_read_once(self):
+        with mock.patch.object(self.genome, 'chromosome',
+                               wraps=self.genome.chromosome) as chromosome:
+            self.generate(RECORDS)
+        self.assertEqual(
+            [call[0][0] for call in chromosome.call_args_list], ['1', '2'])
@@ -0,0 +1,42 @@
+import unittest
+
+from probe_generator.cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LruCache(2)
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+
+    def test_get_returns_cached_value(self):
+        self.assertEqual(self.cache.get('a'), 1)
+
+    def test_get_returns_default_when_key_missing(self):
+        self.assertEqual(self.cache.get('c', 'banana'), 'banana')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.get('a')
+        self.cache.get('a')
+        self.cache.get('c')
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_sizeof_budgets_total_size_of_values(self):
+        cache = LruCache(5, sizeof=len)
+        cache.put('a', 'aaa')
+        cache.put('b', 'bb')
+        cache.put('c', 'c')
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('a', cache)
+
+    def test_values_larger_than_the_budget_are_not_cached(self):
+        cache = LruCache(2, sizeof=len)
+        cache.put('a', 'aaa')
+        self.assertNotIn('a', cache)
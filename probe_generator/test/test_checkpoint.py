@@ -0,0 +1,154 @@
+import unittest
+import contextlib
+import functools
+import json
+import os
+import tempfile
+
+from probe_generator import checkpoint, dedup, print_probes
+
+STATEMENTS = ["1:{} -- {}".format(variant, number)
+              for number, variant in enumerate(
+                      ["5 a>c /4", "6 c>g /4", "7 g>t /4", "8 t>a /4",
+                       "9 a>c /4"] * 2)]
+
+
+class Interrupted(Exception):
+    pass
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test cases for resuming interrupted runs.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.statement_file = self.path('statements')
+        self.genome_file = self.path('genome')
+        self.output_file = self.path('output')
+        self.checkpoint_file = self.path('checkpoint')
+        self.duplicates_file = self.path('duplicates')
+        with open(self.genome_file, 'w') as handle:
+            handle.write(">1\nacgtacgtacgtacgt\n")
+        with open(self.statement_file, 'w') as handle:
+            for statement in STATEMENTS:
+                print(statement, file=handle)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_probes(self, *, resume=False, fail_after=None, deduplicate=False,
+                   list_duplicates=False):
+        """Run print_probes with a checkpoint, raising Interrupted after
+        `fail_after` probes have been written.
+
+        """
+        progress = checkpoint.Checkpoint(self.checkpoint_file, every=2)
+        if resume:
+            progress.load()
+        written = []
+        with contextlib.ExitStack() as stack:
+            output = stack.enter_context(
+                progress.open_output(self.output_file))
+            duplicates = None
+            if list_duplicates:
+                duplicates = stack.enter_context(
+                    progress.open_duplicates(self.duplicates_file))
+            def write(head, bases):
+                if fail_after is not None and len(written) == fail_after:
+                    raise Interrupted()
+                written.append(head)
+                print_probes.print_fasta(head, bases, file=output)
+            deduplicator = None
+            if deduplicate:
+                deduplicator = dedup.Deduplicator(
+                    write, duplicates=duplicates)
+                with open(self.output_file) as handle:
+                    for head, bases in checkpoint.read_fasta(handle):
+                        deduplicator.seen(head, bases)
+            print_probes.print_probes(
+                self.statement_file, self.genome_file,
+                write=write,
+                deduplicator=deduplicator,
+                checkpoint=progress)
+        return written
+
+    def read_output(self):
+        with open(self.output_file) as handle:
+            return handle.read()
+
+    def test_complete_run_is_recorded(self):
+        self.run_probes()
+        with open(self.checkpoint_file) as handle:
+            data = json.load(handle)
+        self.assertTrue(data['complete'])
+        self.assertEqual(data['statements_done'], len(STATEMENTS))
+        self.assertEqual(data['statement_offset'],
+                         os.path.getsize(self.statement_file))
+        self.assertEqual(data['output_offset'],
+                         os.path.getsize(self.output_file))
+
+    def test_resumed_run_gives_the_same_output(self):
+        self.run_probes()
+        expected = self.read_output()
+        os.unlink(self.checkpoint_file)
+
+        with self.assertRaises(Interrupted):
+            self.run_probes(fail_after=5)
+        written = self.run_probes(resume=True)
+        self.assertEqual(self.read_output(), expected)
+        # Only the statements after the last checkpoint are redone
+        self.assertEqual(len(written), len(STATEMENTS) - 4)
+
+    def test_resuming_a_complete_run_does_nothing(self):
+        self.run_probes()
+        expected = self.read_output()
+        self.assertEqual(self.run_probes(resume=True), [])
+        self.assertEqual(self.read_output(), expected)
+
+    def test_duplicates_written_before_the_interruption_are_remembered(self):
+        self.run_probes(deduplicate=True)
+        expected = self.read_output()
+        os.unlink(self.checkpoint_file)
+
+        with self.assertRaises(Interrupted):
+            self.run_probes(fail_after=3, deduplicate=True)
+        self.run_probes(resume=True, deduplicate=True)
+        self.assertEqual(self.read_output(), expected)
+
+    def test_duplicates_listed_after_the_checkpoint_are_discarded(self):
+        with open(self.statement_file, 'w') as handle:
+            for number, variant in enumerate(
+                    ["5 a>c /4"] * 3 + ["6 c>g /4"]):
+                print("1:{} -- {}".format(variant, number), file=handle)
+        self.run_probes(deduplicate=True, list_duplicates=True)
+        with open(self.duplicates_file) as handle:
+            expected = handle.read()
+        os.unlink(self.checkpoint_file)
+
+        # Interrupted after the third statement's duplicate has been listed,
+        # but before its progress was saved
+        with self.assertRaises(Interrupted):
+            self.run_probes(
+                fail_after=1, deduplicate=True, list_duplicates=True)
+        self.run_probes(resume=True, deduplicate=True, list_duplicates=True)
+        with open(self.duplicates_file) as handle:
+            self.assertEqual(handle.read(), expected)
+
+    def test_truncated_output_cannot_be_resumed(self):
+        self.run_probes()
+        with open(self.output_file, 'w'):
+            pass
+        progress = checkpoint.Checkpoint(self.checkpoint_file)
+        progress.load()
+        with self.assertRaises(checkpoint.InvalidCheckpoint):
+            progress.open_output(self.output_file)
+
+    def test_unreadable_checkpoint_raises_InvalidCheckpoint(self):
+        with open(self.checkpoint_file, 'w') as handle:
+            handle.write("banana")
+        with self.assertRaises(checkpoint.InvalidCheckpoint):
+            checkpoint.Checkpoint(self.checkpoint_file).load()
@@ -16,14 +16,14 @@ class TestCoordinateStatementParse(unittest.TestCase):
         self.specification = {
                   "chromosome1": '1',
                   "index1":       4,
+                  "last1":        4,
                   "operation1":   '-',
                   "bases1":       2,
-                  "breakpoint1":  4,
                   "chromosome2":  '2',
                   "index2":       3,
+                  "last2":        3,
                   "operation2":   '+',
                   "bases2":       3,
-                  "breakpoint2":  3,
                   "rc_side_1":    False,
                   "rc_side_2":    False,
                   "comment":      "",
@@ -89,3 +89,35 @@ class TestCoordinateStatementParse(unittest.TestCase):
             CoordinateProbe.explode("GL0021.1:1-25 / GL001234.1:2+25")
         except InvalidStatement:
             self.fail()
+
+
+class TestCoordinateRangeStatements(unittest.TestCase):
+    def test_range_probes_match_single_breakpoint_statements(self):
+        probes = CoordinateProbe.explode("1:3~5-2/2:3~4+2")
+        expected = []
+        for index1 in range(3, 6):
+            for index2 in range(3, 5):
+                probe, = CoordinateProbe.explode(
+                    "1:{}-2/2:{}+2".format(index1, index2))
+                expected.append((str(probe), probe.sequence(GENOME)))
+        self.assertEqual(
+            [(str(probe), probe.sequence(GENOME)) for probe in probes],
+            expected)
+
+    def test_reverse_complemented_sides(self):
+        first, *_, last = CoordinateProbe.explode("1:3~5+2/2:3~4-2")
+        self.assertEqual(
+            [(str(first), first.sequence(GENOME)),
+             (str(last), last.sequence(GENOME))],
+            [("1:5/2:1", "actt"), ("1:7/2:2", "gttt")])
+
+    def test_flanks_are_read_once(self):
+        first, *_, last = CoordinateProbe.explode("1:3~5-2/2:3~4+2")
+        genome = dict(GENOME)
+        first.sequence(genome)
+        del genome["1"], genome["2"]
+        self.assertEqual(last.sequence(genome), "taag")
+
+    def test_reversed_range_is_invalid(self):
+        with self.assertRaises(InvalidStatement):
+            CoordinateProbe.explode("1:5~3-2/2:3+2")
@@ -0,0 +1,96 @@
+import unittest
+import io
+
+from probe_generator import dedup
+
+
+class TestDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.written = []
+        self.duplicates = io.StringIO()
+
+    def write(self, head, bases):
+        self.written.append((head, bases))
+
+    def test_unique_probes_are_written(self):
+        deduplicator = dedup.Deduplicator(self.write)
+        deduplicator.add('foo', 'AACC')
+        deduplicator.add('bar', 'AACG')
+        self.assertEqual(self.written, [('foo', 'AACC'), ('bar', 'AACG')])
+
+    def test_reverse_complement_and_case_are_duplicates(self):
+        deduplicator = dedup.Deduplicator(self.write)
+        self.assertTrue(deduplicator.add('foo', 'AACG'))
+        self.assertFalse(deduplicator.add('bar', 'cgtt'))
+        self.assertFalse(deduplicator.add('baz', 'aacg'))
+        self.assertEqual(self.written, [('foo', 'AACG')])
+        self.assertEqual(deduplicator.duplicate_count, 2)
+
+    def test_duplicates_are_listed_in_sidecar_file(self):
+        deduplicator = dedup.Deduplicator(
+            self.write, duplicates=self.duplicates)
+        deduplicator.add('foo', 'AACG')
+        deduplicator.add('bar', 'CGTT')
+        self.assertEqual(self.duplicates.getvalue(), "bar\tfoo\n")
+
+    def test_merged_headers_are_written_on_flush(self):
+        deduplicator = dedup.Deduplicator(self.write, merge=True)
+        deduplicator.add('foo', 'AACG')
+        deduplicator.add('bar', 'ACGT')
+        deduplicator.add('baz', 'CGTT')
+        self.assertEqual(self.written, [])
+        deduplicator.flush()
+        self.assertEqual(self.written,
+                         [('foo|baz', 'AACG'), ('bar', 'ACGT')])
+
+    def add_probes(self, deduplicator):
+        for head, bases in [('foo', 'AACG'), ('bar', 'ACGT'),
+                            ('baz', 'ACGT'), ('qux', 'CGTT')]:
+            deduplicator.add(head, bases)
+
+    def test_bounded_mode_keeps_probes_outside_the_window(self):
+        self.add_probes(dedup.Deduplicator(
+            self.write, duplicates=self.duplicates, window=1))
+        self.assertEqual(self.written, [('foo', 'AACG'), ('bar', 'ACGT'),
+                                        ('qux', 'CGTT')])
+        self.assertEqual(self.duplicates.getvalue(), "baz\tbar\n")
+
+    def test_window_size_sets_the_probes_checked(self):
+        self.add_probes(dedup.Deduplicator(
+            self.write, duplicates=self.duplicates, window=2))
+        self.assertEqual(self.written, [('foo', 'AACG'), ('bar', 'ACGT')])
+        self.assertEqual(self.duplicates.getvalue(),
+                         "baz\tbar\nqux\tfoo\n")
+
+    def test_bloom_filter_mode_removes_duplicates_outside_the_window(self):
+        self.add_probes(dedup.Deduplicator(
+            self.write, duplicates=self.duplicates, window=1, capacity=100))
+        self.assertEqual(self.written, [('foo', 'AACG'), ('bar', 'ACGT')])
+        self.assertEqual(self.duplicates.getvalue(),
+                         "baz\tbar\nqux\t*\n")
+
+    def test_merge_cannot_be_used_with_a_window(self):
+        with self.assertRaises(ValueError):
+            dedup.Deduplicator(self.write, merge=True, window=100)
+
+    def test_merge_cannot_be_used_with_bounded_capacity(self):
+        with self.assertRaises(ValueError):
+            dedup.Deduplicator(self.write, merge=True, capacity=100)
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_added_items_are_contained(self):
+        bloom_filter = dedup.BloomFilter(1000)
+        keys = [dedup.sequence_key(str(i)) for i in range(1000)]
+        for key in keys:
+            bloom_filter.add(key)
+        self.assertTrue(all(key in bloom_filter for key in keys))
+
+    def test_false_positive_rate_is_low(self):
+        bloom_filter = dedup.BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(dedup.sequence_key(str(i)))
+        false_positives = sum(
+            dedup.sequence_key(str(-i)) in bloom_filter
+            for i in range(1, 1001))
+        self.assertLess(false_positives, 50)
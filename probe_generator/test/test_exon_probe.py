@@ -2,6 +2,7 @@ import unittest
 
 from probe_generator.exon_probe import ExonProbe
 from probe_generator.probe import InvalidStatement
+from probe_generator.transcript import Transcript
 from probe_generator.test.test_constants import ANNOTATION, GENOME
 
 
@@ -93,8 +94,48 @@ class TestExplode(AbstractExonStatementTestCase):
         self.assertCountEqual(
                 [(probe._spec['exon1'], probe._spec['exon2'])
                   for probe in ExonProbe.explode(statement, ANNOTATION)],
-                 [(1, 1), (1, 2),
-                  (2, 1), (2, 2),])
+                 [(1, 1), (1, 2), (1, 3),
+                  (2, 1), (2, 2), (2, 3)])
+
+    def test_exons_shared_by_transcripts_give_one_probe(self):
+        annotation = ANNOTATION + [
+            Transcript({'name':       'FOO2',
+                        'proteinID':  'ABC',
+                        'exonStarts': '1,5,',
+                        'exonEnds':   '2,6,',
+                        'strand':     '+',
+                        'chrom':      '1',
+                        'cdsStart':   '1',
+                        'cdsEnd':     '6'})]
+        probes = ExonProbe.explode(
+            "ABC#exon[*]+2 / DEF#exon[1]-3", annotation)
+        self.assertEqual(
+            [(probe._spec['exon1'], probe._spec['transcripts1'])
+             for probe in probes],
+            [(1, ['FOO', 'FOO2']), (2, ['FOO']), (2, ['FOO2'])])
+        self.assertEqual(
+            [str(probe).split('_')[-2] for probe in probes],
+            ['FOO', 'FOO', 'FOO2'])
+
+    def test_probes_are_in_the_order_of_the_transcripts(self):
+        annotation = ANNOTATION + [
+            Transcript({'name':       'FOO2',
+                        'proteinID':  'ABC',
+                        'exonStarts': '1,5,',
+                        'exonEnds':   '2,6,',
+                        'strand':     '+',
+                        'chrom':      '1',
+                        'cdsStart':   '1',
+                        'cdsEnd':     '6'})]
+        probes = ExonProbe.explode(
+            "ABC#exon[*]*2 / DEF#exon[1]-3", annotation)
+        self.assertEqual(
+            [(probe._spec['side1'], probe._spec['exon1'],
+              probe._spec['transcripts1'][0])
+             for probe in probes],
+            [('+', 1, 'FOO'), ('+', 2, 'FOO'),
+             ('-', 1, 'FOO'), ('-', 2, 'FOO'),
+             ('+', 2, 'FOO2'), ('-', 2, 'FOO2')])
 
 
 class TestSequence(unittest.TestCase):
@@ -133,6 +174,9 @@ class TestSequence(unittest.TestCase):
     def test_arrow_GHI_first(self):
         self.assert_sequence("GHI#exon[2]-2 -> ABC#exon[1]+2", "cgcc")
 
+    def test_glob_bases_cover_whole_exons(self):
+        self.assert_sequence("ABC#exon[1]-* / GHI#exon[2]+*", "cCCCgg")
+
 
 class TestBreakpoints(unittest.TestCase):
     """Test cases for the breakpoints of exon probes.
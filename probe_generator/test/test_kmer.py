@@ -0,0 +1,98 @@
+import collections
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from probe_generator import kmer, sequence
+
+GENOME_FILE = (">1 chromosome 1\n"
+               "ACGTACGTNNAC\n"
+               "GTTTGCA\n"
+               ">2\n"
+               "acgtttgcaGGG\n")
+
+
+def canonical_kmers(bases, k):
+    """Return the canonical k-mers of a sequence as strings.
+
+    """
+    kmers = []
+    for start in range(len(bases) - k + 1):
+        forward = bases[start:start+k].upper()
+        if set(forward) <= set('ACGT'):
+            kmers.append(min(forward, sequence.reverse_complement(forward)))
+    return kmers
+
+
+class TestKmerIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.genome = os.path.join(self.directory.name, 'genome.fa')
+        with open(self.genome, 'w') as handle:
+            handle.write(GENOME_FILE)
+        self.path = os.path.join(self.directory.name, 'genome.kmers')
+        kmer.build_index(self.genome, self.path, 4)
+        self.index = kmer.KmerIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def test_codes_are_canonical(self):
+        self.assertEqual(
+            list(kmer.encode_kmers("ACGTNAAGCT", 3)),
+            list(kmer.encode_kmers("AGCTTNACGT", 3))[::-1])
+
+    def test_counts_match_genome(self):
+        expected = collections.Counter(
+            canonical_kmers("ACGTACGTNNACGTTTGCA", 4) +
+            canonical_kmers("acgtttgcaGGG", 4))
+        probe = "ACGTTTGCAGGGA"
+        self.assertEqual(
+            self.index.counts(probe),
+            [expected[kmer_string]
+             for kmer_string in canonical_kmers(probe, 4)])
+
+    def test_score_is_highest_count(self):
+        self.assertEqual(self.index.score("TGCAAA"), 2)
+        self.assertEqual(self.index.score("GTTTG"), 2)
+        self.assertEqual(self.index.score("CCCTA"), 1)
+        self.assertEqual(self.index.score("TTTTT"), 0)
+
+    def test_scorer_adds_score_and_filters(self):
+        written = []
+        scorer = kmer.KmerScorer(
+            self.index, lambda head, bases: written.append((head, bases)),
+            max_count=1)
+        scorer("repeated", "ACGTA")
+        scorer("unique", "CCCTA")
+        self.assertEqual(written, [("unique kmer_count=1", "CCCTA")])
+
+    def test_invalid_index(self):
+        with self.assertRaises(kmer.InvalidKmerIndex):
+            kmer.KmerIndex(self.genome)
+
+    def test_chunks_are_merged(self):
+        path = os.path.join(self.directory.name, 'chunked.kmers')
+        kmer.build_index(self.genome, path, 4, chunk_bases=3)
+        with open(self.path, 'rb') as expected, open(path, 'rb') as chunked:
+            self.assertEqual(chunked.read(), expected.read())
+
+    def test_large_genomes_need_numpy(self):
+        with mock.patch.object(kmer, 'numpy', None), \
+                mock.patch.object(kmer, 'PURE_PYTHON_MAX_SIZE', 10):
+            with self.assertRaises(ValueError):
+                kmer.build_index(self.genome, self.path, 4)
+
+    def test_invalid_kmer_size(self):
+        with self.assertRaises(ValueError):
+            kmer.build_index(self.genome, self.path, kmer.MAX_K + 1)
+
+    @unittest.skipIf(kmer.numpy is None, "numpy is not installed")
+    def test_numpy_encoding_matches_python(self):
+        bases = "acgtNNACGTTTGCAGGGATTACAnACGT" * 3
+        for k in (1, 4, 9):
+            self.assertEqual(
+                list(kmer._encode_kmers_numpy(bases, k)),
+                list(kmer.encode_kmers(bases, k)))
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from docopt import docopt
+
+from probe_generator import __main__
+
+USAGES = (
+    "-s statements.txt -g genome.fa -a annotation.txt",
+    "-s statements.txt --server localhost:8470",
+    "--vcf variants.vcf -g genome.fa --bases 50",
+    "--bedpe variants.bedpe -g genome.fa --bases 50",
+    "serve -g genome.fa -a annotation.txt",
+    "merge shard1.fa shard2.fa",
+    "build-kmer-index -g genome.fa --output genome.kmers",
+    "panel -g genome.fa -a annotation.txt --genes genes.txt --bases 50",
+    "--plan -s statements.txt -a annotation.txt",
+    )
+
+OUTPUT_USAGES = (
+    "-s statements.txt -g genome.fa -o probes.fa --checkpoint run.json",
+    "--vcf variants.vcf -g genome.fa --bases 50 -o probes.fa",
+    "--bedpe variants.bedpe -g genome.fa --bases 50 -o probes.fa",
+    "merge shard1.fa shard2.fa -o probes.fa",
+    "panel -g genome.fa --genes genes.txt --bases 50 -o probes.fa",
+    "build-kmer-index -g genome.fa -o genome.kmers",
+    )
+
+
+class TestUsage(unittest.TestCase):
+    def test_every_usage_line_parses(self):
+        for usage in USAGES:
+            with self.subTest(usage=usage):
+                docopt(__main__.__doc__, argv=usage.split())
+
+    def test_output_is_accepted_by_every_command(self):
+        for usage in OUTPUT_USAGES:
+            with self.subTest(usage=usage):
+                args = docopt(__main__.__doc__, argv=usage.split())
+                self.assertIsNotNone(args['--output'])
+
+
+class TestDeduplicator(unittest.TestCase):
+    def written(self, options):
+        args = docopt(__main__.__doc__,
+                      argv="-s statements.txt -g genome.fa -d".split() +
+                      options)
+        written = []
+        deduplicator = __main__._deduplicator(
+            args, lambda head, bases: written.append(head), None)
+        for head, bases in [('foo', 'AACG'), ('bar', 'ACGT'),
+                            ('baz', 'CGTT')]:
+            deduplicator.add(head, bases)
+        return written
+
+    def test_dedup_window_sets_the_probes_checked(self):
+        self.assertEqual(self.written(['--dedup-window', '1']),
+                         ['foo', 'bar', 'baz'])
+        self.assertEqual(self.written(['--dedup-window', '2']),
+                         ['foo', 'bar'])
+
+
+class TestUnsupportedOptions(unittest.TestCase):
+    def assert_rejected(self, usage, message):
+        stderr = io.StringIO()
+        with mock.patch('sys.argv', ['probe-generator'] + usage.split()), \
+                contextlib.redirect_stderr(stderr):
+            with self.assertRaises(SystemExit):
+                __main__.main()
+        self.assertIn(message, stderr.getvalue())
+
+    def test_statement_run_options_are_rejected(self):
+        for usage, message in [
+                ("--vcf variants.vcf -g genome.fa --bases 50 --shard 1/2",
+                 "--shard cannot be used with --vcf"),
+                ("--bedpe variants.bedpe -g genome.fa --bases 50 --timings",
+                 "--timings cannot be used with --bedpe"),
+                ("panel -g genome.fa --genes genes.txt --bases 50 --profile",
+                 "--profile cannot be used with panel"),
+                ("-s statements.txt --server localhost:8470 --resume",
+                 "--resume cannot be used with --server"),
+                ("merge shard1.fa --checkpoint run.json",
+                 "--checkpoint cannot be used with merge"),
+                ]:
+            with self.subTest(usage=usage):
+                self.assert_rejected(usage, message)
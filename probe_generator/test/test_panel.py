@@ -0,0 +1,72 @@
+import unittest
+import io
+import itertools
+from unittest import mock
+
+from probe_generator import panel, reference
+from probe_generator.annotation import AnnotationIndex
+from probe_generator.exceptions import NonFatalError
+from probe_generator.exon_probe import ExonProbe
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+GENES = ["ABC", "DEF", "GHI", "MNO"]
+
+
+class TestPanel(unittest.TestCase):
+    def setUp(self):
+        self.panel = panel.Panel(GENOME, AnnotationIndex(ANNOTATION), 2)
+
+    def statement_probes(self, gene1, gene2):
+        """Return the probes of the equivalent exon statement.
+
+        """
+        probes = []
+        statement = "{}#exon[*] -2 -> {}#exon[*] +2".format(gene1, gene2)
+        for probe in ExonProbe.explode(statement, ANNOTATION):
+            try:
+                probes.append((str(probe), probe.sequence(GENOME)))
+            except (NonFatalError, reference.NonContainedRange):
+                pass
+        return probes
+
+    def test_probes_match_exon_statements(self):
+        pairs = list(itertools.permutations(GENES, 2))
+        with mock.patch('sys.stderr', io.StringIO()):
+            probes = list(self.panel.probes(pairs))
+        expected = []
+        for gene1, gene2 in pairs:
+            expected.extend(self.statement_probes(gene1, gene2))
+        self.assertEqual(probes, expected)
+
+    def test_windows_are_fetched_once_per_gene(self):
+        pairs = list(itertools.permutations(GENES, 2))
+        with mock.patch.object(reference, 'bases',
+                               wraps=reference.bases) as bases:
+            list(self.panel.probes(pairs))
+        windows = sum(len(self.panel.windows(gene, side))
+                      for gene in GENES
+                      for side in (panel.DONOR, panel.ACCEPTOR))
+        self.assertEqual(bases.call_count, windows)
+
+    def test_missing_genes_give_a_warning(self):
+        with mock.patch('sys.stderr', io.StringIO()) as stderr:
+            probes = list(self.panel.probes([("ABC", "NOT_A_GENE")]))
+        self.assertEqual(probes, [])
+        self.assertIn("'NOT_A_GENE' is not in the annotations",
+                      stderr.getvalue())
+
+
+class TestReadPanel(unittest.TestCase):
+    def test_read_genes_gives_every_ordered_pair(self):
+        genes = io.StringIO("FOO\n\n# comment\nBAR  # trailing\n")
+        self.assertEqual(panel.read_genes(genes),
+                         [("FOO", "BAR"), ("BAR", "FOO")])
+
+    def test_read_pairs(self):
+        pairs = io.StringIO("FOO\tBAR\nBAR BAZ\n")
+        self.assertEqual(panel.read_pairs(pairs),
+                         [("FOO", "BAR"), ("BAR", "BAZ")])
+
+    def test_read_pairs_raises_ValueError_on_bad_lines(self):
+        with self.assertRaises(ValueError):
+            panel.read_pairs(io.StringIO("FOO\n"))
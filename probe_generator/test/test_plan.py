@@ -0,0 +1,96 @@
+import unittest
+import io
+import os
+import tempfile
+
+from probe_generator import annotation, plan, session
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self):
+        self.annotations = annotation.AnnotationIndex(ANNOTATION)
+
+    def plan(self, statement):
+        result, = plan.plan_statements([statement], self.annotations)
+        return result
+
+    def test_probes_and_bytes_are_counted(self):
+        result = self.plan("1:4 t>g /8\n")
+        self.assertEqual(result.probe_type, "SnpProbe")
+        self.assertEqual(result.probes, 1)
+        self.assertEqual(result.bytes, len(">1:4_t>g/8\nacggacgt\n"))
+        self.assertEqual(result.problems, [])
+
+    def test_estimate_matches_output_for_gene_statements(self):
+        statement = "ABC: c.1 C>T /4\n"
+        probes = session.ProbeGenerator(GENOME, ANNOTATION).generate(
+            statement)
+        result = self.plan(statement)
+        self.assertEqual(result.probes, 1)
+        self.assertEqual(
+            result.bytes,
+            sum(len(">{}\n{}\n".format(probe.header, "n" * 4))
+                for probe in probes))
+
+    def test_whole_exon_glob_statements_are_planned(self):
+        statement = "ABC#exon[*] ** / DEF#exon[*] **\n"
+        probes = list(session.ProbeGenerator(GENOME, ANNOTATION).generate(
+            statement))
+        result = self.plan(statement)
+        self.assertEqual(result.problems, [])
+        self.assertEqual(result.probes, len(probes))
+        self.assertEqual(
+            result.bytes,
+            sum(len(">{}\n{}\n".format(probe.header, probe.sequence))
+                for probe in probes))
+
+    def test_saturation_statements_are_planned(self):
+        result = self.plan("GHI: *all* /9\n")
+        self.assertEqual(result.problems, [])
+        self.assertEqual(result.probes, 2 * 64)
+        self.assertGreater(result.bytes, 0)
+        self.assertEqual(plan.print_problems([result], io.StringIO()), 0)
+
+    def test_invalid_statements_are_reported(self):
+        result = self.plan("banana\n")
+        self.assertEqual(result.probes, 0)
+        self.assertEqual(result.problems, ["the statement could not be parsed"])
+
+    def test_missing_genes_are_reported(self):
+        result = self.plan("NOT_A_GENE: c.1 C>T /4\n")
+        self.assertEqual(result.problems, [
+            "the gene 'NOT_A_GENE' is not in the annotations",
+            "no probes would be generated"])
+
+    def test_out_of_range_indices_are_reported(self):
+        result = self.plan("ABC: c.100 C>T /4\n")
+        self.assertEqual(result.probes, 0)
+        self.assertEqual(len(result.problems), 2)
+
+    def test_print_problems_counts_statements_with_problems(self):
+        plans = list(plan.plan_statements(
+            ["1:4 t>g /8\n", "banana\n"], self.annotations))
+        output = io.StringIO()
+        self.assertEqual(plan.print_problems(plans, output), 1)
+        self.assertEqual(
+            output.getvalue(),
+            "'banana': the statement could not be parsed\n"
+            "1 of 2 statements have problems\n")
+
+
+class TestPlanFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.statement_file = os.path.join(self.directory.name, 'statements')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_annotations_are_not_loaded_without_gene_statements(self):
+        with open(self.statement_file, 'w') as handle:
+            handle.write("1:4 t>g /8\n")
+        result, = plan.plan_file(
+            self.statement_file,
+            [os.path.join(self.directory.name, 'no_such_file')])
+        self.assertEqual(result.probes, 1)
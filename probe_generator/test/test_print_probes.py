@@ -1,6 +1,9 @@
 import unittest
+from unittest import mock
 import sys
 import io
+import os
+import tempfile
 
 from probe_generator import print_probes
 
@@ -37,3 +40,71 @@ class TestPrintProbes(unittest.TestCase):
         self.assertEqual(
                 sys.stdout.getvalue(),
                 ">foo\nbar\n")
+
+
+class TestStatementCache(unittest.TestCase):
+    """Test cases for the caching of repeated statements.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.statement_file = os.path.join(self.directory.name, 'statements')
+        self.genome_file = os.path.join(self.directory.name, 'genome')
+        with open(self.genome_file, 'w') as handle:
+            handle.write(">1\nacgtacgt\n")
+
+        self.stdout_backup = sys.stdout
+        sys.stdout = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout.close()
+        sys.stdout = self.stdout_backup
+        self.directory.cleanup()
+
+    def write_statements(self, *statements):
+        with open(self.statement_file, 'w') as handle:
+            for statement in statements:
+                print(statement, file=handle)
+
+    def test_equivalent_statements_have_the_same_key(self):
+        keys = set()
+        for statement in ("1:4 t>g /8", "1 : 4t>g/8", "1:4 t>g /8 -- hi"):
+            probe_class, specification = print_probes.parse_statement(
+                statement)
+            keys.add(print_probes.canonical_key(probe_class, specification))
+        self.assertEqual(len(keys), 1)
+
+    def test_statements_differing_in_case_are_printed_separately(self):
+        self.write_statements("1:4 t>g /8", "1:4 t>G /8")
+        print_probes.print_probes(
+            self.statement_file, self.genome_file, cache_size=10)
+        self.assertEqual(
+            sys.stdout.getvalue(),
+            ">1:4_t>g/8\nacggacgt\n"
+            ">1:4_t>G/8\nacgGacgt\n")
+
+    def test_gene_names_are_case_sensitive_in_keys(self):
+        keys = set()
+        for statement in ("ABC: c.1 C>T /4", "abc: c.1 C>T /4"):
+            probe_class, specification = print_probes.parse_statement(
+                statement)
+            keys.add(print_probes.canonical_key(probe_class, specification))
+        self.assertEqual(len(keys), 2)
+
+    def test_repeated_statements_are_printed_with_their_own_comment(self):
+        self.write_statements("1:4 t>g /8 -- one", "1:4 t>g /8 -- two")
+        print_probes.print_probes(
+            self.statement_file, self.genome_file, cache_size=10)
+        self.assertEqual(
+            sys.stdout.getvalue(),
+            ">1:4_t>g/8-- one\nacggacgt\n"
+            ">1:4_t>g/8-- two\nacggacgt\n")
+
+    def test_repeated_statements_are_exploded_once(self):
+        self.write_statements("1:4 t>g /8", "1:4t>g/8")
+        with mock.patch.object(
+                print_probes, 'explode_statement',
+                wraps=print_probes.explode_statement) as explode:
+            print_probes.print_probes(
+                self.statement_file, self.genome_file, cache_size=10)
+        self.assertEqual(explode.call_count, 1)
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from probe_generator import print_probes, probe, reference
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+STATEMENTS = (
+    "1:4 t>g /4",
+    "1:4 t>* /4",
+    "2:4-2/3:6+2",
+    "ABC: c.1 C>T /4",
+    "GHI: P2X /9",
+    "MNO: G2M [trans] /9",
+    "MNO: tile /5",
+    )
+
+
+def explode(statement):
+    probe_class, _ = print_probes.parse_statement(statement)
+    return list(print_probes.explode_statement(
+        probe_class, statement, ANNOTATION))
+
+
+class TestFetchMany(unittest.TestCase):
+    def setUp(self):
+        self.probes = [probe for statement in STATEMENTS
+                       for probe in explode(statement)]
+
+    def test_sequences_match_probe_sequences(self):
+        expected = []
+        for the_probe in self.probes:
+            try:
+                expected.append((the_probe.sequence(GENOME), None))
+            except probe.NonFatalError as error:
+                expected.append((None, type(error)))
+        self.assertEqual(
+            [(bases, None if error is None else type(error))
+             for bases, error in probe.fetch_many(self.probes, GENOME)],
+            expected)
+
+    def test_each_range_is_read_once_in_order(self):
+        with mock.patch.object(reference, 'bases',
+                               wraps=reference.bases) as bases:
+            probe.fetch_many(explode("1:4 t>* /4"), GENOME)
+        windows = [(sequence_range.chromosome,
+                    sequence_range.start,
+                    sequence_range.end)
+                   for (sequence_range, _), _ in bases.call_args_list]
+        self.assertEqual(windows, sorted(set(windows)))
+        self.assertEqual(len(windows), 3)
+
+    def test_reference_mismatches_are_reported_per_probe(self):
+        results = probe.fetch_many(explode("GHI: P2M /9"), GENOME)
+        self.assertEqual([bases for bases, error in results if error is None],
+                         ["cccCATccc"])
+        self.assertEqual(
+            len([error for _, error in results
+                 if isinstance(error, probe.ReferenceMismatch)]), 3)
+
+    def test_missing_chromosomes_are_reported(self):
+        (bases, error), = probe.fetch_many(explode("ABC: c.1 C>T /4"), {})
+        self.assertIsNone(bases)
+        self.assertIsInstance(error, reference.MissingChromosome)
+
+
+class TestSlots(unittest.TestCase):
+    def test_probes_and_variants_have_no_instance_dictionary(self):
+        for statement in STATEMENTS:
+            for generated_probe in explode(statement):
+                self.assertFalse(hasattr(generated_probe, '__dict__'),
+                                 statement)
+                self.assertFalse(
+                    hasattr(generated_probe.variant, '__dict__'), statement)
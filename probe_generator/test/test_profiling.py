@@ -0,0 +1,122 @@
+import unittest
+import io
+import json
+import time
+
+from probe_generator import annotation, print_probes, profiling, reference
+from probe_generator.cache import LruCache
+from probe_generator.exon_probe import ExonProbe
+from probe_generator.snp_probe import SnpProbe
+from probe_generator.transcript import Transcript
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+
+class TestTimer(unittest.TestCase):
+    def test_nested_time_is_counted_once(self):
+        timer = profiling.Timer()
+        with timer:
+            with timer:
+                pass
+            inner_total = timer.total
+        self.assertEqual(inner_total, 0)
+        self.assertGreater(timer.total, 0)
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = profiling.Profiler(top=1)
+
+    def test_instrumented_functions_are_restored_on_exit(self):
+        originals = (annotation.lookup_gene,
+                     reference.bases,
+                     Transcript.exons)
+        with self.profiler:
+            self.assertNotEqual(annotation.lookup_gene, originals[0])
+        self.assertEqual(
+            (annotation.lookup_gene, reference.bases, Transcript.exons),
+            originals)
+
+    def test_calls_to_instrumented_functions_are_timed(self):
+        with self.profiler:
+            for probe in ExonProbe.explode(
+                    "ABC#exon[1]+2 / GHI#exon[2]+2", ANNOTATION):
+                probe.sequence(GENOME)
+        timers = self.profiler.function_timers
+        self.assertEqual(timers['annotation.lookup_gene'].calls, 2)
+        self.assertEqual(timers['reference.bases'].calls, 2)
+        self.assertGreater(timers['Transcript coordinate mapping'].calls, 0)
+
+    def test_report_lists_probe_classes_and_slowest_statements(self):
+        for statement, time in (("1:4 t>g /8", 1), ("1:5 a>g /8", 2)):
+            record = profiling.StatementRecord(statement, SnpProbe)
+            record.fetch_timer.total = time
+            record.probes = 1
+            record.add_output("head", "acgt")
+            self.profiler.add(record)
+        report = io.StringIO()
+        self.profiler.report(report)
+        self.assertIn("2 statements (2 probes, 22 bytes)", report.getvalue())
+        self.assertRegex(report.getvalue(), r"SnpProbe +2 +2 ")
+        self.assertIn("'1:5 a>g /8'", report.getvalue())
+        self.assertNotIn("'1:4 t>g /8'", report.getvalue())
+
+
+class TestPhaseTimings(unittest.TestCase):
+    def setUp(self):
+        self.timings = profiling.PhaseTimings()
+
+    def test_phases_record_time_and_peak_memory(self):
+        with self.timings:
+            with self.timings.phase('genome'):
+                blocks = [bytearray(1024) for _ in range(100)]
+        genome = self.timings.as_dict()['phases']['genome']
+        self.assertEqual(genome['calls'], 1)
+        self.assertGreater(genome['seconds'], 0)
+        self.assertGreaterEqual(genome['rss_growth_kb'], 0)
+        self.assertGreater(genome['process_peak_rss_kb'], 0)
+        self.assertGreaterEqual(genome['peak_traced_bytes'], 100 * 1024)
+
+    def test_nested_phases_pause_the_outer_phase(self):
+        with self.timings:
+            with self.timings.phase('output'):
+                with self.timings.phase('fetch'):
+                    time.sleep(0.05)
+        phases = self.timings.as_dict()['phases']
+        self.assertGreaterEqual(phases['fetch']['seconds'], 0.05)
+        self.assertLess(phases['output']['seconds'], 0.05)
+        self.assertEqual(phases['output']['calls'], 1)
+
+    def test_output_phase_is_entered_once(self):
+        with self.timings:
+            print_probes.print_statements(
+                ["1:4 t>g /8", "1:4 t>a /8"], GENOME, ANNOTATION,
+                write=lambda head, bases: None, timings=self.timings)
+        phases = self.timings.as_dict()['phases']
+        self.assertEqual(phases['output']['calls'], 1)
+        self.assertEqual(phases['explode']['calls'], 2)
+
+    def test_all_phases_are_reported(self):
+        with self.timings:
+            pass
+        self.assertCountEqual(
+            self.timings.as_dict()['phases'].keys(),
+            profiling.PHASES)
+
+    def test_timings_are_written_as_one_line_of_json(self):
+        with self.timings:
+            pass
+        output = io.StringIO()
+        self.timings.write(output)
+        self.assertEqual(output.getvalue().count('\n'), 1)
+        self.assertEqual(
+            json.loads(output.getvalue())['phases']['output']['calls'], 0)
+
+    def test_cache_hits_and_misses_are_reported(self):
+        cache = LruCache(10)
+        cache.put('key', 'value')
+        cache.get('key')
+        cache.get('other')
+        self.timings.add_cache('windows', cache)
+        self.assertEqual(
+            self.timings.as_dict()['caches'],
+            {'windows': {'hits': 1, 'misses': 1, 'entries': 1}})
@@ -1,3 +1,4 @@
+import io
 import unittest
 import os
 
@@ -93,6 +94,11 @@ class TestReferenceGenome(unittest.TestCase):
                 reference.reference_genome(iter(MOCK_GENOME_FILE)),
                 MOCK_REFERENCE_GENOME)
 
+    def test_reference_keeps_only_the_chromosomes_given(self):
+        genome = reference.reference_genome(
+            iter(MOCK_GENOME_FILE), chromosomes={'1'})
+        self.assertEqual(genome, {'1': MOCK_REFERENCE_GENOME['1']})
+
     def test_reference_raises_InvalidGenomeFile_on_empty_input(self):
         message = "genome file empty!"
         with self.assertRaisesRegex(reference.InvalidGenomeFile, message):
@@ -104,6 +110,67 @@ class TestReferenceGenome(unittest.TestCase):
             reference.reference_genome(iter(['banana']))
 
 
+class TestCachedGenome(unittest.TestCase):
+    """Test cases for the reference.CachedGenome class.
+
+    """
+    def setUp(self):
+        self.genome = reference.CachedGenome(MOCK_REFERENCE_GENOME)
+
+    def test_cached_windows_are_returned(self):
+        for _ in range(3):
+            self.assertEqual(
+                reference.bases(SequenceRange('1', 2, 8), self.genome),
+                "AACCCC")
+        self.assertEqual(self.genome.windows.misses, 1)
+        self.assertEqual(self.genome.windows.hits, 2)
+
+    def test_mutation_does_not_change_the_window(self):
+        reference.bases(SequenceRange('1', 4, 5, mutation='A'), self.genome)
+        reference.bases(SequenceRange('1', 4, 5, mutation='G'), self.genome)
+        self.assertEqual(self.genome.windows.hits, 1)
+
+    def test_strands_are_cached_separately(self):
+        self.assertEqual(
+            reference.bases(SequenceRange('1', 2, 8), self.genome),
+            "AACCCC")
+        self.assertEqual(
+            reference.bases(SequenceRange('1', 2, 8, reverse_complement=True),
+                            self.genome),
+            "GGGGTT")
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(reference.MissingChromosome):
+                reference.bases(SequenceRange('Y', 2, 8), self.genome)
+        self.assertEqual(len(self.genome.windows), 0)
+
+
+class TestIndexedGenome(unittest.TestCase):
+    """Test cases for the reference.IndexedGenome class.
+
+    """
+    def setUp(self):
+        self.genome = reference.IndexedGenome(
+            io.BytesIO(''.join(MOCK_GENOME_FILE).encode('utf-8')))
+
+    def test_chromosomes_are_read_one_at_a_time(self):
+        for chromosome, bases in MOCK_REFERENCE_GENOME.items():
+            self.assertEqual(self.genome.chromosome(chromosome), bases)
+
+    def test_contains(self):
+        self.assertIn('X', self.genome)
+        self.assertNotIn('Y', self.genome)
+
+    def test_missing_chromosome(self):
+        with self.assertRaises(reference.MissingChromosome):
+            self.genome.chromosome('Y')
+
+    def test_empty_genome(self):
+        with self.assertRaises(reference.InvalidGenomeFile):
+            reference.IndexedGenome(io.BytesIO(b''))
+
+
 class TestReferenceGenomeBasesIntegration(TestReferenceBases):
     """Integration tests for reference.reference_genome and reference.bases.
 
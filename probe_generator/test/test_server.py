@@ -0,0 +1,158 @@
+import contextlib
+import errno
+import io
+import unittest
+import os
+import socket
+import tempfile
+import threading
+from http import client
+
+from probe_generator import server, session
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+
+class FailingRunner(object):
+    def run(self, statements):
+        raise RuntimeError("no genome")
+
+
+class TestStatementRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = server.StatementRunner(
+            session.ProbeGenerator(GENOME, ANNOTATION))
+
+    def test_run_returns_probes_and_warnings(self):
+        probes, warnings = self.runner.run(["1:4 t>g /8\n", "banana\n"])
+        self.assertEqual(probes, [("1:4_t>g/8", "acggacgt")])
+        self.assertEqual(
+            warnings,
+            ["WARNING: the statement 'banana\\n' could not be parsed"])
+
+
+class TestParseAddress(unittest.TestCase):
+    def test_host_and_port(self):
+        self.assertEqual(server.parse_address("localhost:8000"),
+                         ('tcp', ('localhost', 8000)))
+        self.assertEqual(server.parse_address("http://127.0.0.1:8000/"),
+                         ('tcp', ('127.0.0.1', 8000)))
+
+    def test_port_only(self):
+        self.assertEqual(server.parse_address("8000"),
+                         ('tcp', ('localhost', 8000)))
+
+    def test_unix_socket(self):
+        self.assertEqual(server.parse_address("/tmp/probes.sock"),
+                         ('unix', '/tmp/probes.sock'))
+        self.assertEqual(server.parse_address("unix:probes.sock"),
+                         ('unix', 'probes.sock'))
+
+    def test_invalid_address_raises_ServerError(self):
+        with self.assertRaises(server.ServerError):
+            server.parse_address("localhost:banana")
+
+
+class TestProbeServer(unittest.TestCase):
+    """Round-trip tests of the probe server and client.
+
+    """
+    def setUp(self):
+        self.runner = server.StatementRunner(
+            session.ProbeGenerator(GENOME, ANNOTATION))
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_round_trip(self, probe_server, address):
+        thread = threading.Thread(target=probe_server.serve_forever)
+        thread.start()
+        try:
+            probes, warnings = server.request_probes(
+                address, "ABC: c.1 insT /4\nGHI: P2M /9\n")
+        finally:
+            probe_server.shutdown()
+            probe_server.server_close()
+            thread.join()
+        self.assertEqual(probes, [("ABC:c.1insT/4_FOO_1:2", "aTcg"),
+                                  ("GHI:P2M(CCC>ATG)/9_BAZ_3:13",
+                                   "cccCATccc")])
+        self.assertEqual(warnings, [])
+
+    def test_tcp_server(self):
+        probe_server = server.make_server("localhost:0", self.runner)
+        self.assert_round_trip(
+            probe_server,
+            "localhost:{}".format(probe_server.server_address[1]))
+
+    def run_server(self, runner, request):
+        probe_server = server.make_server("localhost:0", runner)
+        thread = threading.Thread(target=probe_server.serve_forever)
+        thread.start()
+        try:
+            connection = client.HTTPConnection(
+                "localhost", probe_server.server_address[1])
+            try:
+                request(connection)
+                response = connection.getresponse()
+                response.read()
+            finally:
+                connection.close()
+        finally:
+            probe_server.shutdown()
+            probe_server.server_close()
+            thread.join()
+        return response.status
+
+    def test_generator_errors_give_500(self):
+        with contextlib.redirect_stderr(io.StringIO()) as log:
+            status = self.run_server(
+                FailingRunner(),
+                lambda connection: connection.request(
+                    'POST', '/probes', b"1:4 t>g /8\n"))
+        self.assertEqual(status, 500)
+        self.assertIn("no genome", log.getvalue())
+
+    def test_malformed_body_gives_400(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            status = self.run_server(
+                self.runner,
+                lambda connection: connection.request(
+                    'POST', '/probes', b"\xff\xfe"))
+        self.assertEqual(status, 400)
+
+    def test_unix_socket_server(self):
+        path = os.path.join(self.directory.name, 'probes.sock')
+        probe_server = server.make_server(path, self.runner)
+        self.assert_round_trip(probe_server, path)
+
+    def test_stale_unix_socket_is_replaced(self):
+        path = os.path.join(self.directory.name, 'probes.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(path)
+        probe_server = server.make_server(path, self.runner)
+        self.assert_round_trip(probe_server, path)
+
+    def test_live_unix_socket_is_not_replaced(self):
+        path = os.path.join(self.directory.name, 'probes.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+            live.bind(path)
+            live.listen()
+            with self.assertRaises(OSError) as context:
+                server.make_server(path, self.runner)
+        self.assertEqual(context.exception.errno, errno.EADDRINUSE)
+        self.assertTrue(os.path.exists(path))
+
+
+class TestBatchingStatementRunner(unittest.TestCase):
+    def test_run_returns_probes_and_warnings(self):
+        runner = server.BatchingStatementRunner(
+            session.ProbeGenerator(GENOME, ANNOTATION))
+        try:
+            probes, warnings = runner.run(["1:4 t>g /8\n", "banana\n"])
+        finally:
+            runner.close()
+        self.assertEqual(probes, [("1:4_t>g/8", "acggacgt")])
+        self.assertEqual(
+            warnings,
+            ["WARNING: the statement 'banana\\n' could not be parsed"])
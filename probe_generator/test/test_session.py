@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from probe_generator import print_probes, session
+from probe_generator.probe import InvalidStatement, ReferenceMismatch
+from probe_generator.test.test_constants import ANNOTATION, GENOME
+
+
+class TestProbeGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = session.ProbeGenerator(GENOME, ANNOTATION)
+
+    def test_generate_returns_probes_as_data(self):
+        result, = self.generator.generate("1:4 t>g /8 -- hello\n")
+        self.assertEqual(result.header, "1:4_t>g/8-- hello")
+        self.assertEqual(result.sequence, "acggacgt")
+        self.assertIsNone(result.error)
+        self.assertEqual(str(result.probe), result.header)
+
+    def test_invalid_statements_are_returned_as_errors(self):
+        result, = self.generator.generate(["banana\n"])
+        self.assertIsNone(result.probe)
+        self.assertIsInstance(result.error, InvalidStatement)
+        self.assertEqual(
+            print_probes.warning(result),
+            "WARNING: the statement 'banana\\n' could not be parsed")
+
+    def test_probes_without_sequences_are_returned_with_errors(self):
+        results = list(self.generator.generate(
+            ["GHI: P2M /9\n", "ABC: c.1 A>T /4\n"]))
+        self.assertEqual(
+            [result.sequence for result in results if result.error is None],
+            ["cccCATccc"])
+        self.assertEqual(
+            [result.header for result in results
+             if isinstance(result.error, ReferenceMismatch)],
+            ["ABC:c.1A>T/4_FOO_1:2"])
+
+    def test_statements_without_probes_give_NoProbesError(self):
+        *_, result = self.generator.generate(["NOT_A_GENE: P2M /9\n"])
+        self.assertIsNone(result.probe)
+        self.assertIsInstance(result.error, print_probes.NoProbesError)
+
+    def test_repeated_statements_are_only_exploded_once(self):
+        with mock.patch.object(print_probes, 'explode_statement',
+                               wraps=print_probes.explode_statement) as explode:
+            first = list(self.generator.generate(["1:4 t>g /8\n"]))
+            second = list(self.generator.generate(["1 : 4t>g/8\n"]))
+        self.assertEqual(explode.call_count, 1)
+        self.assertEqual(
+            [(result.header, result.sequence) for result in first],
+            [(result.header, result.sequence) for result in second])
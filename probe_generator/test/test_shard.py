@@ -0,0 +1,125 @@
+import unittest
+import io
+import os
+import tempfile
+from unittest import mock
+
+from probe_generator import print_probes, reference, shard
+from probe_generator.test.test_constants import GENOME
+
+ANNOTATION_FILE = (
+    "#name\tproteinID\texonStarts\texonEnds\tstrand\tchrom\tcdsStart\tcdsEnd\n"
+    "FOO\tABC\t1,3,\t2,4,\t+\t1\t1\t4\n"
+    "BAZ\tGHI\t10,20\t15,25\t-\t3\t10\t23\n")
+
+STATEMENTS = [
+    "ABC: c.1 insT /4 -- 0",
+    "1:4 t>g /8 -- 1",
+    "GHI: P2M /9 -- 2",
+    "2:5 g>c /4 -- 3",
+    "banana",
+    "ABC: c.1 insT /4 -- 5",
+    ]
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(shard.parse_shard("2/3", "gene"),
+                         shard.Shard(2, 3, "gene"))
+
+    def test_invalid_shards_raise_ValueError(self):
+        for text, by in (("0/3", "line"), ("4/3", "line"), ("1", "line"),
+                         ("a/b", "line"), ("1/2", "banana")):
+            with self.assertRaises(ValueError):
+                shard.parse_shard(text, by)
+
+    def test_shards_by_line_take_every_nth_statement(self):
+        selected = list(shard.Shard(2, 3, 'line').select(STATEMENTS))
+        self.assertEqual(selected, [STATEMENTS[1], STATEMENTS[4]])
+
+    def test_every_statement_is_in_exactly_one_shard(self):
+        for by in shard.SHARD_BY:
+            selected = []
+            for index in range(1, 4):
+                selected.extend(
+                    shard.Shard(index, 3, by).select(STATEMENTS))
+            self.assertEqual(sorted(selected), sorted(STATEMENTS))
+
+    def test_statements_on_a_gene_are_in_the_same_shard(self):
+        for index in range(1, 4):
+            selected = list(shard.Shard(index, 3, 'gene').select(STATEMENTS))
+            self.assertEqual(STATEMENTS[0] in selected,
+                             STATEMENTS[5] in selected)
+
+    def test_requirements(self):
+        genes, chromosomes = shard.Shard(1, 2, 'line').requirements(
+            STATEMENTS)
+        self.assertEqual(genes, {"ABC", "GHI"})
+        self.assertEqual(chromosomes, set())
+
+    def test_read_shard(self):
+        output = io.StringIO(";1\n>a\nacgt\n>b\ntttt\n;4\n;7\n>c\ngggg\n")
+        self.assertEqual(
+            list(shard.read_shard(output)),
+            [(1, [("a", "acgt"), ("b", "tttt")]), (4, []), (7, [("c", "gggg")])])
+
+
+class TestShardedRun(unittest.TestCase):
+    """Sharded runs merged together give the same output as a single run.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.statement_file = self.path('statements')
+        self.genome_file = self.path('genome')
+        self.annotation_file = self.path('annotation')
+        with open(self.statement_file, 'w') as handle:
+            for statement in STATEMENTS:
+                print(statement, file=handle)
+        with open(self.genome_file, 'w') as handle:
+            for chromosome, bases in sorted(GENOME.items()):
+                print(">{}\n{}".format(chromosome, bases), file=handle)
+        with open(self.annotation_file, 'w') as handle:
+            handle.write(ANNOTATION_FILE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_probes(self, statement_shard=None):
+        output = io.StringIO()
+        print_probes.print_probes(
+            self.statement_file, self.genome_file, self.annotation_file,
+            write=lambda head, bases: print_probes.print_fasta(
+                head, bases, file=output),
+            shard=statement_shard,
+            mark=lambda number: shard.print_marker(number, file=output))
+        output.seek(0)
+        return output
+
+    def assert_merged_output_is_unchanged(self, by, count):
+        expected = self.run_probes().getvalue()
+        outputs = [self.run_probes(shard.Shard(index, count, by))
+                   for index in range(1, count + 1)]
+        merged = io.StringIO()
+        shard.merge_shards(
+            outputs,
+            lambda head, bases: print_probes.print_fasta(
+                head, bases, file=merged))
+        self.assertEqual(merged.getvalue(), expected)
+
+    def test_shards_by_line(self):
+        self.assert_merged_output_is_unchanged('line', 3)
+
+    def test_shards_by_gene(self):
+        self.assert_merged_output_is_unchanged('gene', 2)
+
+    def test_shards_load_only_the_chromosomes_they_need(self):
+        with mock.patch.object(
+                reference, 'reference_genome',
+                wraps=reference.reference_genome) as reference_genome:
+            self.run_probes(shard.Shard(2, 3, 'line'))
+        _, keywords = reference_genome.call_args
+        self.assertEqual(keywords['chromosomes'], {'1'})
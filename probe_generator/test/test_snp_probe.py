@@ -1,7 +1,8 @@
 import unittest
 
 from probe_generator.test.test_constants import GENOME
-from probe_generator.snp_probe import SnpProbe
+from probe_generator.snp_probe import SnpProbe, SnpRegionProbe
+from probe_generator.probe import InvalidStatement, ReferenceMismatch
 
 
 class TestSnpProbe(unittest.TestCase):
@@ -21,6 +22,25 @@ class TestSnpProbe(unittest.TestCase):
              "bases":      8,
              "comment":    ""})
 
+    def test_snp_probe_reference_mismatch(self):
+        probe, = SnpProbe.explode("1:4 a>g /8")
+        with self.assertRaises(ReferenceMismatch):
+            probe.sequence(GENOME)
+
+    def test_globbed_reference_is_read_from_genome(self):
+        probes = SnpProbe.explode("1:4 *>* /8", genome=GENOME)
+        self.assertEqual(
+            [(str(probe), probe.sequence(GENOME)) for probe in probes],
+            [("1:4_T>A/8", "acgAacgt"),
+             ("1:4_T>C/8", "acgCacgt"),
+             ("1:4_T>G/8", "acgGacgt")])
+
+    def test_globbed_reference_matching_mutation_gives_no_probes(self):
+        self.assertEqual(SnpProbe.explode("1:4 *>t /8", genome=GENOME), [])
+
+    def test_globbed_reference_without_chromosome_tries_every_base(self):
+        self.assertEqual(len(SnpProbe.explode("1:4 *>* /8", genome={})), 12)
+
     def test_snp_probe_string(self):
         self.assertEqual(
                 "1:4_t>g/8",
@@ -72,3 +92,37 @@ class TestSnpProbe(unittest.TestCase):
              "1:4_T>G/8",
              ],
             [str(probe) for probe in self.globbed_both_probes])
+
+
+class TestSnpRegionProbe(unittest.TestCase):
+    def setUp(self):
+        self.probes = SnpRegionProbe.explode("1:2-6 *>* /4", genome=GENOME)
+
+    def test_region_probes_match_single_base_statements(self):
+        expected = []
+        for index in range(2, 7):
+            for probe in SnpProbe.explode(
+                    "1:{} *>* /4".format(index), genome=GENOME):
+                expected.append((str(probe), probe.sequence(GENOME)))
+        self.assertEqual(
+            [(str(probe), probe.sequence(GENOME)) for probe in self.probes],
+            expected)
+
+    def test_region_is_read_once(self):
+        genome = dict(GENOME)
+        self.probes[0].sequence(genome)
+        del genome["1"]
+        self.assertEqual(self.probes[-1].sequence(genome), "aTgt")
+
+    def test_given_reference_skips_other_bases(self):
+        self.assertEqual(
+            [str(probe) for probe in SnpRegionProbe.explode(
+                "1:2-6 c>t /4", genome=GENOME)],
+            ["1:2_c>t/4", "1:6_c>t/4"])
+
+    def test_without_genome_every_base_is_expanded(self):
+        self.assertEqual(len(SnpRegionProbe.explode("1:2-6 *>* /4")), 60)
+
+    def test_reversed_region_is_invalid(self):
+        with self.assertRaises(InvalidStatement):
+            SnpRegionProbe.parse("1:6-2 *>* /4")
@@ -18,6 +18,13 @@ PROBE_MODULES = (
     probe_generator.amino_acid_probe,
     probe_generator.gene_snp_probe,
     probe_generator.gene_indel_probe,
+    probe_generator.tiling_probe,
+    )
+
+# Statement types parsed by a second regex in the module of another type
+EXTRA_REGEXES = (
+    probe_generator.snp_probe._REGION_REGEX,
+    probe_generator.amino_acid_probe._SATURATION_REGEX,
     )
 
 
@@ -52,7 +59,8 @@ def assert_non_overlapping(fsa1, fsa2):
                                              "{}".format(fsa1 & fsa2))
 
 def test_statement_regex_mutual_exclusivity():
-    fsa_list = [lego.parse(deverbosify(module._STATEMENT_REGEX.pattern))
-                for module in PROBE_MODULES]
+    regexes = [module._STATEMENT_REGEX for module in PROBE_MODULES]
+    regexes.extend(EXTRA_REGEXES)
+    fsa_list = [lego.parse(deverbosify(regex.pattern)) for regex in regexes]
     for fsa1, fsa2 in itertools.combinations(fsa_list, 2):
         yield assert_non_overlapping, fsa1, fsa2
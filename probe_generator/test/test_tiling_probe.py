@@ -0,0 +1,79 @@
+import unittest
+
+from probe_generator.test.test_constants import GENOME, ANNOTATION
+from probe_generator.tiling_probe import TilingProbe
+from probe_generator.probe import InvalidStatement
+from probe_generator.reference import MissingChromosome
+
+
+class TestTilingProbe(unittest.TestCase):
+    def test_parse_whole_transcript(self):
+        specification = TilingProbe.parse("GHI: tile /4 +2")
+        self.assertFalse(specification["cds"])
+        self.assertIsNone(specification["first"])
+        self.assertEqual(specification["bases"], 4)
+        self.assertEqual(specification["step"], 2)
+
+    def test_parse_coding_sequence(self):
+        self.assertTrue(TilingProbe.parse("GHI: tile cds /4")["cds"])
+        self.assertTrue(TilingProbe.parse("GHI: tile c.2-7 /4")["cds"])
+
+    def test_parse_step_defaults_to_number_of_bases(self):
+        self.assertEqual(
+            TilingProbe.parse("GHI: tile c.2-7 [trans] /4")["step"], 4)
+
+    def test_parse_rejects_reversed_range(self):
+        with self.assertRaises(InvalidStatement):
+            TilingProbe.parse("GHI: tile c.7-2 /4")
+
+    def test_genomic_tiles_include_introns(self):
+        probes = TilingProbe.explode("MNO: tile /5 +5", ANNOTATION)
+        self.assertEqual(
+            [probe.sequence(GENOME) for probe in probes],
+            ["aaacc", "cGGGc", "ccaaa"])
+
+    def test_transcript_tiles_are_spliced(self):
+        probes = TilingProbe.explode("MNO: tile [trans] /4 +4", ANNOTATION)
+        self.assertEqual(
+            [probe.sequence(GENOME) for probe in probes],
+            ["aaaG", "GGaa", "Gaaa"])
+
+    def test_tiles_include_the_utrs(self):
+        probes = TilingProbe.explode("GHI: tile [trans] /4 +3", ANNOTATION)
+        self.assertEqual(
+            [probe.sequence(GENOME) for probe in probes],
+            ["tttt", "ttCC", "CCgg"])
+
+    def test_minus_strand_tiles_are_reverse_complemented(self):
+        probes = TilingProbe.explode("GHI: tile cds [trans] /4 +3", ANNOTATION)
+        self.assertEqual(
+            [probe.sequence(GENOME) for probe in probes],
+            ["tttC", "CCCg", "CCgg"])
+
+    def test_tile_range(self):
+        probes = TilingProbe.explode("GHI: tile c.4-7 [trans] /2", ANNOTATION)
+        self.assertEqual(
+            [probe.sequence(GENOME) for probe in probes],
+            ["CC", "Cg"])
+
+    def test_probe_string(self):
+        probe, *_ = TilingProbe.explode(
+            "GHI: tile cds [trans] /4 +3 -- comment", ANNOTATION)
+        self.assertEqual(str(probe),
+                         "GHI:tilecds[trans]/4+3_BAZ_3:15-23-- comment")
+
+    def test_probes_share_the_transcript_sequence(self):
+        first, second, *_ = TilingProbe.explode("MNO: tile /5", ANNOTATION)
+        genome = dict(GENOME)
+        first.sequence(genome)
+        del genome["3"]
+        self.assertEqual(second.sequence(genome), "cGGGc")
+
+    def test_missing_chromosome(self):
+        probe, *_ = TilingProbe.explode("MNO: tile /5", ANNOTATION)
+        with self.assertRaises(MissingChromosome):
+            probe.sequence({})
+
+    def test_out_of_range_gives_no_probes(self):
+        self.assertEqual(
+            TilingProbe.explode("GHI: tile c.2-100 /4", ANNOTATION), [])
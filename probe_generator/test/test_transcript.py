@@ -1,8 +1,11 @@
 import unittest
 
-from probe_generator.transcript import Transcript
+from probe_generator import print_probes
+from probe_generator.exceptions import NonFatalError
+from probe_generator.transcript import (
+    Transcript, SplicedSequenceCache, OutOfRange)
 from probe_generator.sequence_range import SequenceRange
-from probe_generator.test.test_constants import ANNOTATION
+from probe_generator.test.test_constants import ANNOTATION, GENOME
 
 class TestTranscript(unittest.TestCase):
     """Test cases for the annotation.exons function
@@ -70,6 +73,13 @@ class TestTranscript(unittest.TestCase):
         self.assertEqual(
             transcript3.codon_index(2), SequenceRange('3', 12, 15)),
 
+    def test_codon_ranges_match_codon_index(self):
+        for txt in ANNOTATION:
+            codon_ranges = txt.codon_ranges()
+            self.assertEqual(
+                codon_ranges,
+                [txt.codon_index(i) for i in range(1, len(codon_ranges)+1)])
+
     def test_transcript_range(self):
         self.assertEqual(
             self.transcript.transcript_range(1, 2),
@@ -92,3 +102,52 @@ class TestTranscript(unittest.TestCase):
                 base = transcript.base_index(nuc)
                 self.assertEqual(i, base, "Gene name: {}".format(
                         transcript.gene_id))
+
+
+class TestSplicedSequence(unittest.TestCase):
+    def setUp(self):
+        self.cache = SplicedSequenceCache(GENOME, 100)
+
+    def test_bases_are_in_the_direction_of_transcription(self):
+        for txt in ANNOTATION:
+            if txt.chromosome in GENOME:
+                self.assertEqual(
+                    self.cache.get(txt).bases,
+                    ''.join(GENOME[txt.chromosome][nucleotide.start]
+                            for nucleotide in (
+                                txt.nucleotide_index(i)
+                                for i in range(1, len(txt)+1))))
+
+    def test_base_index_matches_transcript(self):
+        for txt in ANNOTATION:
+            if txt.chromosome in GENOME:
+                spliced = self.cache.get(txt)
+                for i in range(1, len(txt)+1):
+                    self.assertEqual(
+                        spliced.base_index(txt.nucleotide_index(i)), i)
+
+    def test_base_index_outside_transcript(self):
+        transcript1, *_ = ANNOTATION
+        with self.assertRaises(OutOfRange):
+            self.cache.get(transcript1).base_index(SequenceRange('1', 7, 8))
+
+    def test_sequences_are_only_read_once(self):
+        transcript1, *_ = ANNOTATION
+        self.assertIs(self.cache.get(transcript1), self.cache.get(transcript1))
+
+    def test_transcript_variant_sequences_match_ranges(self):
+        for statement in ("MNO: G2M [trans] /9", "MNO: G2* [trans] /8",
+                          "GHI: P2X [trans] /4", "DEF: c.2 T>G [trans] /3"):
+            probe_class, _ = print_probes.parse_statement(statement)
+            for probe in print_probes.explode_statement(
+                    probe_class, statement, ANNOTATION):
+                try:
+                    expected = probe.sequence(GENOME)
+                except NonFatalError as error:
+                    expected = type(error)
+                try:
+                    actual = probe.sequence(
+                        GENOME, spliced_sequences=self.cache)
+                except NonFatalError as error:
+                    actual = type(error)
+                self.assertEqual(actual, expected, str(probe))
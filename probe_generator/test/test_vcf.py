@@ -0,0 +1,89 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from probe_generator import reference, vcf
+from probe_generator.snp_probe import SnpProbe
+from probe_generator.probe import InvalidStatement, ReferenceMismatch
+
+GENOME_FILE = (b">1 chromosome 1\n"
+               b"AAAACCCCGG\n"
+               b"GGTTTT\n"
+               b">2\n"
+               b"acgtacgtacgt\n"
+               b">hs37d5\n"
+               b"acgtacgt\n")
+
+RECORDS = [
+    "##fileformat=VCFv4.2\n",
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n",
+    "1\t6\trs1\tC\tT,G\t.\tPASS\t.\n",
+    "chr1\t8\t.\tCG\tTA\t.\tPASS\t.\n",
+    "1\t10\t.\tGG\tG\t.\tPASS\t.\n",
+    "2\t4\t.\tt\ttAAA\t.\tPASS\t.\n",
+    ]
+
+
+class TestVcf(unittest.TestCase):
+    def setUp(self):
+        self.genome = reference.IndexedGenome(io.BytesIO(GENOME_FILE))
+
+    def generate(self, records, bases=6):
+        return list(vcf.generate_vcf_probes(records, self.genome, bases))
+
+    def test_snv_mnv_and_indel_probes(self):
+        self.assertEqual(
+            [(result.header, result.sequence)
+             for result in self.generate(RECORDS)],
+            [("1:6_C>T/6_rs1", "ACTCCG"),
+             ("1:6_C>G/6_rs1", "ACGCCG"),
+             ("1:8_CG>TA/6", "CCTAGG"),
+             ("1:10_GG>G/6", "CGGGTT"),
+             ("2:4_t>tAAA/6", "gtAAAa")])
+
+    def test_snv_probes_match_snp_statements(self):
+        genome = {"1": self.genome.chromosome("1")}
+        for bases in range(2, 10):
+            with self.subTest(bases=bases):
+                result, = self.generate(["1\t8\t.\tC\tT\n"], bases)
+                probe, = SnpProbe.explode("1:8 C>T /{}".format(bases))
+                self.assertEqual(result.sequence, probe.sequence(genome))
+
+    def test_only_a_chr_prefix_is_removed(self):
+        result, = self.generate(["hs37d5\t3\t.\tg\tT\n"], 4)
+        self.assertEqual((result.header, result.sequence),
+                         ("hs37d5:3_g>T/4", "cTta"))
+
+    def test_reference_mismatch(self):
+        result, = self.generate(["1\t6\t.\tA\tT\n"])
+        self.assertIsInstance(result.error, ReferenceMismatch)
+
+    def test_missing_chromosome(self):
+        result, = self.generate(["Y\t6\t.\tA\tT\n"])
+        self.assertIsInstance(result.error, reference.MissingChromosome)
+
+    def test_invalid_record(self):
+        result, = self.generate(["1\tsix\t.\tA\tT\n"])
+        self.assertIsNone(result.probe)
+        self.assertIsInstance(result.error, InvalidStatement)
+
+    def test_symbolic_alleles_are_skipped(self):
+        self.assertEqual(self.generate(["1\t6\t.\tC\t<DEL>\n"]), [])
+
+    def test_each_chromosome_is_read_once_for_sorted_records(self):
+        with mock.patch.object(self.genome, 'chromosome',
+                               wraps=self.genome.chromosome) as chromosome:
+            self.generate(RECORDS)
+        self.assertEqual(
+            [call[0][0] for call in chromosome.call_args_list], ['1', '2'])
+
+    def test_gzipped_vcf_files_are_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'variants.vcf.gz')
+            with gzip.open(path, 'wt') as handle:
+                handle.writelines(RECORDS)
+            with vcf.open_vcf(path) as handle:
+                self.assertEqual(list(handle), RECORDS)
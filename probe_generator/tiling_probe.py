@@ -0,0 +1,286 @@
+"""Probes tiling the mRNA or the coding sequence of a transcript.
+
+"""
+import re
+import sys
+
+from probe_generator import annotation, reference, transcript
+from probe_generator.probe import AbstractProbe, InvalidStatement
+from probe_generator.sequence_range import SequenceRange
+
+_STATEMENT_REGEX = re.compile(r"""
+        \s*                    # whitespace
+        ([a-zA-Z0-9_./-]+)     # gene name
+        \s*
+        :
+        \s*
+        tile
+        \s*
+        (?:
+            (cds)              # whole coding sequence
+        |
+            c\.
+            ([0-9]+)           # first base
+            \s*-\s*
+            ([0-9]+)           # last base
+        )?
+        \s*
+        (\[trans\]|)           # transcript-only sequence
+        \s*
+        /
+        \s*
+        ([0-9]+)               # number of base pairs
+        \s*
+        (?:
+            \+
+            \s*
+            ([0-9]+)           # step
+        )?
+        \s*
+        (--.*|\s*)             # comment
+        """, re.VERBOSE)
+
+
+class TilingProbe(AbstractProbe):
+    """Probe for one window of a tiling of the mRNA or the coding sequence of
+    a transcript.
+
+    The probes of a transcript share a single Tiling, so the sequence of the
+    transcript is fetched from the genome once and each probe is a slice of
+    it.
+
+    """
+    _STATEMENT_SKELETON = ("{gene}:tile{range}{transcript_sequence}/{bases}"
+                           "+{step}_{transcript_name}_{chromosome}:"
+                           "{start}-{end}{comment}")
+
+    __slots__ = ('tiling', 'offset', 'ranges', 'specification')
+
+    def __init__(self, *, tiling, offset, ranges, specification):
+        self.tiling = tiling
+        self.offset = offset
+        self.ranges = ranges
+        self.specification = specification
+
+    def __str__(self):
+        specification = self.specification
+        if not specification["cds"]:
+            base_range = ''
+        elif specification["first"] is None:
+            base_range = 'cds'
+        else:
+            base_range = "c.{}-{}".format(
+                specification["first"], specification["last"])
+        return self._STATEMENT_SKELETON.format(
+            gene=specification["gene"],
+            range=base_range,
+            transcript_sequence=specification["transcript_sequence"],
+            bases=specification["bases"],
+            step=specification["step"],
+            transcript_name=self.tiling.transcript.name,
+            chromosome=self.tiling.transcript.chromosome,
+            start=min(sequence_range.start for sequence_range in self.ranges)+1,
+            end=max(sequence_range.end for sequence_range in self.ranges),
+            comment=specification["comment"])
+
+    def get_ranges(self):
+        return self.ranges
+
+    def sequence(self, genome, *, spliced_sequences=None):
+        """Return the sequence of the probe given a reference genome.
+
+        The probes of a tiling already share its sequence, so the
+        `spliced_sequences` are not used.
+
+        Raises a MissingChromosome exception (non-fatal) when the chromosome is
+        not present in the reference genome.
+
+        """
+        bases = self.tiling.sequence(genome)
+        return bases[self.offset:self.offset+self.specification["bases"]]
+
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
+
+    @staticmethod
+    def explode(statement, genome_annotation=None):
+        """Given a tiling statement, return the probes tiling each transcript
+        of the gene.
+
+        Windows are placed every `step` bases from the first base of the range.
+        If the last window does not reach the end of the range, a final window
+        ending on the last base is added.
+
+        If more than one probe has identical genomic coordinates, only the
+        first is returned.
+
+        """
+        probes = []
+
+        if genome_annotation is None:
+            genome_annotation = []
+
+        specification = _parse(statement)
+        transcripts = annotation.lookup_gene(
+            specification["gene"], genome_annotation)
+        bases = specification["bases"]
+
+        cached_coordinates = set()
+        for txt in transcripts:
+            try:
+                tiling = Tiling(
+                    txt,
+                    specification["first"],
+                    specification["last"],
+                    is_transcript=specification["transcript_sequence"] != '',
+                    cds=specification["cds"])
+            except transcript.OutOfRange as error:
+                print("{} in statement: {!r}".format(error, statement),
+                      file=sys.stderr)
+                continue
+            if len(tiling) < bases:
+                print("Transcript {!r} is shorter than {} bases in "
+                      "statement: {!r}".format(txt.name, bases, statement),
+                      file=sys.stderr)
+                continue
+            for offset in tiling.offsets(bases, specification["step"]):
+                ranges = tiling.ranges(offset, offset+bases)
+                if tuple(ranges) not in cached_coordinates:
+                    cached_coordinates.add(tuple(ranges))
+                    probes.append(TilingProbe(
+                        tiling=tiling,
+                        offset=offset,
+                        ranges=ranges,
+                        specification=specification))
+        return probes
+
+
+class Tiling(object):
+    """The mRNA of a transcript, UTRs included, or its coding sequence (or a
+    range of it), read in the direction of transcription.
+
+    If `is_transcript` is True the sequence is spliced; otherwise it is the
+    genomic sequence from the first to the last base, introns included.
+    If `cds` is True, `first` and `last` are 1-based, inclusive indices of
+    the coding sequence (the whole of it if they are None); otherwise they are
+    not used.
+
+    Raises an OutOfRange exception if the range is not within the transcript.
+
+    """
+    def __init__(self, txt, first=None, last=None, *, is_transcript,
+                 cds=False):
+        self.transcript = txt
+        if not cds:
+            segments = txt.exons()
+        else:
+            if first is None:
+                first, last = 1, len(txt)
+            segments = txt.transcript_range(first, last+1)
+        if not is_transcript:
+            segments = [SequenceRange(
+                txt.chromosome,
+                min(segment.start for segment in segments),
+                max(segment.end for segment in segments))]
+        self.segments = [
+            SequenceRange(segment.chromosome, segment.start, segment.end,
+                          reverse_complement=not txt.plus_strand)
+            for segment in segments]
+        self._genome = None
+        self._bases = None
+
+    def __len__(self):
+        return sum(segment.end - segment.start for segment in self.segments)
+
+    def offsets(self, bases, step):
+        """Return a list of the 0-based offsets of windows of `bases` bases
+        placed every `step` bases along the tiling, plus a final window ending
+        on the last base if needed.
+
+        """
+        offsets = list(range(0, len(self) - bases + 1, step))
+        if offsets[-1] + bases < len(self):
+            offsets.append(len(self) - bases)
+        return offsets
+
+    def ranges(self, start, end):
+        """Return a list of SequenceRange objects representing the bases of
+        the tiling from the 0-based offset `start` to `end`.
+
+        """
+        ranges = []
+        segment_start = 0
+        for segment in self.segments:
+            segment_end = segment_start + segment.end - segment.start
+            left = max(start, segment_start) - segment_start
+            right = min(end, segment_end) - segment_start
+            if left < right:
+                if segment.reverse_complement:
+                    ranges.append(SequenceRange(
+                        segment.chromosome,
+                        segment.end - right,
+                        segment.end - left,
+                        reverse_complement=True))
+                else:
+                    ranges.append(SequenceRange(
+                        segment.chromosome,
+                        segment.start + left,
+                        segment.start + right))
+            segment_start = segment_end
+        return ranges
+
+    def sequence(self, genome):
+        """Return the bases of the tiling given a reference genome.
+
+        The bases are only fetched from the genome once.
+
+        """
+        if self._genome is not genome:
+            self._bases = ''.join(
+                reference.bases(segment, genome) for segment in self.segments)
+            self._genome = genome
+        return self._bases
+
+
+def _parse(statement):
+    """Return a partial TilingProbe specification given a probe statement.
+    'cds' is True if only the coding sequence is tiled, and the 'first' and
+    'last' bases are None unless a range of it is given. The 'step' defaults
+    to the number of bases.
+
+    Raises an InvalidStatement exception when the statement does not match the
+    format of a tiling statement.
+
+    """
+    match = _STATEMENT_REGEX.match(statement)
+    if not match:
+        raise InvalidStatement
+
+    (gene,
+     cds,
+     first,
+     last,
+     transcript_sequence,
+     bases,
+     step,
+     comment) = match.groups()
+
+    if first is not None:
+        first, last = int(first), int(last)
+        if not 1 <= first <= last:
+            raise InvalidStatement(
+                "Invalid base range: c.{}-{}".format(first, last))
+    bases = int(bases)
+    step = bases if step is None else int(step)
+    if bases == 0 or step == 0:
+        raise InvalidStatement("Tiles and steps must be at least one base")
+
+    return {"gene":                gene,
+            "cds":                 cds is not None or first is not None,
+            "first":               first,
+            "last":                last,
+            "transcript_sequence": transcript_sequence,
+            "bases":               bases,
+            "step":                step,
+            "comment":             comment}
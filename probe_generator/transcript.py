@@ -3,7 +3,8 @@
 """
 import itertools
 
-from probe_generator import probe
+from probe_generator import probe, reference
+from probe_generator.cache import LruCache
 from probe_generator.sequence_range import SequenceRange
 
 _REQUIRED_FIELDS = (
@@ -207,24 +208,50 @@ class Transcript(object):
         right-exclusive.
 
         """
-        ranges = [self.nucleotide_index(i) for i in range(start, end)]
+        if start >= end:
+            return []
+        if start < 1:
+            raise OutOfRange(
+                "Base {} is outside the range of transcript '{}'".format(
+                    start, self.name))
+        coordinates = list(itertools.islice(
+            self._coding_coordinates(), start-1, end-1))
+        if len(coordinates) < end - start:
+            raise OutOfRange(
+                "Base {} is outside the range of transcript '{}'".format(
+                    start + len(coordinates), self.name))
+        ranges = [SequenceRange(self.chromosome, base_index, base_index+1)
+                  for base_index in coordinates]
         return SequenceRange.condense(*ranges)
 
+    def codon_ranges(self):
+        """Return a list of SequenceRange objects representing every complete
+        codon of the transcript, in order.
+
+        The n-th SequenceRange is the same as that returned by
+        `codon_index(n)`, but the coordinates of the transcript are only
+        mapped once.
+
+        """
+        coordinates = list(self._coding_coordinates())
+        ranges = []
+        for base_index in coordinates[2::3]:
+            if self.plus_strand:
+                ranges.append(SequenceRange(
+                    self.chromosome, base_index-2, base_index+1))
+            else:
+                ranges.append(SequenceRange(
+                    self.chromosome, base_index, base_index+3))
+        return ranges
+
     def _transcript_index(self, index):
         """Given the 1-based index of a nucleotide in the coding sequence,
         return the 0-based genomic index of that nucleotide as an integer.
 
         """
-        indices = []
-        for exon in self.coding_exons():
-            nucleotide_range = list(range(exon.start, exon.end))
-            if not self.plus_strand:
-                nucleotide_range.reverse()
-            indices.append(nucleotide_range)
-        base_coordinates = itertools.chain(*indices)
         try:
             base_index = next(itertools.islice(
-                    base_coordinates,
+                    self._coding_coordinates(),
                     index-1,
                     None))
         except StopIteration:
@@ -233,6 +260,81 @@ class Transcript(object):
                     index, self.name))
         return base_index
 
+    def _coding_coordinates(self):
+        """Return an iterator of the 0-based genomic indices of the
+        nucleotides of the coding sequence, in the direction of transcription.
+
+        """
+        indices = []
+        for exon in self.coding_exons():
+            nucleotide_range = list(range(exon.start, exon.end))
+            if not self.plus_strand:
+                nucleotide_range.reverse()
+            indices.append(nucleotide_range)
+        return itertools.chain(*indices)
+
+
+class SplicedSequence(object):
+    """The coding sequence of a transcript, read from a genome.
+
+    `bases` are the bases of the genome at each nucleotide of the coding
+    sequence, in the direction of transcription but not complemented, so that
+    `bases[i-1]` is the base at `transcript.nucleotide_index(i)`.
+
+    Raises a MissingChromosome exception (non-fatal) when the chromosome is
+    not present in the genome.
+
+    """
+    def __init__(self, txt, genome):
+        self.transcript = txt
+        self._exons = txt.coding_exons()
+        bases = []
+        for exon in self._exons:
+            exon_bases = reference.bases(exon, genome)
+            bases.append(exon_bases if txt.plus_strand else exon_bases[::-1])
+        self.bases = ''.join(bases)
+
+    def __len__(self):
+        return len(self.bases)
+
+    def base_index(self, sequence_range):
+        """As `Transcript.base_index`, but using the exon boundaries rather
+        than visiting every nucleotide.
+
+        """
+        offset = 0
+        for exon in self._exons:
+            if exon.start <= sequence_range.start < exon.end:
+                if self.transcript.plus_strand:
+                    return offset + sequence_range.start - exon.start + 1
+                else:
+                    return offset + exon.end - sequence_range.start
+            offset += exon.end - exon.start
+        raise OutOfRange
+
+
+class SplicedSequenceCache(object):
+    """The SplicedSequences of transcripts, read from a genome the first time
+    each is needed.
+
+    The least-recently used sequences are discarded when the total length of
+    the cached sequences exceeds `maxsize` bases.
+
+    """
+    def __init__(self, genome, maxsize):
+        self.genome = genome
+        self._cache = LruCache(maxsize, sizeof=len)
+
+    def get(self, txt):
+        """Return the SplicedSequence of a transcript.
+
+        """
+        spliced = self._cache.get(txt)
+        if spliced is None:
+            spliced = SplicedSequence(txt, self.genome)
+            self._cache.put(txt, spliced)
+        return spliced
+
 
 class InvalidAnnotationFile(Exception):
     """Raised when format assumptions about the table used to generate the
@@ -3,6 +3,7 @@ substitutions, etc.)
 
 """
 from probe_generator.sequence_range import SequenceRange
+from probe_generator.transcript import OutOfRange
 
 class AbstractVariant(object):
     """Super-class for Variant objects.
@@ -17,7 +18,13 @@ class AbstractVariant(object):
     `length` is the sum of the length of the variant and the surrounding buffer
     sequence.
 
+    Variants are slotted, and the attributes derived from the transcript and
+    index are computed when they are read, since a run may hold millions of
+    them.
+
     """
+    __slots__ = ('transcript', 'index', 'reference', 'mutation', '_length')
+
     def __init__(self, *, transcript, index, reference, mutation, length):
         self.transcript = transcript
         self.index = index
@@ -25,20 +32,33 @@ class AbstractVariant(object):
         self.mutation = mutation
         self._length = length
 
-        self.gene = self.transcript.gene_id
-        self.transcript_name = self.transcript.name
-        self.chromosome = self.transcript.chromosome
-        self.coordinate = self.index.start + 1
-
     def __len__(self):
         return self._length
 
+    @property
+    def gene(self):
+        return self.transcript.gene_id
+
+    @property
+    def transcript_name(self):
+        return self.transcript.name
+
+    @property
+    def chromosome(self):
+        return self.transcript.chromosome
+
+    @property
+    def coordinate(self):
+        return self.index.start + 1
+
 
 class TranscriptVariant(AbstractVariant):
     """A substitution variant using buffer sequence from the surrounding
     transcript.
 
     """
+    __slots__ = ()
+
     is_transcript = True
 
     def sequence_ranges(self):
@@ -82,12 +102,64 @@ class TranscriptVariant(AbstractVariant):
         else:
             return reversed(sequence)
 
+    def mutation_range(self):
+        """Return the SequenceRange object of the bases replaced by the
+        mutation, as in `sequence_ranges`.
+
+        """
+        chromosome, start, _, _, _ = self.index
+        return SequenceRange(chromosome,
+                             start,
+                             start+len(self.reference),
+                             mutation=self.mutation,
+                             reverse_complement=not self.transcript.plus_strand)
+
+    def spliced_sequence(self, spliced):
+        """Return the bases of the variant given the SplicedSequence of its
+        transcript.
+
+        The bases are the same as those of the ranges returned by
+        `sequence_ranges`, but are sliced from the spliced sequence rather
+        than fetched range by range.
+
+        Raises an OutOfRange exception when the buffer sequences strays outside
+        the range of the transcript.
+
+        """
+        reference_length = len(self.reference)
+        mutation_length = len(self.mutation)
+
+        total_buffer = len(self) - mutation_length
+        left_buffer = total_buffer // 2
+        right_buffer = total_buffer - left_buffer
+
+        if not self.transcript.plus_strand:
+            left_buffer, right_buffer = right_buffer, left_buffer
+
+        base = spliced.base_index(self.index)
+        left_start = base - 1 - left_buffer
+        right_end = base - 1 + reference_length + right_buffer
+        if left_start < 0 or right_end > len(spliced):
+            raise OutOfRange(
+                "Buffer sequence is outside the range of transcript "
+                "'{}'".format(self.transcript_name))
+        left = spliced.bases[left_start:base-1]
+        right = spliced.bases[base-1+reference_length:right_end]
+        mutation = self.mutation_range().mutation
+
+        if self.transcript.plus_strand:
+            return left + mutation + right
+        else:
+            return right[::-1] + mutation + left[::-1]
+
 
 class GenomeVariant(AbstractVariant):
     """A substitution variant using buffer sequence from the surrounding genome
     sequence.
 
     """
+    __slots__ = ()
+
     is_transcript = False
 
     def sequence_ranges(self):
@@ -0,0 +1,228 @@
+"""Probes for the variants in a VCF file.
+
+Each alternative allele of each record gives a probe: SNVs, MNVs and indels
+are all treated as the substitution of the reference allele by the
+alternative allele, with the surrounding bases taken from the genome. The
+reference allele is checked against the genome, as for probe statements.
+
+The records are streamed, and the genome is read one chromosome at a time: if
+the records are sorted by chromosome (as VCF files usually are), each
+chromosome is only read once.
+
+"""
+import contextlib
+import gzip
+import re
+import sys
+from collections import namedtuple
+
+from probe_generator import reference, snp_probe
+from probe_generator.exceptions import NonFatalError
+from probe_generator.print_probes import GeneratedProbe, print_fasta
+from probe_generator.probe import AbstractProbe, InvalidStatement
+from probe_generator.sequence_range import SequenceRange
+
+_ALLELE_REGEX = re.compile(r"^[ACGTNacgtn]+$")
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class VcfVariant(namedtuple("VcfVariant", [
+        "chromosome", "position", "identifier", "reference", "mutation"])):
+    """One alternative allele of a VCF record.
+
+    `position` is the 1-based position of the first base of the reference
+    allele, as in the VCF file.
+
+    """
+    __slots__ = ()
+
+
+class VcfProbe(AbstractProbe):
+    """Probe for one alternative allele of a VCF record.
+
+    The probe is `bases` long: the alternative allele with the genomic bases
+    on either side of the reference allele. The bases to the left are those of
+    a SNP probe of the same length (see `snp_probe`), but no more than half of
+    the bases beside the allele, so an SNV gives the same probe as the
+    equivalent SNP statement.
+
+    """
+    _STATEMENT_SKELETON = ("{chromosome}:{position}_{reference}>{mutation}"
+                           "/{bases}{identifier}")
+
+    __slots__ = ('variant', 'bases')
+
+    def __init__(self, *, variant, bases):
+        self.variant = variant
+        self.bases = bases
+
+    def __str__(self):
+        if self.variant.identifier == '.':
+            identifier = ''
+        else:
+            identifier = '_' + self.variant.identifier
+        return self._STATEMENT_SKELETON.format(
+            chromosome=self.variant.chromosome,
+            position=self.variant.position,
+            reference=self.variant.reference,
+            mutation=self.variant.mutation,
+            bases=self.bases,
+            identifier=identifier)
+
+    def get_ranges(self):
+        chromosome, position, _, reference_allele, mutation = self.variant
+        start = position - 1
+        end = start + len(reference_allele)
+        total_buffer = max(self.bases - len(mutation), 0)
+        snp_left_buffer, _ = snp_probe._buffers(self.bases)
+        left_buffer = max(min(snp_left_buffer, total_buffer // 2), 0)
+        right_buffer = total_buffer - left_buffer
+        return [
+            SequenceRange(chromosome, start-left_buffer, start),
+            SequenceRange(chromosome, start, end, mutation=mutation),
+            SequenceRange(chromosome, end, end+right_buffer)]
+
+    @staticmethod
+    def parse(statement):
+        return _parse(statement)
+
+    @staticmethod
+    def explode(statement, genome_annotation=None, *, bases):
+        """Return a list of the probes of the alternative alleles of a VCF
+        record.
+
+        Symbolic and missing alleles (e.g., '<DEL>', '*' or '.') are skipped
+        with a warning.
+
+        """
+        specification = _parse(statement)
+        probes = []
+        for allele in specification["alternatives"]:
+            if not _ALLELE_REGEX.match(allele):
+                print("Unsupported allele {!r} in VCF record: {!r}".format(
+                    allele, statement.rstrip('\n')),
+                      file=sys.stderr)
+                continue
+            probes.append(VcfProbe(
+                variant=VcfVariant(specification["chromosome"],
+                                   specification["position"],
+                                   specification["identifier"],
+                                   specification["reference"],
+                                   allele),
+                bases=bases))
+        return probes
+
+
+def print_vcf_probes(vcf_file, genome_file, bases, *, write=None,
+                     deduplicator=None):
+    """Print the probes of the variants in a VCF file (which may be
+    compressed with gzip) in FASTA format.
+
+    Probes are passed to the `write` function (`print_fasta` by default). If a
+    `deduplicator` is given (see the `dedup` module), probes are passed to its
+    `add` method instead. Warnings are printed to standard error.
+
+    """
+    if deduplicator is not None:
+        write = deduplicator.add
+    elif write is None:
+        write = print_fasta
+    with open_vcf(vcf_file) as records, open(genome_file, 'rb') as genome:
+        for result in generate_vcf_probes(
+                records, reference.IndexedGenome(genome), bases):
+            if result.error is None:
+                write(result.header, result.sequence)
+            elif result.probe is not None:
+                print("In probe: {}: {}".format(result.header, result.error),
+                      file=sys.stderr)
+            else:
+                print("Could not parse VCF record: {!r}".format(
+                    result.statement.rstrip('\n')),
+                      file=sys.stderr)
+    if deduplicator is not None:
+        deduplicator.flush()
+
+
+def generate_vcf_probes(records, genome, bases):
+    """Return an iterator of GeneratedProbe objects given an iterable of the
+    lines of a VCF file, a `reference.IndexedGenome` and the length of the
+    probes.
+
+    Header lines are skipped. Records which cannot be parsed are reported by
+    a GeneratedProbe with no probe and an InvalidStatement error.
+
+    """
+    chromosome = None
+    sequences = {}
+    for record in records:
+        if record.startswith('#') or not record.strip():
+            continue
+        try:
+            probes = VcfProbe.explode(record, bases=bases)
+        except InvalidStatement as error:
+            yield GeneratedProbe(record, None, None, None, error)
+            continue
+        for probe in probes:
+            if probe.variant.chromosome != chromosome:
+                chromosome = probe.variant.chromosome
+                sequences = _load_chromosome(chromosome, genome)
+            head = str(probe)
+            try:
+                sequence = probe.sequence(sequences)
+            except (NonFatalError, reference.NonContainedRange) as error:
+                yield GeneratedProbe(record, probe, head, None, error)
+            else:
+                yield GeneratedProbe(record, probe, head, sequence, None)
+
+
+@contextlib.contextmanager
+def open_vcf(vcf_file):
+    """Open a VCF file for reading as text, decompressing it if it is
+    compressed with gzip (or bgzip).
+
+    """
+    with open(vcf_file, 'rb') as handle:
+        compressed = handle.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+    if compressed:
+        handle = gzip.open(vcf_file, 'rt')
+    else:
+        handle = open(vcf_file)
+    with handle:
+        yield handle
+
+
+def _load_chromosome(chromosome, genome):
+    """Return a genome dictionary with only the sequence of `chromosome`.
+
+    The dictionary is empty if the chromosome is not in the genome.
+
+    """
+    try:
+        return {chromosome: genome.chromosome(chromosome)}
+    except reference.MissingChromosome:
+        return {}
+
+
+def _parse(statement):
+    """Return a partial VcfProbe specification given a VCF record.
+
+    The 'chr' prefix is removed from the chromosome name, as for the
+    chromosomes of annotations.
+
+    Raises an InvalidStatement exception when the record does not have the
+    first five columns of a VCF record.
+
+    """
+    fields = statement.rstrip('\n').split('\t')
+    if len(fields) < 5:
+        raise InvalidStatement
+    chromosome, position, identifier, reference_allele, alternatives = (
+        fields[:5])
+    if not position.isdigit() or not _ALLELE_REGEX.match(reference_allele):
+        raise InvalidStatement
+    return {"chromosome":   reference.chromosome_name(chromosome),
+            "position":     int(position),
+            "identifier":   identifier,
+            "reference":    reference_allele,
+            "alternatives": alternatives.split(',')}
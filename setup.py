@@ -1,8 +1,8 @@
 from distutils.core import setup
 import sys
 
-if sys.version < '3.2':
-    print("probe_genertor requires Python v3.2 or later")
+if sys.version_info < (3, 9):
+    print("probe_genertor requires Python v3.9 or later")
     sys.exit(1)
 
 setup(name='ProbeGenerator',